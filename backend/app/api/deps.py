@@ -3,6 +3,7 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlmodel import Session, select
 from app.core.database import get_session
+from app.core.principal_cache import principal_cache
 from app.core.security import decode_access_token
 from app.models.user import User
 from app.schemas.user import TokenData
@@ -10,34 +11,41 @@ from app.schemas.user import TokenData
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+credentials_exception = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
+# Decode token (resolved once per request and shared by the dependencies below)
+async def get_token_payload(
+    token: Annotated[str, Depends(oauth2_scheme)]
+) -> dict:
+    payload = decode_access_token(token)
+    if payload is None or payload.get("sub") is None:
+        raise credentials_exception
+    return payload
+
 # Get current user from token
 async def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)],
+    payload: Annotated[dict, Depends(get_token_payload)],
     session: Annotated[Session, Depends(get_session)]
 ) -> User:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    
-    # Decode token
-    payload = decode_access_token(token)
-    if payload is None:
-        raise credentials_exception
-    
     username: str = payload.get("sub")
-    if username is None:
-        raise credentials_exception
-    
+
+    # Serve the principal from memory when possible
+    version, user = principal_cache.get(username)
+    if user is not None:
+        return user
+
     # Get user from database
     statement = select(User).where(User.username == username)
     user = session.exec(statement).first()
-    
+
     if user is None:
         raise credentials_exception
-    
-    return user
+
+    return principal_cache.put(user, version)
 
 # Get current active user
 async def get_current_active_user(
@@ -47,18 +55,33 @@ async def get_current_active_user(
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
+def _has_role(role: str, required_role: str) -> bool:
+    return role == required_role or role == "admin"
+
+def _insufficient_permissions(required_role: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail=f"Insufficient permissions. Required role: {required_role}"
+    )
+
 # Role-based access control
 def require_role(required_role: str):
     """Dependency to check user role"""
-    async def role_checker(current_user: Annotated[User, Depends(get_current_active_user)]):
-        if current_user.role != required_role and current_user.role != "admin":
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"Insufficient permissions. Required role: {required_role}"
-            )
+    async def role_checker(
+        payload: Annotated[dict, Depends(get_token_payload)],
+        current_user: Annotated[User, Depends(get_current_active_user)],
+    ):
+        # Tokens issued with JWT_EMBED_ROLE carry the role: a sufficient claim admits
+        # at once, anything else falls back to the stored (cached) role, so a user
+        # promoted since the token was issued is not turned away
+        claimed_role = payload.get("role")
+        if claimed_role is not None and _has_role(claimed_role, required_role):
+            return current_user
+        if not _has_role(current_user.role, required_role):
+            raise _insufficient_permissions(required_role)
         return current_user
     return role_checker
 
 # Specific role dependencies
 require_admin = require_role("admin")
-require_analyst = require_role("analyst")
\ No newline at end of file
+require_analyst = require_role("analyst")
@@ -1,18 +1,48 @@
-from typing import Annotated, List, Optional, Literal
+from datetime import date
+from typing import Annotated, Dict, List, Optional, Literal
 
-from fastapi import APIRouter, Depends, Query
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
-from sqlmodel import Session, select, func, cast, Integer, case
+from starlette.concurrency import run_in_threadpool
+from sqlmodel import Session, select, func, cast, Integer, bindparam, case
 
 from app.core.database import get_session
+from app.core.statements import statement_cache
+from app.core.response_store import cached_response
 from app.models.player import Player
 from app.models.team import Team
 from app.models.tournament import Tournament
 from app.models.match import Match
 from app.models.match_player_stats import MatchPlayerStats
+from app.models.player_game_metrics import PlayerGameMetrics
+from app.models.champion_patch_stats import ChampionPatchStats
+from app.models.trend_bucket import TrendBucket
+from app.models.current_rating import CurrentRating
+from app.models.rating_snapshot import RatingSnapshot
+from app.core.config import settings
+from app.schemas.form import FormStats
+from app.services.cohorts import METRICS, QUANTILES, cohort_index
+from app.services.dimensions import Dimensions, dimension_cache
+from app.services.form import form_index, summarize
+from app.services.matchups import matchup_index
+from app.services.metrics import kda, kda_column, share_column
+from app.services.scoring import ScoreExpressionError, compile_score
 
 router = APIRouter(prefix="/analytics", tags=["Analytics"])
 
+PlayerMetric = Literal["kda", "dpm", "cspm", "vision", "winrate", "kp"]
+ChampionSort = Literal["games", "win_rate", "kda", "dpm"]
+TrendEntity = Literal["player", "team", "champion"]
+TrendGranularity = Literal["week", "month", "patch", "split"]
+RatingEntity = Literal["team", "player"]
+FormMetric = Literal["win_rate", "kda", "kills", "dpm", "cspm", "vision"]
+MatchupSort = Literal["win_rate", "games", "gold_diff", "damage_diff"]
+TrendMetric = Literal[
+    "games", "winrate", "kda", "kills", "deaths", "assists",
+    "dpm", "cspm", "vision", "gold", "game_length",
+]
+
 class PlayerLeaderboardRow(BaseModel):
     player_id: str
     player_name: str
@@ -31,6 +61,11 @@ class PlayerLeaderboardRow(BaseModel):
     avg_cspm: Optional[float] = None
     avg_vision: Optional[float] = None
     win_rate: Optional[float] = None
+    kill_participation: Optional[float] = None  # Percent of the team's kills
+
+    # Percentile of metric_value among players of the same position, league, year and split;
+    # None when patch, champion, side or playoffs narrow the stats
+    percentile: Optional[float] = None
 
 class TeamLeaderboardRow(BaseModel):
     team_id: str
@@ -59,10 +94,109 @@ class DashboardStats(BaseModel):
     total_tournaments: int
     total_matches: int
 
+class ChampionMetaRow(BaseModel):
+    champion: str
+    patch: Optional[str] = None
+    league: Optional[str] = None
+    position: Optional[str] = None
+    games: int
+    wins: int
+    win_rate: float
+    avg_kills: float
+    avg_deaths: float
+    avg_assists: float
+    kda: float
+    avg_dpm: float
+
+class ChampionDetail(BaseModel):
+    champion: str
+    overall: ChampionMetaRow
+    by_patch: List[ChampionMetaRow]
+    by_league: List[ChampionMetaRow]
+    by_position: List[ChampionMetaRow]
+
+class TrendPoint(BaseModel):
+    bucket: str
+    bucket_start: date
+    games: int
+    value: float
+    smoothed: Optional[float] = None
+
+class TrendSeries(BaseModel):
+    entity_type: str
+    entity_id: str
+    metric: str
+    granularity: str
+    window: Optional[int] = None
+    points: List[TrendPoint]
+
+class HistogramBin(BaseModel):
+    lower: float
+    upper: float
+    count: int
+
+class CohortSummary(BaseModel):
+    position: Optional[str] = None
+    league: Optional[str] = None
+    year: Optional[int] = None
+    split: Optional[str] = None
+    metric: str
+    players: int
+    mean: float
+    quantiles: Dict[str, float]
+    histogram: List[HistogramBin]
+
+class CompositeRow(BaseModel):
+    player_id: str
+    player_name: str
+    position: Optional[str] = None
+    score: float
+    metrics: Dict[str, float]  # The cohort values of the metrics the expression uses
+
+class FormLeaderboardRow(BaseModel):
+    entity_id: str
+    name: str
+    position: Optional[str] = None
+    metric: str
+    metric_value: float
+    form: FormStats
+
+class RatingRow(BaseModel):
+    rank: int
+    entity_id: str
+    name: str
+    position: Optional[str] = None
+    rating: float
+    peak_rating: float
+    games: int
+    last_match_date: Optional[date] = None
+
+class RatingPoint(BaseModel):
+    match_id: str
+    match_date: date
+    game_number: int
+    rating_before: float
+    rating_after: float
+    change: float
+
+class RatingHistory(BaseModel):
+    entity_type: str
+    entity_id: str
+    points: List[RatingPoint]
+
+class MatchupRow(BaseModel):
+    champion: str
+    opponent: str
+    games: int
+    wins: int
+    win_rate: float
+    avg_gold_diff: float  # Champion's total gold minus the lane opponent's
+    avg_damage_diff: float
+
 @router.get("/leaderboard/players", response_model=List[PlayerLeaderboardRow])
 async def players_leaderboard(
     # Rankable metric
-    metric: Literal["kda", "dpm", "cspm", "vision", "winrate"] = Query("kda"),
+    metric: PlayerMetric = Query("kda"),
     year: Optional[int] = Query(None),
     league: Optional[str] = Query(None),
     split: Optional[str] = Query(None),
@@ -77,114 +211,181 @@ async def players_leaderboard(
     min_games: int = Query(5, ge=1, le=100),
     session: Annotated[Session, Depends(get_session)] = None,
 ):
+    params = dict(
+        metric=metric, year=year, league=league, split=split, playoffs=playoffs, patch=patch,
+        position=position, champion=champion, side=side, limit=limit, min_games=min_games,
+    )
+    # Served from precomputed / stored answers; identical concurrent misses share one query
+    return await cached_response("leaderboard/players", compute_players_leaderboard, session, params)
 
-    label_parts = []
-    if league:
-        label_parts.append(league)
-    if split:
-        label_parts.append(split)
+def _tournament_filters(
+    dimensions: Dimensions,
+    year: Optional[int],
+    league: Optional[str],
+    split: Optional[str],
+    playoffs: Optional[int],
+) -> list:
+    """Shared-category filters on Match without joining tournaments.
+
+    Tournaments are resolved to ids in the dimension cache; the year also
+    filters season on both fact tables so MySQL can prune partitions.
+    """
+    filters = []
     if year is not None:
-        label_parts.append(str(year))
-    tournament_label = " ".join(label_parts) if label_parts else "All data"
-    if playoffs == 1:
-        tournament_label += " (Playoffs)"
-    if patch:
-        tournament_label += f" • Patch {patch}"
+        filters += [Match.season == year, MatchPlayerStats.season == year]
+    if league or split or playoffs is not None or year is not None:
+        filters.append(Match.tournament_id.in_(dimensions.tournament_ids(league, year, split, playoffs)))
+    return filters
 
-    # Base query
+def _players_leaderboard_statement(metric, position, champion, side, season, by_tournament, patch):
+    """Players leaderboard query for one metric and combination of filters;
+    filter values, min_games and limit are bound per request"""
+    # Ids only, names come from the dimension cache
     base = (
         select(
-            Player.id.label("player_id"),
-            Player.player_name.label("player_name"),
-            Player.position.label("position"),
+            MatchPlayerStats.player_id,
             func.count(func.distinct(MatchPlayerStats.match_id)).label("games_played"),
         )
-        .join(MatchPlayerStats, Player.id == MatchPlayerStats.player_id)
         .join(Match, MatchPlayerStats.match_id == Match.id)
-        .join(Tournament, Match.tournament_id == Tournament.id)
-        .group_by(Player.id, Player.player_name, Player.position)
+        .outerjoin(
+            PlayerGameMetrics,
+            (PlayerGameMetrics.match_id == MatchPlayerStats.match_id)
+            & (PlayerGameMetrics.player_id == MatchPlayerStats.player_id),
+        )
+        .group_by(MatchPlayerStats.player_id)
     )
 
     # Player-only filters
     if position:
-        base = base.where(Player.position == position)
+        base = base.join(Player, MatchPlayerStats.player_id == Player.id).where(
+            Player.position == bindparam("position")
+        )
     if champion:
-        base = base.where(MatchPlayerStats.champion == champion)
+        base = base.where(MatchPlayerStats.champion == bindparam("champion"))
     if side:
-        base = base.where(MatchPlayerStats.side == side)
+        base = base.where(MatchPlayerStats.side == bindparam("side"))
 
-    # Shared-category filters
-    if year is not None:
-        base = base.where(Tournament.year == year)
-    if league:
-        base = base.where(Tournament.league == league)
-    if split:
-        base = base.where(Tournament.split == split)
-    if playoffs is not None:
-        base = base.where(Tournament.playoffs == playoffs)
+    # Shared-category filters, as in _tournament_filters
+    if season:
+        base = base.where(Match.season == bindparam("season"), MatchPlayerStats.season == bindparam("season"))
+    if by_tournament:
+        base = base.where(Match.tournament_id.in_(bindparam("tournament_ids", expanding=True)))
     if patch:
-        base = base.where(Match.patch == patch)
+        base = base.where(Match.patch == bindparam("patch"))
 
+    kills = func.coalesce(func.sum(MatchPlayerStats.kills), 0)
+    deaths = func.coalesce(func.sum(MatchPlayerStats.deaths), 0)
+    assists = func.coalesce(func.sum(MatchPlayerStats.assists), 0)
+    # Ranked in SQL on the same expressions the rows report
+    metrics = {
+        "kda": kda_column(kills, deaths, assists),
+        "dpm": func.avg(MatchPlayerStats.dpm),
+        "cspm": func.avg(MatchPlayerStats.cspm),
+        "vision": func.avg(MatchPlayerStats.visionscore),
+        "winrate": func.avg(cast(MatchPlayerStats.result, Integer)) * 100.0,
+        "kp": share_column(kills + assists, func.sum(PlayerGameMetrics.team_kills)) * 100.0,
+    }
+    metric_value = func.coalesce(metrics[metric], 0).label("metric_value")
     query = base.add_columns(
-        func.sum(MatchPlayerStats.kills).label("kills"),
-        func.sum(MatchPlayerStats.deaths).label("deaths"),
-        func.sum(MatchPlayerStats.assists).label("assists"),
-        func.avg(MatchPlayerStats.dpm).label("avg_dpm"),
-        func.avg(MatchPlayerStats.cspm).label("avg_cspm"),
-        func.avg(MatchPlayerStats.visionscore).label("avg_vision"),
-        func.avg(cast(MatchPlayerStats.result, Integer)).label("win_rate"),
+        kills.label("kills"),
+        deaths.label("deaths"),
+        assists.label("assists"),
+        metrics["dpm"].label("avg_dpm"),
+        metrics["cspm"].label("avg_cspm"),
+        metrics["vision"].label("avg_vision"),
+        metrics["winrate"].label("win_rate"),
+        metrics["kp"].label("kill_participation"),
+        metric_value,
+    )
+    return (
+        query.having(func.count(func.distinct(MatchPlayerStats.match_id)) >= bindparam("min_games"))
+        .order_by(metric_value.desc(), MatchPlayerStats.player_id)
+        .limit(bindparam("limit"))
     )
 
-    query = query.having(func.count(func.distinct(MatchPlayerStats.match_id)) >= min_games)
+def compute_players_leaderboard(
+    session: Session,
+    metric: str = "kda",
+    year: Optional[int] = None,
+    league: Optional[str] = None,
+    split: Optional[str] = None,
+    playoffs: Optional[int] = None,
+    patch: Optional[str] = None,
+    position: Optional[str] = None,
+    champion: Optional[str] = None,
+    side: Optional[str] = None,
+    limit: int = 10,
+    min_games: int = 5,
+) -> List[PlayerLeaderboardRow]:
+    label_parts = []
+    if league:
+        label_parts.append(league)
+    if split:
+        label_parts.append(split)
+    if year is not None:
+        label_parts.append(str(year))
+    tournament_label = " ".join(label_parts) if label_parts else "All data"
+    if playoffs == 1:
+        tournament_label += " (Playoffs)"
+    if patch:
+        tournament_label += f" • Patch {patch}"
+
+    dimensions = dimension_cache.get(wait=True)
+    by_tournament = bool(league or split or playoffs is not None or year is not None)
+    shape = (metric, bool(position), bool(champion), bool(side), year is not None, by_tournament, bool(patch))
+    query = statement_cache.get(("leaderboard/players", shape), lambda: _players_leaderboard_statement(*shape))
+    params = {
+        "position": position, "champion": champion, "side": side, "season": year, "patch": patch,
+        "tournament_ids": dimensions.tournament_ids(league, year, split, playoffs) if by_tournament else None,
+        "min_games": min_games, "limit": limit,
+    }
 
-    rows = session.exec(query).all()
+    rows = session.exec(query, params=params).all()
     results: List[PlayerLeaderboardRow] = []
+    # Cohorts cover whole splits of one year, so a value filtered further (or a
+    # split across years, which the cohort lookup widens to every split) has
+    # nothing comparable to rank against
+    filtered = patch or champion or side or playoffs is not None or (split and year is None)
+    cohorts = None if filtered else cohort_index.get(wait=True)
+    cohort = (position, league, year, split)
 
     for row in rows:
+        player = dimensions.players.get(row.player_id)
+        if player is None:
+            continue
         kills = int(row.kills or 0)
         deaths = int(row.deaths or 0)
         assists = int(row.assists or 0)
-        denom = deaths if deaths > 0 else 1
-        kda = (kills + assists) / denom
-
-        avg_dpm = float(row.avg_dpm or 0)
-        avg_cspm = float(row.avg_cspm or 0)
-        avg_vision = float(row.avg_vision or 0)
-        win_rate = float(row.win_rate or 0) * 100.0
-
-        # Ranking metric_value
-        if metric == "kda": metric_value = kda
-        elif metric == "dpm": metric_value = avg_dpm
-        elif metric == "cspm": metric_value = avg_cspm
-        elif metric == "vision": metric_value = avg_vision
-        elif metric == "winrate": metric_value = win_rate
-        else: metric_value = 0
+        value = float(row.metric_value or 0)
 
         results.append(
             PlayerLeaderboardRow(
                 player_id=row.player_id,
-                player_name=row.player_name,
-                position=row.position or "Unknown",
+                player_name=player.name,
+                position=player.position or "Unknown",
                 games_played=int(row.games_played or 0),
 
                 metric=metric,
-                metric_value=round(float(metric_value), 2),
+                metric_value=round(value, 2),
 
                 tournament_label=tournament_label,
                 total_kills=kills,
                 total_deaths=deaths,
                 total_assists=assists,
 
-                kda=round(float(kda), 2),
-                avg_dpm=round(avg_dpm, 2),
-                avg_cspm=round(avg_cspm, 2),
-                avg_vision=round(avg_vision, 2),
-                win_rate=round(win_rate, 2),
+                kda=round(kda(kills, deaths, assists), 2),
+                avg_dpm=round(float(row.avg_dpm or 0), 2),
+                avg_cspm=round(float(row.avg_cspm or 0), 2),
+                avg_vision=round(float(row.avg_vision or 0), 2),
+                win_rate=round(float(row.win_rate or 0), 2),
+                kill_participation=(
+                    round(float(row.kill_participation), 2) if row.kill_participation is not None else None
+                ),
+                percentile=cohorts.percentile(cohort, metric, value) if cohorts else None,
             )
         )
 
-    results.sort(key=lambda x: x.metric_value, reverse=True)
-    return results[:limit]
+    return results
 
 @router.get("/leaderboard/teams", response_model=List[TeamLeaderboardRow])
 async def teams_leaderboard(
@@ -201,6 +402,22 @@ async def teams_leaderboard(
     Team leaderboard ranked by win rate.
     Returns supporting metrics + tournament_label so users can verify filters.
     """
+    params = dict(
+        year=year, league=league, split=split, playoffs=playoffs, patch=patch,
+        limit=limit, min_matches=min_matches,
+    )
+    return await cached_response("leaderboard/teams", compute_teams_leaderboard, session, params)
+
+def compute_teams_leaderboard(
+    session: Session,
+    year: Optional[int] = None,
+    league: Optional[str] = None,
+    split: Optional[str] = None,
+    playoffs: Optional[int] = None,
+    patch: Optional[str] = None,
+    limit: int = 10,
+    min_matches: int = 5,
+) -> List[TeamLeaderboardRow]:
 
     # Build label so users can verify applied filters
     label_parts = []
@@ -217,31 +434,20 @@ async def teams_leaderboard(
     if patch:
         tournament_label += f" • Patch {patch}"
 
+    dimensions = dimension_cache.get(wait=True)
     team_per_match = (
         select(
-            Team.id.label("team_id"),
-            Team.team_name.label("team_name"),
+            MatchPlayerStats.team_id,
             Match.id.label("match_id"),
             case(
                 (func.sum(cast(MatchPlayerStats.result, Integer)) >= 3, 1),
                 else_=0,
             ).label("team_win"),
         )
-        .join(MatchPlayerStats, Team.id == MatchPlayerStats.team_id)
         .join(Match, MatchPlayerStats.match_id == Match.id)
-        .join(Tournament, Match.tournament_id == Tournament.id)
-        .group_by(Team.id, Team.team_name, Match.id)
+        .where(*_tournament_filters(dimensions, year, league, split, playoffs))
+        .group_by(MatchPlayerStats.team_id, Match.id)
     )
-
-    # Shared filters
-    if year is not None:
-        team_per_match = team_per_match.where(Tournament.year == year)
-    if league:
-        team_per_match = team_per_match.where(Tournament.league == league)
-    if split:
-        team_per_match = team_per_match.where(Tournament.split == split)
-    if playoffs is not None:
-        team_per_match = team_per_match.where(Tournament.playoffs == playoffs)
     if patch:
         team_per_match = team_per_match.where(Match.patch == patch)
 
@@ -250,11 +456,10 @@ async def teams_leaderboard(
     base = (
         select(
             subq.c.team_id,
-            subq.c.team_name,
             func.count(func.distinct(subq.c.match_id)).label("matches_played"),
             func.sum(cast(subq.c.team_win, Integer)).label("wins"),
         )
-        .group_by(subq.c.team_id, subq.c.team_name)
+        .group_by(subq.c.team_id)
         .having(func.count(func.distinct(subq.c.match_id)) >= min_matches)
     )
 
@@ -262,6 +467,9 @@ async def teams_leaderboard(
 
     results: List[TeamLeaderboardRow] = []
     for row in core_rows:
+        team_name = dimensions.team_name(row.team_id)
+        if team_name is None:
+            continue
         matches = int(row.matches_played or 0)
         wins = int(row.wins or 0)
         losses = matches - wins
@@ -270,7 +478,7 @@ async def teams_leaderboard(
         results.append(
             TeamLeaderboardRow(
                 team_id=row.team_id,
-                team_name=row.team_name,
+                team_name=team_name,
                 tournament_label=tournament_label,
                 matches_played=matches,
                 wins=wins,
@@ -282,6 +490,70 @@ async def teams_leaderboard(
     results.sort(key=lambda x: x.win_rate, reverse=True)
     return results[:limit]
 
+# FormStats field ranked by each form leaderboard metric
+_FORM_METRICS = {
+    "win_rate": "win_rate",
+    "kda": "avg_kda",
+    "kills": "avg_kills",
+    "dpm": "avg_dpm",
+    "cspm": "avg_cspm",
+    "vision": "avg_vision",
+}
+
+@router.get("/leaderboard/form", response_model=List[FormLeaderboardRow])
+async def form_leaderboard(
+    entity_type: RatingEntity = Query("player"),
+    metric: FormMetric = Query("kda"),
+    window: int = Query(10, ge=1, le=settings.FORM_RING_SIZE),
+    position: Optional[str] = Query(None),
+    limit: int = Query(10, ge=1, le=100),
+    session: Annotated[Session, Depends(get_session)] = None,
+):
+    """
+    Players or teams ranked on their last `window` games.
+    Served from the in-memory rings of recent box scores; only entities with
+    a full window are ranked.
+    """
+    params = dict(entity_type=entity_type, metric=metric, window=window, position=position, limit=limit)
+    return await cached_response("leaderboard/form", compute_form_leaderboard, session, params)
+
+def compute_form_leaderboard(
+    session: Session,
+    entity_type: str = "player",
+    metric: str = "kda",
+    window: int = 10,
+    position: Optional[str] = None,
+    limit: int = 10,
+) -> List[FormLeaderboardRow]:
+    index = form_index.get(wait=True)
+    rings = index.players if entity_type == "player" else index.teams
+
+    ranked = []
+    for entity_id, ring in rings.items():
+        if len(ring) < window:
+            continue
+        if position and index.positions.get(entity_id) != position:
+            continue
+        form = summarize(index.last(rings, entity_id, window), window)
+        ranked.append((getattr(form, _FORM_METRICS[metric]), entity_id, form))
+    ranked.sort(key=lambda x: x[0], reverse=True)
+    ranked = ranked[:limit]
+
+    dimensions = dimension_cache.get(wait=True)
+    name = dimensions.player_name if entity_type == "player" else dimensions.team_name
+
+    return [
+        FormLeaderboardRow(
+            entity_id=entity_id,
+            name=name(entity_id) or "",
+            position=index.positions.get(entity_id) if entity_type == "player" else None,
+            metric=metric,
+            metric_value=value,
+            form=form,
+        )
+        for value, entity_id, form in ranked
+    ]
+
 @router.get("/leaderboard/tournaments", response_model=List[TournamentLeaderboardRow])
 async def tournaments_leaderboard(
     # Rankable tournament metrics
@@ -306,37 +578,35 @@ async def tournaments_leaderboard(
     - total_teams: number of distinct teams
     - avg_game_duration: average match duration (seconds)
     """
+    params = dict(
+        metric=metric, year=year, league=league, split=split, playoffs=playoffs, patch=patch,
+        limit=limit,
+    )
+    return await cached_response("leaderboard/tournaments", compute_tournaments_leaderboard, session, params)
 
+def compute_tournaments_leaderboard(
+    session: Session,
+    metric: str = "total_matches",
+    year: Optional[int] = None,
+    league: Optional[str] = None,
+    split: Optional[str] = None,
+    playoffs: Optional[int] = None,
+    patch: Optional[str] = None,
+    limit: int = 10,
+) -> List[TournamentLeaderboardRow]:
+
+    dimensions = dimension_cache.get(wait=True)
     base = (
         select(
-            Tournament.id.label("tournament_id"),
-            Tournament.league.label("league"),
-            Tournament.year.label("year"),
-            Tournament.split.label("split"),
+            Match.tournament_id,
             func.count(func.distinct(Match.id)).label("total_matches"),
-            func.count(func.distinct(Team.id)).label("total_teams"),
-            func.avg(Match.game_duration).label("avg_game_duration"),
+            func.count(func.distinct(MatchPlayerStats.team_id)).label("total_teams"),
+            func.avg(Match.game_length).label("avg_game_duration"),
         )
-        .join(Match, Match.tournament_id == Tournament.id)
         .join(MatchPlayerStats, Match.id == MatchPlayerStats.match_id)
-        .join(Team, MatchPlayerStats.team_id == Team.id)
-        .group_by(
-            Tournament.id,
-            Tournament.league,
-            Tournament.year,
-            Tournament.split,
-        )
+        .where(*_tournament_filters(dimensions, year, league, split, playoffs))
+        .group_by(Match.tournament_id)
     )
-
-    # Shared-category filters
-    if year is not None:
-        base = base.where(Tournament.year == year)
-    if league:
-        base = base.where(Tournament.league == league)
-    if split:
-        base = base.where(Tournament.split == split)
-    if playoffs is not None:
-        base = base.where(Tournament.playoffs == playoffs)
     if patch:
         base = base.where(Match.patch == patch)
 
@@ -345,6 +615,9 @@ async def tournaments_leaderboard(
     results: List[TournamentLeaderboardRow] = []
 
     for row in rows:
+        tournament = dimensions.tournaments.get(row.tournament_id)
+        if tournament is None:
+            continue
         if metric == "total_matches":
             metric_value = row.total_matches
         elif metric == "total_teams":
@@ -353,7 +626,7 @@ async def tournaments_leaderboard(
             metric_value = float(row.avg_game_duration or 0)
         else:
             metric_value = 0
-        tournament_label = f"{row.league} {row.split} {row.year}"
+        tournament_label = f"{tournament.league} {tournament.split} {tournament.year}"
         
         if playoffs == 1:
             tournament_label += " (Playoffs)"
@@ -361,10 +634,10 @@ async def tournaments_leaderboard(
             tournament_label += f" • Patch {patch}"
         results.append(
             TournamentLeaderboardRow(
-                 tournament_id=row.tournament_id,
-                league=row.league,
-                year=row.year,
-                split=row.split,
+                tournament_id=row.tournament_id,
+                league=tournament.league,
+                year=tournament.year,
+                split=tournament.split,
                 tournament_label=tournament_label,
                 metric=metric,
                 metric_value=round(float(metric_value), 2),
@@ -381,6 +654,442 @@ async def tournaments_leaderboard(
     results.sort(key=lambda x: x.metric_value, reverse=True)
     return results[:limit]
 
+def _patch_key(patch: Optional[str]):
+    """Sort patches numerically (14.9 before 14.10)"""
+    return [int(part) if part.isdigit() else 0 for part in (patch or "").split(".")]
+
+def _champion_row(champion: str, games, wins, kills, deaths, assists, dpm_sum, **labels) -> ChampionMetaRow:
+    games = int(games or 0)
+    wins = int(wins or 0)
+    kills = int(kills or 0)
+    deaths = int(deaths or 0)
+    assists = int(assists or 0)
+
+    return ChampionMetaRow(
+        champion=champion,
+        games=games,
+        wins=wins,
+        win_rate=round(wins / games * 100, 2) if games else 0.0,
+        avg_kills=round(kills / games, 2) if games else 0.0,
+        avg_deaths=round(deaths / games, 2) if games else 0.0,
+        avg_assists=round(assists / games, 2) if games else 0.0,
+        kda=round(kda(kills, deaths, assists), 2),
+        avg_dpm=round(float(dpm_sum or 0) / games, 2) if games else 0.0,
+        **labels,
+    )
+
+@router.get("/champions", response_model=List[ChampionMetaRow])
+async def champion_meta(
+    patch: Optional[str] = Query(None),
+    league: Optional[str] = Query(None),
+    position: Optional[str] = Query(None),
+    min_games: int = Query(10, ge=1),
+    sort_by: ChampionSort = Query("games"),
+    limit: int = Query(50, ge=1, le=200),
+    session: Annotated[Session, Depends(get_session)] = None,
+):
+    """
+    Champion win rate, picks and average KDA/DPM by patch, league and position.
+    Read from the champion_patch_stats aggregate maintained by ingest.
+    """
+    params = dict(
+        patch=patch, league=league, position=position, min_games=min_games,
+        sort_by=sort_by, limit=limit,
+    )
+    return await cached_response("analytics/champions", compute_champion_meta, session, params)
+
+def compute_champion_meta(
+    session: Session,
+    patch: Optional[str] = None,
+    league: Optional[str] = None,
+    position: Optional[str] = None,
+    min_games: int = 10,
+    sort_by: str = "games",
+    limit: int = 50,
+) -> List[ChampionMetaRow]:
+    statement = (
+        select(
+            ChampionPatchStats.champion,
+            func.sum(ChampionPatchStats.games).label("games"),
+            func.sum(ChampionPatchStats.wins).label("wins"),
+            func.sum(ChampionPatchStats.kills).label("kills"),
+            func.sum(ChampionPatchStats.deaths).label("deaths"),
+            func.sum(ChampionPatchStats.assists).label("assists"),
+            func.sum(ChampionPatchStats.dpm_sum).label("dpm_sum"),
+        )
+        .group_by(ChampionPatchStats.champion)
+        .having(func.sum(ChampionPatchStats.games) >= min_games)
+    )
+    if patch:
+        statement = statement.where(ChampionPatchStats.patch == patch)
+    if league:
+        statement = statement.where(ChampionPatchStats.league == league)
+    if position:
+        statement = statement.where(ChampionPatchStats.position == position)
+
+    results = [
+        _champion_row(**row._mapping, patch=patch, league=league, position=position)
+        for row in session.exec(statement).all()
+    ]
+
+    sort_keys = {
+        "games": lambda x: x.games,
+        "win_rate": lambda x: x.win_rate,
+        "kda": lambda x: x.kda,
+        "dpm": lambda x: x.avg_dpm,
+    }
+    results.sort(key=sort_keys[sort_by], reverse=True)
+    return results[:limit]
+
+@router.get("/champions/{champion}", response_model=ChampionDetail)
+async def champion_detail(
+    champion: str,
+    patch: Optional[str] = Query(None),
+    league: Optional[str] = Query(None),
+    session: Annotated[Session, Depends(get_session)] = None,
+):
+    """Champion stats overall and split by patch, league and position"""
+    params = dict(champion=champion, patch=patch, league=league)
+    result = await cached_response("analytics/champions/detail", compute_champion_detail, session, params)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Champion not found")
+    return result
+
+def compute_champion_detail(
+    session: Session,
+    champion: str,
+    patch: Optional[str] = None,
+    league: Optional[str] = None,
+) -> Optional[ChampionDetail]:
+    statement = select(ChampionPatchStats).where(ChampionPatchStats.champion == champion)
+    if patch:
+        statement = statement.where(ChampionPatchStats.patch == patch)
+    if league:
+        statement = statement.where(ChampionPatchStats.league == league)
+
+    rows = session.exec(statement).all()
+    if not rows:
+        return None
+
+    # Roll the (patch, league, position) cells up along each dimension
+    stat_fields = ("games", "wins", "kills", "deaths", "assists", "dpm_sum")
+    overall = dict.fromkeys(stat_fields, 0)
+    splits = {"patch": {}, "league": {}, "position": {}}
+    for row in rows:
+        for name in stat_fields:
+            overall[name] += getattr(row, name)
+        for dimension, groups in splits.items():
+            totals = groups.setdefault(getattr(row, dimension), dict.fromkeys(stat_fields, 0))
+            for name in stat_fields:
+                totals[name] += getattr(row, name)
+
+    def split_rows(dimension):
+        return [
+            _champion_row(champion, **totals, **{dimension: value or None})
+            for value, totals in splits[dimension].items()
+        ]
+
+    by_patch = split_rows("patch")
+    by_patch.sort(key=lambda x: _patch_key(x.patch), reverse=True)
+    by_league = sorted(split_rows("league"), key=lambda x: x.games, reverse=True)
+    by_position = sorted(split_rows("position"), key=lambda x: x.games, reverse=True)
+
+    return ChampionDetail(
+        champion=champion,
+        overall=_champion_row(champion, **overall, patch=patch, league=league),
+        by_patch=by_patch,
+        by_league=by_league,
+        by_position=by_position,
+    )
+
+# (numerator, denominator) of each trend metric over a bucket's totals.
+# Team buckets sum all five players, so per-game averages use games as the
+# denominator and read as team totals per game.
+_TREND_METRICS = {
+    "games": lambda b: (b.games, 1),
+    "winrate": lambda b: (b.wins * 100, b.games),
+    "kda": lambda b: (b.kills + b.assists, b.deaths or 1),
+    "kills": lambda b: (b.kills, b.games),
+    "deaths": lambda b: (b.deaths, b.games),
+    "assists": lambda b: (b.assists, b.games),
+    "dpm": lambda b: (b.dpm_sum, b.games),
+    "cspm": lambda b: (b.cspm_sum, b.games),
+    "vision": lambda b: (b.vision_sum, b.games),
+    "gold": lambda b: (b.gold_sum, b.games),
+    "game_length": lambda b: (b.game_length_sum / 60, b.games),  # Minutes
+}
+
+@router.get("/trends/{entity_type}/{entity_id}", response_model=TrendSeries)
+async def trend_series(
+    entity_type: TrendEntity,
+    entity_id: str,
+    metric: TrendMetric = Query("winrate"),
+    granularity: TrendGranularity = Query("month"),
+    # Rolling smoothing over the last N buckets, weighted by games
+    window: Optional[int] = Query(None, ge=2, le=52),
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    session: Annotated[Session, Depends(get_session)] = None,
+):
+    """
+    Metric series for a player, team or champion by week, month, patch or split.
+    Read from the trend_buckets aggregate maintained by ingest.
+    """
+    params = dict(
+        entity_type=entity_type, entity_id=entity_id, metric=metric, granularity=granularity,
+        window=window, date_from=date_from, date_to=date_to,
+    )
+    result = await cached_response("analytics/trends", compute_trend_series, session, params)
+    if result is None:
+        raise HTTPException(status_code=404, detail="No games found")
+    return result
+
+def compute_trend_series(
+    session: Session,
+    entity_type: str,
+    entity_id: str,
+    metric: str = "winrate",
+    granularity: str = "month",
+    window: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> Optional[TrendSeries]:
+    statement = (
+        select(TrendBucket)
+        .where(
+            TrendBucket.entity_type == entity_type,
+            TrendBucket.entity_id == entity_id,
+            TrendBucket.granularity == granularity,
+        )
+        .order_by(TrendBucket.bucket_start)
+    )
+    if date_from:
+        statement = statement.where(TrendBucket.bucket_start >= date_from)
+    if date_to:
+        statement = statement.where(TrendBucket.bucket_start <= date_to)
+
+    buckets = session.exec(statement).all()
+    if not buckets:
+        return None
+    if granularity == "patch":
+        # Patch buckets start at their first game; order by version instead
+        buckets.sort(key=lambda b: _patch_key(b.bucket))
+
+    ratio = _TREND_METRICS[metric]
+    points = []
+    # Smoothing sums numerators and denominators over the window rather than
+    # averaging bucket values, so a 2-game week does not weigh like a 20-game one
+    window_parts = []
+    for bucket in buckets:
+        numerator, denominator = ratio(bucket)
+        point = TrendPoint(
+            bucket=bucket.bucket,
+            bucket_start=bucket.bucket_start,
+            games=bucket.games,
+            value=round(numerator / denominator, 2) if denominator else 0.0,
+        )
+        if window:
+            window_parts.append((numerator, denominator))
+            window_parts = window_parts[-window:]
+            window_denominator = sum(part[1] for part in window_parts)
+            if window_denominator:
+                point.smoothed = round(sum(part[0] for part in window_parts) / window_denominator, 2)
+        points.append(point)
+
+    return TrendSeries(
+        entity_type=entity_type,
+        entity_id=entity_id,
+        metric=metric,
+        granularity=granularity,
+        window=window,
+        points=points,
+    )
+
+@router.get("/cohorts", response_model=CohortSummary)
+async def cohort_summary(
+    metric: PlayerMetric = Query("kda"),
+    position: Optional[str] = Query(None),
+    league: Optional[str] = Query(None),
+    year: Optional[int] = Query(None),
+    split: Optional[str] = Query(None),
+    bins: int = Query(10, ge=1, le=50),
+):
+    """
+    Distribution of a player metric within a position x league x year x split cohort.
+    Served from in-memory sorted arrays rebuilt on each data version.
+    """
+    cohorts = await run_in_threadpool(cohort_index.get)
+    cohort = cohorts.get(position, league, year, split)
+    if not cohort:
+        raise HTTPException(status_code=404, detail="No players in this cohort")
+
+    values = cohort.sorted_values[metric]
+    counts, edges = np.histogram(values, bins=bins)
+    return CohortSummary(
+        position=position,
+        league=league,
+        year=year,
+        split=split if year is not None else None,
+        metric=metric,
+        players=len(cohort),
+        mean=round(float(values.mean()), 2),
+        quantiles={f"p{q}": round(float(value), 2) for q, value in zip(QUANTILES, np.percentile(values, QUANTILES))},
+        histogram=[
+            HistogramBin(lower=round(float(edges[i]), 2), upper=round(float(edges[i + 1]), 2), count=int(count))
+            for i, count in enumerate(counts)
+        ],
+    )
+
+@router.get("/leaderboard/composite", response_model=List[CompositeRow])
+async def composite_leaderboard(
+    expression: str = Query(..., max_length=500, description='e.g. "0.4*z(dpm) + 0.3*z(kp) + 0.3*z(vision)"'),
+    position: Optional[str] = Query(None),
+    league: Optional[str] = Query(None),
+    year: Optional[int] = Query(None),
+    split: Optional[str] = Query(None),
+    limit: int = Query(10, ge=1, le=100),
+):
+    """
+    Players ranked by a weighted formula over the cohort metrics
+    (kda, dpm, cspm, vision, winrate, kp). z() and pct() normalize within the
+    position x league x year x split cohort; +, -, *, /, **, abs, log, min and
+    max are also allowed. Scored in one numpy pass over the cohort matrix.
+    """
+    try:
+        score = compile_score(expression)
+    except ScoreExpressionError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    cohorts = await run_in_threadpool(cohort_index.get)
+    cohort = cohorts.get(position, league, year, split)
+    if not cohort:
+        raise HTTPException(status_code=404, detail="No players in this cohort")
+    dimensions = await run_in_threadpool(dimension_cache.get)
+
+    columns = {metric: METRICS.index(metric) for metric in sorted(score.metrics)}
+    rows = []
+    for row, value in score.top(cohort, limit):
+        player_id = cohort.player_ids[row]
+        rows.append(CompositeRow(
+            player_id=player_id,
+            player_name=dimensions.player_name(player_id) or "Unknown",
+            position=dimensions.player_position(player_id),
+            score=round(value, 4),
+            metrics={metric: round(float(cohort.matrix[row, column]), 2) for metric, column in columns.items()},
+        ))
+    return rows
+
+@router.get("/ratings/{entity_type}", response_model=List[RatingRow])
+async def rating_leaderboard(
+    entity_type: RatingEntity,
+    position: Optional[str] = Query(None),
+    min_games: int = Query(10, ge=1),
+    limit: int = Query(20, ge=1, le=200),
+    session: Annotated[Session, Depends(get_session)] = None,
+):
+    """
+    Teams or players ranked by Elo rating (opponent-strength aware).
+    Read from the current_ratings table maintained by ingest.
+    """
+    params = dict(entity_type=entity_type, position=position, min_games=min_games, limit=limit)
+    return await cached_response("analytics/ratings", compute_rating_leaderboard, session, params)
+
+def compute_rating_leaderboard(
+    session: Session,
+    entity_type: str,
+    position: Optional[str] = None,
+    min_games: int = 10,
+    limit: int = 20,
+) -> List[RatingRow]:
+    dimensions = dimension_cache.get(wait=True)
+    statement = select(CurrentRating)
+    if entity_type == "player" and position:
+        statement = statement.join(Player, CurrentRating.entity_id == Player.id).where(Player.position == position)
+
+    statement = (
+        statement
+        .where(CurrentRating.entity_type == entity_type, CurrentRating.games >= min_games)
+        .order_by(CurrentRating.rating.desc())
+        .limit(limit)
+    )
+
+    return [
+        RatingRow(
+            rank=rank,
+            entity_id=rating.entity_id,
+            name=(
+                dimensions.player_name(rating.entity_id) if entity_type == "player"
+                else dimensions.team_name(rating.entity_id)
+            ) or "",
+            position=dimensions.player_position(rating.entity_id) if entity_type == "player" else None,
+            rating=round(rating.rating, 1),
+            peak_rating=round(rating.peak_rating, 1),
+            games=rating.games,
+            last_match_date=rating.last_match_date,
+        )
+        for rank, rating in enumerate(session.exec(statement).all(), start=1)
+    ]
+
+@router.get("/ratings/{entity_type}/{entity_id}/history", response_model=RatingHistory)
+async def rating_history(
+    entity_type: RatingEntity,
+    entity_id: str,
+    date_from: Optional[date] = Query(None),
+    date_to: Optional[date] = Query(None),
+    session: Annotated[Session, Depends(get_session)] = None,
+):
+    """Rating after every game of a team or player, oldest first"""
+    statement = (
+        select(RatingSnapshot)
+        .where(RatingSnapshot.entity_type == entity_type, RatingSnapshot.entity_id == entity_id)
+        .order_by(RatingSnapshot.match_date, RatingSnapshot.game_number, RatingSnapshot.match_id)
+    )
+    if date_from:
+        statement = statement.where(RatingSnapshot.match_date >= date_from)
+    if date_to:
+        statement = statement.where(RatingSnapshot.match_date <= date_to)
+
+    snapshots = session.exec(statement).all()
+    if not snapshots and not (date_from or date_to):
+        raise HTTPException(status_code=404, detail="No rated games found")
+
+    return RatingHistory(
+        entity_type=entity_type,
+        entity_id=entity_id,
+        points=[
+            RatingPoint(
+                match_id=snapshot.match_id,
+                match_date=snapshot.match_date,
+                game_number=snapshot.game_number,
+                rating_before=round(snapshot.rating_before, 1),
+                rating_after=round(snapshot.rating_after, 1),
+                change=round(snapshot.rating_after - snapshot.rating_before, 1),
+            )
+            for snapshot in snapshots
+        ],
+    )
+
+@router.get("/matchups", response_model=List[MatchupRow])
+async def champion_matchups(
+    position: str = Query(..., description="Lane, e.g. top, jng, mid, bot, sup"),
+    patch: Optional[str] = Query(None, description="One patch; every patch when omitted"),
+    champion: Optional[str] = Query(None),
+    opponent: Optional[str] = Query(None),
+    min_games: int = Query(3, ge=1),
+    sort_by: MatchupSort = Query("win_rate"),
+    limit: int = Query(50, ge=1, le=500),
+):
+    """
+    How champions fare against their lane opponent: win rate and gold / damage
+    differential per champion pair. Sliced from in-memory champion x champion
+    matrices per position and patch, rebuilt on each data version.
+    """
+    index = await run_in_threadpool(matchup_index.get)
+    matrix = index.get(position, patch)
+    if matrix is None:
+        raise HTTPException(status_code=404, detail="No matchups for this position and patch")
+    return matrix.matchups(champion, opponent, min_games, sort_by, limit)
+
 @router.get("/dashboard", response_model=DashboardStats)
 async def get_dashboard_stats(session: Annotated[Session, Depends(get_session)] = None):
     """
@@ -4,13 +4,25 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlmodel import Session, select
 from app.core.database import get_session
-from app.core.security import verify_password, get_password_hash, create_access_token
+from app.core.security import (
+    PasswordHashingBusy,
+    create_access_token,
+    get_password_hash_async,
+    verify_and_update_password_async,
+)
 from app.core.config import settings
 from app.models.user import User
 from app.schemas.user import Token, UserCreate, UserResponse
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
+def _hashing_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many authentication requests in progress, please retry",
+        headers={"Retry-After": "1"},
+    )
+
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def register(
     user_data: UserCreate,
@@ -36,7 +48,10 @@ async def register(
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    try:
+        hashed_password = await get_password_hash_async(user_data.password)
+    except PasswordHashingBusy:
+        raise _hashing_busy()
     db_user = User(
         username=user_data.username,
         email=user_data.email,
@@ -61,7 +76,16 @@ async def login(
     user = session.exec(statement).first()
     
     # Verify credentials
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    valid, updated_hash = False, None
+    if user:
+        try:
+            valid, updated_hash = await verify_and_update_password_async(
+                form_data.password, user.hashed_password
+            )
+        except PasswordHashingBusy:
+            raise _hashing_busy()
+
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -74,12 +98,19 @@ async def login(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Inactive user"
         )
+
+    # Upgrade the stored hash when the hashing parameters have changed
+    if updated_hash is not None:
+        user.hashed_password = updated_hash
+        session.add(user)
+        session.commit()
     
     # Create access token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": user.username},
-        expires_delta=access_token_expires
+        expires_delta=access_token_expires,
+        role=user.role,
     )
     
     return Token(access_token=access_token, token_type="bearer")
\ No newline at end of file
@@ -1,12 +1,17 @@
 from datetime import date
-from typing import Annotated, List
+from typing import Annotated, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlmodel import Session, select
+from sqlmodel import Session, bindparam, select, update
+from starlette.concurrency import run_in_threadpool
 
 from app.api.deps import get_current_active_user, require_admin
+from app.api.sparse import columns_for, fetch_rows, get_batch_ids, sparse_fields, sparse_item, sparse_response
+from app.core.data_version import bump_data_version
 from app.core.database import get_session
+from app.core.statements import statement_cache
 from app.models.match import Match
+from app.models.match_card import MatchCard
 from app.models.match_player_stats import MatchPlayerStats
 from app.models.player import Player
 from app.models.team import Team
@@ -17,10 +22,55 @@ from app.schemas.match_player_stats import (
     MatchPlayerStatsCreate,
     MatchPlayerStatsResponse,
 )
+from app.services.cascades import delete_matches
+from app.services.dimensions import dimension_cache
+from app.services.ingest import apply_stat_changes, collect_stat_change
+from app.services.match_cards import card_match, card_team_names, card_teams, refresh_match_cards
 
 router = APIRouter(prefix="/matches", tags=["Matches"])
 
 
+def find_match(session: Session, match_id: str) -> Optional[Match]:
+    """Match by id; the primary key also holds the season, so session.get needs both"""
+    return session.exec(select(Match).where(Match.id == match_id)).first()
+
+
+def _card_columns(fields):
+    """MatchCard columns of a sparse match; team_names is built from both team names"""
+    required = ["id"] + (["blue_team_name", "red_team_name"] if "team_names" in fields else [])
+    return columns_for(MatchCard, fields, required=required)
+
+
+def _list_matches_statement(fields, ids, tournament_id, date_from, date_to, sort_by, descending, paginated):
+    """list_matches query for one combination of filters; values are bound per request"""
+    # match_cards already holds the tournament label and both teams: one indexed read
+    if fields:
+        statement = select(*_card_columns(fields))
+    else:
+        statement = select(MatchCard)
+
+    # Add filters
+    if ids:
+        statement = statement.where(MatchCard.id.in_(bindparam("ids", expanding=True)))
+    if tournament_id:
+        statement = statement.where(MatchCard.tournament_id == bindparam("tournament_id"))
+    if date_from:
+        statement = statement.where(MatchCard.match_date >= bindparam("date_from"))
+    if date_to:
+        statement = statement.where(MatchCard.match_date <= bindparam("date_to"))
+
+    # Add sorting (sort_by is already resolved to a MatchCard column)
+    sort_column = getattr(MatchCard, sort_by)
+    if descending:
+        statement = statement.order_by(sort_column.desc(), MatchCard.game_number.asc())
+    else:
+        statement = statement.order_by(sort_column.asc(), MatchCard.game_number.asc())
+
+    if paginated:
+        statement = statement.offset(bindparam("skip")).limit(bindparam("limit"))
+    return statement
+
+
 @router.get("/", response_model=List[MatchResponse])
 async def list_matches(
     skip: int = Query(0, ge=0),
@@ -30,85 +80,56 @@ async def list_matches(
     date_to: date = Query(None, description="Filter by end date"),
     sort_by: str = Query("match_date", description="Sort by field (match_date, game_length, patch)"),
     sort_order: str = Query("desc", description="Sort order (asc, desc)"),
+    ids: Annotated[Optional[List[str]], Depends(get_batch_ids)] = None,
+    fields: Annotated[Optional[List[str]], Depends(sparse_fields(MatchCard, extra=["team_names"]))] = None,
     session: Annotated[Session, Depends(get_session)] = None,
 ):
     """Get all matches (Public access)"""
-    statement = select(Match)
+    descending = sort_order.lower() == "desc"
+    # Only real columns reach the statement cache key; anything else sorts by date as before
+    sort_by = sort_by if sort_by in MatchCard.__table__.columns else "match_date"
+    paginated = not ids  # A batch returns every requested id
+    shape = (
+        tuple(fields) if fields else None, bool(ids), bool(tournament_id), bool(date_from), bool(date_to),
+        sort_by, descending, paginated,
+    )
+    statement = statement_cache.get(("matches/list", shape), lambda: _list_matches_statement(*shape))
+    params = {
+        "ids": ids, "tournament_id": tournament_id, "date_from": date_from, "date_to": date_to,
+        "skip": skip, "limit": limit,
+    }
 
-    # Add filters
-    if tournament_id:
-        statement = statement.where(Match.tournament_id == tournament_id)
-    if date_from:
-        statement = statement.where(Match.match_date >= date_from)
-    if date_to:
-        statement = statement.where(Match.match_date <= date_to)
-
-    # Add sorting
-    if sort_by:
-        sort_column = getattr(Match, sort_by, Match.match_date)
-        if sort_order.lower() == "desc":
-            statement = statement.order_by(sort_column.desc(), Match.game_number.asc())
-        else:
-            statement = statement.order_by(sort_column.asc(), Match.game_number.asc())
-    else:
-        statement = statement.order_by(Match.match_date.asc(), Match.game_number.dsc())
-
-    # Add pagination
-    statement = statement.offset(skip).limit(limit)
-
-    matches = session.exec(statement).all()
-    
-    # Efficiently get teams for all matches in one query
-    match_ids = [m.id for m in matches]
-    if match_ids:
-        team_statement = (
-            select(MatchPlayerStats.match_id, Team.team_name)
-            .join(Team, MatchPlayerStats.team_id == Team.id)
-            .where(MatchPlayerStats.match_id.in_(match_ids))
-            .distinct()
-        )
-        team_results = session.exec(team_statement).all()
-        
-        # Group teams by match_id
-        match_teams = {}
-        for match_id, team_name in team_results:
-            if match_id not in match_teams:
-                match_teams[match_id] = []
-            if len(match_teams[match_id]) < 2:  # Only keep 2 teams
-                match_teams[match_id].append(team_name)
-        
-        # Enrich matches with team names
-        enriched_matches = []
-        for match in matches:
-            match_dict = match.model_dump()
-            match_dict["team_names"] = match_teams.get(match.id, [])
-            enriched_matches.append(MatchResponse(**match_dict))
-        
-        return enriched_matches
-    
-    return matches
+    if fields:
+        rows = fetch_rows(session, statement, params)
+        if "team_names" in fields:
+            for row in rows:
+                row["team_names"] = card_team_names(row)
+        return sparse_response(rows, fields)
+
+    cards = session.exec(statement, params=params).all()
+    return [MatchResponse(**card.model_dump(), team_names=card_team_names(card)) for card in cards]
 
 
 @router.get("/{match_id}", response_model=MatchResponse)
-async def get_match(match_id: str, session: Annotated[Session, Depends(get_session)]):
+async def get_match(
+    match_id: str,
+    fields: Annotated[Optional[List[str]], Depends(sparse_fields(MatchCard, extra=["team_names"]))] = None,
+    session: Annotated[Session, Depends(get_session)] = None,
+):
     """Get match details (Public access)"""
-    match = session.get(Match, match_id)
-    if not match:
+    if fields:
+        rows = fetch_rows(session, select(*_card_columns(fields)).where(MatchCard.id == match_id))
+        if not rows:
+            raise HTTPException(status_code=404, detail="Match not found")
+        if "team_names" in fields:
+            rows[0]["team_names"] = card_team_names(rows[0])
+        return sparse_item(rows[0], fields)
+
+    card = session.get(MatchCard, match_id)
+    if not card:
         raise HTTPException(status_code=404, detail="Match not found")
 
-    # Get teams for this match
-    team_statement = (
-        select(Team.team_name)
-        .join(MatchPlayerStats, MatchPlayerStats.team_id == Team.id)
-        .where(MatchPlayerStats.match_id == match.id)
-        .distinct()
-    )
-    team_names = session.exec(team_statement).all()
-
-    match_dict = match.model_dump()
-    match_dict["team_names"] = list(team_names)
-
-    return MatchResponse(**match_dict)
+    return MatchResponse(**card.model_dump(), team_names=card_team_names(card))
 
 
 @router.get("/{match_id}/details")
@@ -116,42 +137,20 @@ async def get_match_details(
     match_id: str, session: Annotated[Session, Depends(get_session)]
 ):
     """Get comprehensive match details including tournament info"""
-    match = session.get(Match, match_id)
-    if not match:
+    card = session.get(MatchCard, match_id)
+    if not card:
         raise HTTPException(status_code=404, detail="Match not found")
 
-    # Get tournament info
-    tournament = session.get(Tournament, match.tournament_id)
-
-    # Get team stats
-    team_stats_statement = (
-        select(
-            Team.id,
-            Team.team_name,
-            MatchPlayerStats.side,
-            MatchPlayerStats.result,
-        )
-        .join(MatchPlayerStats, MatchPlayerStats.team_id == Team.id)
-        .where(MatchPlayerStats.match_id == match_id)
-        .distinct()
-    )
-
-    team_results = session.exec(team_stats_statement).all()
-
-    teams = {}
-    for team_id, team_name, side, result in team_results:
-        if team_id not in teams:
-            teams[team_id] = {
-                "team_id": team_id,
-                "team_name": team_name,
-                "side": side,
-                "result": result,
-            }
-
     return {
-        "match": match.model_dump(),
-        "tournament": tournament.model_dump() if tournament else None,
-        "teams": list(teams.values()),
+        "match": card_match(card),
+        "tournament": {
+            "id": card.tournament_id,
+            "league": card.league,
+            "year": card.year,
+            "split": card.split,
+            "playoffs": card.playoffs,
+        } if card.league is not None else None,
+        "teams": card_teams(card),
     }
 
 
@@ -162,9 +161,14 @@ async def create_match(
     current_user: Annotated[User, Depends(require_admin)],
 ):
     """Create new match (Admin only)"""
+    tournament = session.get(Tournament, match_data.tournament_id)
+    if not tournament:
+        raise HTTPException(status_code=404, detail="Tournament not found")
+
     # Create match
     db_match = Match(
         tournament_id=match_data.tournament_id,
+        season=tournament.year,
         game_number=match_data.game_number,
         game_length=match_data.game_length,
         patch=match_data.patch,
@@ -176,6 +180,8 @@ async def create_match(
 
     session.add(db_match)
     session.commit()
+    refresh_match_cards(session, [db_match.id])
+    bump_data_version(session)
     session.refresh(db_match)
     return db_match
 
@@ -188,17 +194,32 @@ async def update_match(
     current_user: Annotated[User, Depends(require_admin)],
 ):
     """Update match (Admin only)"""
-    match = session.get(Match, match_id)
+    match = find_match(session, match_id)
     if not match:
         raise HTTPException(status_code=404, detail="Match not found")
 
+    # A new patch or tournament moves the match between aggregates
+    change = collect_stat_change(session, [match_id])
+
     # Update fields
     update_data = match_data.model_dump(exclude_unset=True)
+    if "tournament_id" in update_data:
+        tournament = session.get(Tournament, update_data["tournament_id"])
+        if not tournament:
+            raise HTTPException(status_code=404, detail="Tournament not found")
+        # Moving to another season moves the game and its stat rows to another partition
+        match.season = tournament.year
+        session.exec(
+            update(MatchPlayerStats)
+            .where(MatchPlayerStats.match_id == match_id)
+            .values(season=tournament.year)
+        )
     for key, value in update_data.items():
         setattr(match, key, value)
 
     session.add(match)
     session.commit()
+    apply_stat_changes(session, change.update(collect_stat_change(session, [match_id])))
     session.refresh(match)
     return match
 
@@ -210,42 +231,62 @@ async def delete_match(
     current_user: Annotated[User, Depends(require_admin)],
 ):
     """Delete match (Admin only)"""
-    match = session.get(Match, match_id)
+    match = find_match(session, match_id)
     if not match:
         raise HTTPException(status_code=404, detail="Match not found")
 
-    session.delete(match)
+    # Derived data depending on the match's stats, which are deleted with it
+    change = collect_stat_change(session, [match_id])
+
+    delete_matches(session, [match_id])
     session.commit()
+    apply_stat_changes(session, change)
     return None
 
 
 # Match Player Stats endpoints
 @router.get("/{match_id}/player-stats", response_model=List[MatchPlayerStatsResponse])
 async def get_match_player_stats(
-    match_id: str, session: Annotated[Session, Depends(get_session)]
+    match_id: str,
+    fields: Annotated[
+        Optional[List[str]],
+        Depends(sparse_fields(MatchPlayerStats, extra=["player_name", "team_name"])),
+    ] = None,
+    session: Annotated[Session, Depends(get_session)] = None,
 ):
     """Get all player stats for a match (Public access)"""
     # Verify match exists
-    match = session.get(Match, match_id)
+    match = find_match(session, match_id)
     if not match:
         raise HTTPException(status_code=404, detail="Match not found")
 
-    # Get player stats with joins
-    statement = (
-        select(MatchPlayerStats, Player.player_name, Team.team_name)
-        .join(Player, MatchPlayerStats.player_id == Player.id)
-        .join(Team, MatchPlayerStats.team_id == Team.id)
-        .where(MatchPlayerStats.match_id == match_id)
-    )
+    dimensions = await run_in_threadpool(dimension_cache.get)
 
-    results = session.exec(statement).all()
+    if fields:
+        # Only the requested columns; names come from the dimension cache
+        required = [
+            key for key, name in (("player_id", "player_name"), ("team_id", "team_name")) if name in fields
+        ]
+        statement = (
+            select(*columns_for(MatchPlayerStats, fields, required=required))
+            .where(MatchPlayerStats.match_id == match_id)
+        )
+        rows = fetch_rows(session, statement)
+        for row in rows:
+            if "player_name" in fields:
+                row["player_name"] = dimensions.player_name(row["player_id"])
+            if "team_name" in fields:
+                row["team_name"] = dimensions.team_name(row["team_id"])
+        return sparse_response(rows, fields)
+
+    statement = select(MatchPlayerStats).where(MatchPlayerStats.match_id == match_id)
 
     # Convert to response format
     stats_list = []
-    for stats, player_name, team_name in results:
+    for stats in session.exec(statement).all():
         stats_dict = stats.model_dump()
-        stats_dict["player_name"] = player_name
-        stats_dict["team_name"] = team_name
+        stats_dict["player_name"] = dimensions.player_name(stats.player_id)
+        stats_dict["team_name"] = dimensions.team_name(stats.team_id)
         stats_list.append(MatchPlayerStatsResponse(**stats_dict))
 
     return stats_list
@@ -264,7 +305,7 @@ async def create_match_player_stats(
 ):
     """Add player stats for a match (Admin only)"""
     # Verify match exists
-    match = session.get(Match, match_id)
+    match = find_match(session, match_id)
     if not match:
         raise HTTPException(status_code=404, detail="Match not found")
 
@@ -293,9 +334,12 @@ async def create_match_player_stats(
         )
 
     # Create stats
-    db_stats = MatchPlayerStats(**stats_data.model_dump())
+    db_stats = MatchPlayerStats(**stats_data.model_dump(), season=match.season)
     session.add(db_stats)
     session.commit()
+    apply_stat_changes(
+        session, collect_stat_change(session, [stats_data.match_id], [stats_data.player_id])
+    )
     session.refresh(db_stats)
 
     # Add player and team names to response
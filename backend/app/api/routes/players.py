@@ -1,22 +1,47 @@
-from typing import Annotated, List
+from typing import Annotated, List, Literal, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlmodel import Integer, Session, cast, func, select
+from sqlmodel import Session, select
+from starlette.concurrency import run_in_threadpool
 
 from app.api.deps import get_current_active_user, require_admin
+from app.api.sparse import (
+    columns_for,
+    fetch_rows,
+    get_batch_ids,
+    reject_with_fields,
+    sparse_fields,
+    sparse_item,
+    sparse_response,
+)
+from app.core.data_version import bump_data_version
 from app.core.database import get_session
 from app.models.match_player_stats import MatchPlayerStats
 from app.models.match import Match
 from app.models.player import Player
-from app.models.team import Team
+from app.models.player_career_stats import PlayerCareerStats
+from app.models.player_champion_stats import NO_CHAMPION, PlayerChampionStats
+from app.models.player_duo import PlayerDuo
+from app.models.player_team_stats import PlayerTeamStats
 from app.models.tournament import Tournament
 from app.models.user import User
+from app.schemas.lineup import DuoRow
 from app.schemas.player import (
     PlayerCreate,
     PlayerResponse,
     PlayerUpdate,
     PlayerWithStats,
+    SimilarPlayer,
 )
+from app.services.cascades import delete_player_stats, player_match_ids
+from app.services.cohorts import cohort_index
+from app.services.dimensions import Dimensions, dimension_cache
+from app.services.form import form_index, player_form
+from app.services.head_to_head import player_head_to_head
+from app.services.ingest import apply_stat_changes, collect_stat_change
+from app.services.lineups import per_game
+from app.services.metrics import kda
+from app.services.similarity import similarity_index
 
 router = APIRouter(prefix="/players", tags=["Players"])
 
@@ -31,12 +56,16 @@ async def list_players(
     search: str = Query(None, description="Search by player name"),
     sort_by: str = Query("player_name", description="Sort by field (player_name, position)"),
     sort_order: str = Query("asc", description="Sort order (asc, desc)"),
+    ids: Annotated[Optional[List[str]], Depends(get_batch_ids)] = None,
+    fields: Annotated[Optional[List[str]], Depends(sparse_fields(Player))] = None,
     session: Annotated[Session, Depends(get_session)] = None,
 ):
     """Get all players (Public access)"""
-    statement = select(Player)
+    statement = select(*columns_for(Player, fields)) if fields else select(Player)
 
     # Add filters
+    if ids:
+        statement = statement.where(Player.id.in_(ids))
     if position:
         statement = statement.where(Player.position == position)
     if search:
@@ -49,60 +78,148 @@ async def list_players(
     else:
         statement = statement.order_by(sort_column.asc())
 
-    # Add pagination
-    statement = statement.offset(skip).limit(limit)
+    # Add pagination (a batch returns every requested id)
+    if not ids:
+        statement = statement.offset(skip).limit(limit)
+
+    if fields:
+        return sparse_response(fetch_rows(session, statement), fields)
 
     players = session.exec(statement).all()
     return players
 
 
-@router.get("/{player_id}", response_model=PlayerWithStats)
-async def get_player(player_id: str, session: Annotated[Session, Depends(get_session)]):
-    """Get player details with career stats (Public access)"""
-    player = session.get(Player, player_id)
-    if not player:
-        raise HTTPException(status_code=404, detail="Player not found")
+def _player_with_stats(session: Session, player: Player) -> PlayerWithStats:
+    """Player plus career totals, read from the player_career_stats rollup"""
+    career = session.get(PlayerCareerStats, player.id) or PlayerCareerStats(player_id=player.id)
 
-    # Get aggregated stats
-    stats_query = select(
-        func.count(MatchPlayerStats.match_id).label("total_games"),
-        func.sum(cast(MatchPlayerStats.result, Integer)).label("total_wins"),
-        func.sum(MatchPlayerStats.kills).label("total_kills"),
-        func.sum(MatchPlayerStats.deaths).label("total_deaths"),
-        func.sum(MatchPlayerStats.assists).label("total_assists"),
-    ).where(MatchPlayerStats.player_id == player_id)
-
-    stats = session.exec(stats_query).first()
-
-    # Calculate KDA and win rate
-    total_games = stats.total_games or 0
-    total_wins = stats.total_wins or 0
-    total_kills = stats.total_kills or 0
-    total_deaths = stats.total_deaths or 0
-    total_assists = stats.total_assists or 0
-
-    avg_kda = (
-        ((total_kills + total_assists) / total_deaths)
-        if total_deaths > 0
-        else total_kills + total_assists
-    )
-    win_rate = (total_wins / total_games * 100) if total_games > 0 else 0
+    avg_kda = kda(career.kills, career.deaths, career.assists)
+    win_rate = (career.wins / career.games * 100) if career.games > 0 else 0
 
     return PlayerWithStats(
         id=player.id,
         player_name=player.player_name,
         position=player.position,
         external_id=player.external_id,
-        total_games=total_games,
-        total_wins=total_wins,
-        total_kills=total_kills,
-        total_deaths=total_deaths,
-        total_assists=total_assists,
+        total_games=career.games,
+        total_wins=career.wins,
+        total_kills=career.kills,
+        total_deaths=career.deaths,
+        total_assists=career.assists,
         avg_kda=round(avg_kda, 2),
         win_rate=round(win_rate, 2),
     )
 
 
+_CHAMPION_FIELDS = (
+    "champion", "games_played", "wins", "win_rate", "avg_kills", "avg_deaths", "avg_assists", "avg_kda",
+)
+
+
+def _player_champions(session: Session, player_id: str) -> List[dict]:
+    """Per-champion stats, read from the player_champion_stats rollup"""
+    statement = (
+        select(PlayerChampionStats)
+        .where(PlayerChampionStats.player_id == player_id)
+        .order_by(PlayerChampionStats.games.desc())
+    )
+
+    champion_stats = []
+    for result in session.exec(statement).all():
+        games = result.games or 0
+        avg_kills = result.kills / games if games > 0 else 0
+        avg_deaths = result.deaths / games if games > 0 else 0
+        avg_assists = result.assists / games if games > 0 else 0
+
+        win_rate = (result.wins / games * 100) if games > 0 else 0
+
+        champion_stats.append({
+            "champion": None if result.champion == NO_CHAMPION else result.champion,
+            "games_played": games,
+            "wins": result.wins,
+            "win_rate": round(win_rate, 2),
+            "avg_kills": round(avg_kills, 2),
+            "avg_deaths": round(avg_deaths, 2),
+            "avg_assists": round(avg_assists, 2),
+            "avg_kda": round(kda(result.kills, result.deaths, result.assists), 2),
+        })
+
+    return champion_stats
+
+
+def _player_teams(session: Session, dimensions: Dimensions, player_id: str) -> List[dict]:
+    """Teams the player has played for, read from the player_team_stats rollup"""
+    statement = (
+        select(PlayerTeamStats)
+        .where(PlayerTeamStats.player_id == player_id)
+        .order_by(PlayerTeamStats.games.desc())
+    )
+
+    teams = []
+    for result in session.exec(statement).all():
+        team_name = dimensions.team_name(result.team_id)
+        if team_name is None:
+            continue
+        games = result.games or 0
+        win_rate = (result.wins / games * 100) if games > 0 else 0
+
+        teams.append({
+            "team_id": result.team_id,
+            "team_name": team_name,
+            "games_played": games,
+            "wins": result.wins,
+            "win_rate": round(win_rate, 2),
+        })
+
+    return teams
+
+
+@router.get("/{player_id}", response_model=PlayerWithStats)
+async def get_player(
+    player_id: str,
+    league: Optional[str] = Query(None, description="Percentile cohort league"),
+    year: Optional[int] = Query(None, description="Percentile cohort year"),
+    split: Optional[str] = Query(None, description="Percentile cohort split"),
+    window: Optional[int] = Query(None, ge=1, le=500, description="Add recent form over the last N games"),
+    fields: Annotated[Optional[List[str]], Depends(sparse_fields(Player))] = None,
+    session: Annotated[Session, Depends(get_session)] = None,
+):
+    """Get player details with career stats (Public access); fields= skips the stats"""
+    reject_with_fields(fields, league=league, year=year, split=split, window=window)
+    if fields:
+        rows = fetch_rows(session, select(*columns_for(Player, fields)).where(Player.id == player_id))
+        if not rows:
+            raise HTTPException(status_code=404, detail="Player not found")
+        return sparse_item(rows[0], fields)
+
+    player = session.get(Player, player_id)
+    if not player:
+        raise HTTPException(status_code=404, detail="Player not found")
+
+    player_stats = _player_with_stats(session, player)
+    cohorts = await run_in_threadpool(cohort_index.get)
+    cohort = cohorts.get(player.position, league, year, split)
+    player_stats.percentiles = cohort.player_percentiles(player_id) if cohort else None
+    if window:
+        index = await run_in_threadpool(form_index.get)
+        player_stats.form = player_form(session, index, player_id, window)
+    return player_stats
+
+
+@router.get("/{player_id}/profile")
+async def get_player_profile(player_id: str, session: Annotated[Session, Depends(get_session)]):
+    """Get player career stats, teams and champions in one call (Public access)"""
+    player = session.get(Player, player_id)
+    if not player:
+        raise HTTPException(status_code=404, detail="Player not found")
+
+    return {
+        "player": _player_with_stats(session, player),
+        "teams": _player_teams(session, await run_in_threadpool(dimension_cache.get), player_id),
+        "champions": _player_champions(session, player_id),
+    }
+
+
 @router.post("/", response_model=PlayerResponse, status_code=status.HTTP_201_CREATED)
 async def create_player(
     player_data: PlayerCreate,
@@ -118,6 +235,7 @@ async def create_player(
     )
     session.add(db_player)
     session.commit()
+    bump_data_version(session)
     session.refresh(db_player)
     return db_player
 
@@ -141,6 +259,7 @@ async def update_player(
 
     session.add(player)
     session.commit()
+    bump_data_version(session)
     session.refresh(player)
     return player
 
@@ -156,8 +275,13 @@ async def delete_player(
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
 
+    # The player's stat rows go with them: every derived row of their games is rebuilt
+    change = collect_stat_change(session, player_match_ids(session, player_id), [player_id])
+
+    delete_player_stats(session, player_id)
     session.delete(player)
     session.commit()
+    apply_stat_changes(session, change)
     return None
 
 
@@ -166,14 +290,36 @@ async def get_player_matches(
     player_id: str,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
+    fields: Annotated[
+        Optional[List[str]],
+        Depends(sparse_fields(MatchPlayerStats, extra=["match_date", "team_name"])),
+    ] = None,
     session: Annotated[Session, Depends(get_session)] = None,
 ):
     """Get player's match history with stats"""
+    if fields:
+        columns = columns_for(MatchPlayerStats, fields, required=["team_id"] if "team_name" in fields else ())
+        if "match_date" in fields:
+            columns.append(Match.match_date)
+        statement = (
+            select(*columns)
+            .join(Match, MatchPlayerStats.match_id == Match.id)
+            .where(MatchPlayerStats.player_id == player_id)
+            .order_by(Match.match_date.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+        rows = fetch_rows(session, statement)
+        if "team_name" in fields:
+            dimensions = await run_in_threadpool(dimension_cache.get)
+            for row in rows:
+                row["team_name"] = dimensions.team_name(row["team_id"])
+        return sparse_response(rows, fields)
+
     # Get player matches with related data
     statement = (
-        select(MatchPlayerStats, Match.match_date, Team.team_name)
+        select(MatchPlayerStats, Match.match_date)
         .join(Match, MatchPlayerStats.match_id == Match.id)
-        .join(Team, MatchPlayerStats.team_id == Team.id)
         .where(MatchPlayerStats.player_id == player_id)
         .order_by(Match.match_date.desc())
         .offset(skip)
@@ -181,60 +327,118 @@ async def get_player_matches(
     )
     
     results = session.exec(statement).all()
+    dimensions = await run_in_threadpool(dimension_cache.get)
     
     matches = []
-    for stats, match_date, team_name in results:
+    for stats, match_date in results:
         match_dict = stats.model_dump()
         match_dict["match_date"] = match_date
-        match_dict["team_name"] = team_name
+        match_dict["team_name"] = dimensions.team_name(stats.team_id)
         matches.append(match_dict)
     
     return matches
 
 
+@router.get("/{player_id}/duos", response_model=List[DuoRow])
+async def get_player_duos(
+    player_id: str,
+    partner_position: Optional[str] = Query(None, description="Only teammates playing this position (e.g. sup)"),
+    min_games: int = Query(1, ge=1),
+    sort_by: Literal["games", "win_rate"] = Query("games"),
+    limit: int = Query(20, ge=1, le=100),
+    fields: Annotated[Optional[List[str]], Depends(sparse_fields(DuoRow))] = None,
+    session: Annotated[Session, Depends(get_session)] = None,
+):
+    """Player's record with each teammate, read from the player_duos aggregate"""
+    statement = select(PlayerDuo).where(PlayerDuo.player_id == player_id, PlayerDuo.games >= min_games)
+    duos = session.exec(statement).all()
+    dimensions = await run_in_threadpool(dimension_cache.get)
+
+    if partner_position:
+        position = partner_position.lower()
+        duos = [duo for duo in duos if (dimensions.player_position(duo.partner_id) or "").lower() == position]
+    if sort_by == "win_rate":
+        duos.sort(key=lambda duo: (duo.wins / duo.games, duo.games), reverse=True)
+    else:
+        duos.sort(key=lambda duo: (duo.games, duo.wins), reverse=True)
+
+    rows = [
+        DuoRow(
+            partner_id=duo.partner_id,
+            partner_name=dimensions.player_name(duo.partner_id),
+            partner_position=dimensions.player_position(duo.partner_id),
+            team_id=duo.team_id,
+            team_name=dimensions.team_name(duo.team_id),
+            games=duo.games,
+            wins=duo.wins,
+            **per_game(duo),
+            first_match_date=duo.first_match_date,
+            last_match_date=duo.last_match_date,
+        )
+        for duo in duos[:limit]
+    ]
+    if fields:
+        return sparse_response([row.model_dump() for row in rows], fields)
+    return rows
+
+
+@router.get("/{player_id}/vs/{opponent_id}")
+async def get_player_head_to_head(
+    player_id: str,
+    opponent_id: str,
+    limit: int = Query(50, ge=1, le=500),
+    session: Annotated[Session, Depends(get_session)] = None,
+):
+    """Get head-to-head record and stat differentials between two players"""
+    player = session.get(Player, player_id)
+    opponent = session.get(Player, opponent_id)
+    if not player or not opponent:
+        raise HTTPException(status_code=404, detail="Player not found")
+
+    return player_head_to_head(session, player, opponent, limit)
+
+
+@router.get("/{player_id}/similar", response_model=List[SimilarPlayer])
+async def get_similar_players(
+    player_id: str,
+    k: int = Query(10, ge=1, le=100),
+    position: Optional[str] = Query(None),
+    league: Optional[str] = Query(None),
+    year: Optional[int] = Query(None),
+    session: Annotated[Session, Depends(get_session)] = None,
+):
+    """Get players with the most similar per-game stat profile"""
+    if not session.get(Player, player_id):
+        raise HTTPException(status_code=404, detail="Player not found")
+
+    index = await run_in_threadpool(similarity_index.get)
+    if player_id not in index.rows:
+        raise HTTPException(status_code=404, detail="Not enough games to compare this player")
+
+    [matches] = index.most_similar([player_id], k, position=position, league=league, year=year)
+    return [
+        SimilarPlayer(
+            player_id=index.player_ids[row],
+            player_name=index.names[row],
+            position=index.positions[row],
+            games=int(index.games[row]),
+            similarity=round(score, 4),
+        )
+        for row, score in matches
+    ]
+
+
 @router.get("/{player_id}/champions")
 async def get_player_champion_stats(
     player_id: str,
+    fields: Annotated[Optional[List[str]], Depends(sparse_fields(extra=_CHAMPION_FIELDS))] = None,
     session: Annotated[Session, Depends(get_session)] = None,
 ):
     """Get player's champion statistics"""
-    statement = (
-        select(
-            MatchPlayerStats.champion,
-            func.count(MatchPlayerStats.match_id).label("games_played"),
-            func.sum(cast(MatchPlayerStats.result, Integer)).label("wins"),
-            func.avg(MatchPlayerStats.kills).label("avg_kills"),
-            func.avg(MatchPlayerStats.deaths).label("avg_deaths"),
-            func.avg(MatchPlayerStats.assists).label("avg_assists"),
-        )
-        .where(MatchPlayerStats.player_id == player_id)
-        .group_by(MatchPlayerStats.champion)
-        .order_by(func.count(MatchPlayerStats.match_id).desc())
-    )
-    
-    results = session.exec(statement).all()
-    
-    champion_stats = []
-    for result in results:
-        games = result.games_played or 0
-        wins = result.wins or 0
-        deaths = result.avg_deaths or 0
-        
-        win_rate = (wins / games * 100) if games > 0 else 0
-        kda = ((result.avg_kills + result.avg_assists) / deaths) if deaths > 0 else (result.avg_kills + result.avg_assists)
-        
-        champion_stats.append({
-            "champion": result.champion,
-            "games_played": games,
-            "wins": wins,
-            "win_rate": round(win_rate, 2),
-            "avg_kills": round(result.avg_kills, 2),
-            "avg_deaths": round(result.avg_deaths, 2),
-            "avg_assists": round(result.avg_assists, 2),
-            "avg_kda": round(kda, 2),
-        })
-    
-    return champion_stats
+    champions = _player_champions(session, player_id)
+    if fields:
+        return sparse_response(champions, fields)
+    return champions
 
 
 @router.get("/{player_id}/teams")
@@ -243,33 +447,4 @@ async def get_player_teams(
     session: Annotated[Session, Depends(get_session)],
 ):
     """Get all teams the player has played for"""
-    statement = (
-        select(
-            Team.id,
-            Team.team_name,
-            func.count(MatchPlayerStats.match_id.distinct()).label("games_played"),
-            func.sum(cast(MatchPlayerStats.result, Integer)).label("wins"),
-        )
-        .join(MatchPlayerStats, MatchPlayerStats.team_id == Team.id)
-        .where(MatchPlayerStats.player_id == player_id)
-        .group_by(Team.id, Team.team_name)
-        .order_by(func.count(MatchPlayerStats.match_id.distinct()).desc())
-    )
-    
-    results = session.exec(statement).all()
-    
-    teams = []
-    for result in results:
-        games = result.games_played or 0
-        wins = result.wins or 0
-        win_rate = (wins / games * 100) if games > 0 else 0
-        
-        teams.append({
-            "team_id": result.id,
-            "team_name": result.team_name,
-            "games_played": games,
-            "wins": wins,
-            "win_rate": round(win_rate, 2),
-        })
-    
-    return teams
+    return _player_teams(session, await run_in_threadpool(dimension_cache.get), player_id)
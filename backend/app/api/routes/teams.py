@@ -1,18 +1,34 @@
-from typing import Annotated, List
+from typing import Annotated, Dict, List, Literal, Optional, Tuple
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlmodel import Session, select, func, cast, Integer
+from sqlmodel import Session, select, func, case, cast, or_, Integer, bindparam
+from starlette.concurrency import run_in_threadpool
 
 from app.api.deps import get_current_active_user, require_admin
+from app.api.sparse import columns_for, fetch_rows, get_batch_ids, sparse_fields, sparse_item, sparse_response
+from app.core.data_version import bump_data_version
 from app.core.database import get_session
+from app.core.statements import statement_cache
 from app.models.team import Team
+from app.models.team_lineup import TeamLineup
 from app.models.team_tournament import TeamTournament
-from app.models.tournament import Tournament
 from app.models.match_player_stats import MatchPlayerStats
 from app.models.match import Match
-from app.models.player import Player
+from app.models.match_card import MatchCard
+from app.models.series import Series
 from app.models.user import User
+from app.schemas.lineup import LineupPlayer, LineupRow
+from app.schemas.series import SeriesCount, SeriesRecord
 from app.schemas.team import TeamCreate, TeamResponse, TeamUpdate
+from app.services.cascades import delete_team_stats, team_match_ids
+from app.services.dimensions import dimension_cache
+from app.services.form import form_index, team_form, team_recent_match_ids
+from app.services.head_to_head import team_head_to_head
+from app.services.ingest import apply_stat_changes, collect_stat_change
+from app.services.lineups import per_game
+from app.services.match_cards import MATCH_FIELDS, card_match, refresh_match_cards
+from app.services.metrics import kda_column
+from app.services.series import series_response
 
 router = APIRouter(prefix="/teams", tags=["Teams"])
 
@@ -24,12 +40,16 @@ async def list_teams(
     search: str = Query(None, description="Search by team name"),
     sort_by: str = Query("team_name", description="Sort by field (team_name)"),
     sort_order: str = Query("asc", description="Sort order (asc, desc)"),
+    ids: Annotated[Optional[List[str]], Depends(get_batch_ids)] = None,
+    fields: Annotated[Optional[List[str]], Depends(sparse_fields(Team))] = None,
     session: Annotated[Session, Depends(get_session)] = None,
 ):
     """Get all teams (Public access)"""
-    statement = select(Team)
+    statement = select(*columns_for(Team, fields)) if fields else select(Team)
 
-    # Add search filter if provided
+    # Add filters
+    if ids:
+        statement = statement.where(Team.id.in_(ids))
     if search:
         statement = statement.where(Team.team_name.contains(search))
 
@@ -40,8 +60,12 @@ async def list_teams(
     else:
         statement = statement.order_by(sort_column.asc())
 
-    # Add pagination
-    statement = statement.offset(skip).limit(limit)
+    # Add pagination (a batch returns every requested id)
+    if not ids:
+        statement = statement.offset(skip).limit(limit)
+
+    if fields:
+        return sparse_response(fetch_rows(session, statement), fields)
 
     teams = session.exec(statement).all()
     return teams
@@ -50,9 +74,16 @@ async def list_teams(
 @router.get("/{team_id}", response_model=TeamResponse)
 async def read_team(
     team_id: str,
-    session: Annotated[Session, Depends(get_session)],
+    fields: Annotated[Optional[List[str]], Depends(sparse_fields(Team))] = None,
+    session: Annotated[Session, Depends(get_session)] = None,
 ):
     """Get single team by ID (Public access)"""
+    if fields:
+        rows = fetch_rows(session, select(*columns_for(Team, fields)).where(Team.id == team_id))
+        if not rows:
+            raise HTTPException(status_code=404, detail="Team not found")
+        return sparse_item(rows[0], fields)
+
     team = session.get(Team, team_id)
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
@@ -78,6 +109,7 @@ async def create_team(
     team = Team(team_name=team_data.team_name, external_id="UNOFFICIAL")
     session.add(team)
     session.commit()
+    bump_data_version(session)
     session.refresh(team)
     return team
 
@@ -107,6 +139,9 @@ async def update_team(
 
     session.add(team)
     session.commit()
+    if "team_name" in update_data:
+        refresh_match_cards(session, team_ids=[team_id])
+    bump_data_version(session)
     session.refresh(team)
     return team
 
@@ -122,8 +157,17 @@ async def delete_team(
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
 
+    # The team's stat rows go with it: every derived row of its games is rebuilt
+    match_ids = set(team_match_ids(session, team_id))
+    match_ids.update(session.exec(
+        select(MatchCard.id).where(or_(MatchCard.blue_team_id == team_id, MatchCard.red_team_id == team_id))
+    ).all())
+    change = collect_stat_change(session, match_ids)
+
+    delete_team_stats(session, team_id)
     session.delete(team)
     session.commit()
+    apply_stat_changes(session, change)
     return None
 
 
@@ -133,152 +177,258 @@ async def get_team_tournaments(
     session: Annotated[Session, Depends(get_session)],
 ):
     """Get team's tournament history with results"""
-    statement = (
+    tournament_ids = session.exec(
+        select(TeamTournament.tournament_id).where(TeamTournament.team_id == team_id)
+    ).all()
+    dimensions = await run_in_threadpool(dimension_cache.get)
+    history = dimensions.sorted_tournaments(tournament_ids)
+    years = {tournament.year for tournament in history}
+
+    # One row per game (won if any of the team's rows won), then per tournament
+    games = (
         select(
-            Tournament.id,
-            Tournament.league,
-            Tournament.year,
-            Tournament.split,
-            Tournament.playoffs,
+            Match.tournament_id,
+            func.max(cast(MatchPlayerStats.result, Integer)).label("won"),
         )
-        .join(TeamTournament, TeamTournament.tournament_id == Tournament.id)
-        .where(TeamTournament.team_id == team_id)
-        .order_by(Tournament.year.desc(), Tournament.split.desc())
+        .join(MatchPlayerStats, MatchPlayerStats.match_id == Match.id)
+        .where(MatchPlayerStats.team_id == team_id)
+        .where(Match.tournament_id.in_([tournament.id for tournament in history]))
+        .where(Match.season.in_(years), MatchPlayerStats.season.in_(years))  # Partition pruning
+        .group_by(Match.id, Match.tournament_id)
+        .subquery()
     )
-    
-    results = session.exec(statement).all()
-    
-    tournaments = []
-    for tournament_id, league, year, split, playoffs in results:
-        # Count wins and losses in this tournament by counting unique matches
-        # Get distinct matches with their results
-        match_results_stmt = (
-            select(
-                Match.id,
-                func.max(cast(MatchPlayerStats.result, Integer)).label("won")
-            )
-            .join(MatchPlayerStats, MatchPlayerStats.match_id == Match.id)
-            .where(MatchPlayerStats.team_id == team_id)
-            .where(Match.tournament_id == tournament_id)
-            .group_by(Match.id)
+    records = {
+        tournament_id: (total_games, wins or 0)
+        for tournament_id, total_games, wins in session.exec(
+            select(games.c.tournament_id, func.count(), func.sum(games.c.won)).group_by(games.c.tournament_id)
         )
-        match_results = session.exec(match_results_stmt).all()
-        
-        total_games = len(match_results)
-        wins = sum(1 for _, won in match_results if won)
-        losses = total_games - wins
-        
+    }
+
+    tournaments = []
+    for tournament in history:
+        total_games, wins = records.get(tournament.id, (0, 0))
         tournaments.append({
-            "tournament_id": tournament_id,
-            "league": league,
-            "year": year,
-            "split": split,
-            "playoffs": playoffs,
+            "tournament_id": tournament.id,
+            "league": tournament.league,
+            "year": tournament.year,
+            "split": tournament.split,
+            "playoffs": tournament.playoffs,
             "wins": wins,
-            "losses": losses,
+            "losses": total_games - wins,
             "total_games": total_games,
         })
-    
+
     return tournaments
 
 
+def _team_matches_statement():
+    team_id = bindparam("team_id")
+    return (
+        select(MatchCard)
+        .where(or_(MatchCard.blue_team_id == team_id, MatchCard.red_team_id == team_id))
+        .order_by(MatchCard.match_date.desc(), MatchCard.game_number.desc())
+        .offset(bindparam("skip"))
+        .limit(bindparam("limit"))
+    )
+
+
 @router.get("/{team_id}/matches")
 async def get_team_matches(
     team_id: str,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
+    fields: Annotated[
+        Optional[List[str]],
+        Depends(sparse_fields(extra=[*MATCH_FIELDS, "tournament_name", "result", "opponent"])),
+    ] = None,
     session: Annotated[Session, Depends(get_session)] = None,
 ):
     """Get team's match history"""
-    statement = (
-        select(Match, Tournament.league, Tournament.year, Tournament.split)
-        .join(Tournament, Match.tournament_id == Tournament.id)
-        .join(MatchPlayerStats, MatchPlayerStats.match_id == Match.id)
-        .where(MatchPlayerStats.team_id == team_id)
-        .distinct()
-        .order_by(Match.match_date.desc())
-        .offset(skip)
-        .limit(limit)
-    )
-    
-    results = session.exec(statement).all()
-    
+    statement = statement_cache.get("teams/matches", _team_matches_statement)
+
     matches = []
-    for match, league, year, split in results:
-        # Get result for this team
-        result_stmt = (
-            select(MatchPlayerStats.result)
-            .where(MatchPlayerStats.match_id == match.id)
-            .where(MatchPlayerStats.team_id == team_id)
-            .limit(1)
-        )
-        result = session.exec(result_stmt).first()
-        
-        # Get opponent team
-        opponent_stmt = (
-            select(Team.team_name)
-            .join(MatchPlayerStats, MatchPlayerStats.team_id == Team.id)
-            .where(MatchPlayerStats.match_id == match.id)
-            .where(MatchPlayerStats.team_id != team_id)
-            .distinct()
-            .limit(1)
-        )
-        opponent = session.exec(opponent_stmt).first()
-        
-        match_dict = match.model_dump()
-        match_dict["tournament_name"] = f"{league} {year} {split or ''}".strip()
-        match_dict["result"] = result
-        match_dict["opponent"] = opponent
+    for card in session.exec(statement, params={"team_id": team_id, "skip": skip, "limit": limit}).all():
+        blue = card.blue_team_id == team_id
+        match_dict = card_match(card)
+        match_dict["tournament_name"] = card.tournament_name
+        match_dict["result"] = card.winner_team_id == team_id if card.winner_team_id else None
+        match_dict["opponent"] = card.red_team_name if blue else card.blue_team_name
         matches.append(match_dict)
-    
+
+    if fields:
+        return sparse_response(matches, fields)
     return matches
 
 
+@router.get("/{team_id}/series", response_model=SeriesRecord)
+async def get_team_series(
+    team_id: str,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(10, ge=1, le=100),
+    fields: Annotated[Optional[List[str]], Depends(sparse_fields(SeriesRecord))] = None,
+    session: Annotated[Session, Depends(get_session)] = None,
+):
+    """Team's series record (overall and per Bo1/Bo3/Bo5) with its latest series;
+    fields= runs only the queries its fields need"""
+    record = SeriesRecord(team_id=team_id, overall=SeriesCount(), by_format={}, series=[])
+    if not fields or "overall" in fields or "by_format" in fields:
+        record.overall, record.by_format = _series_counts(session, team_id)
+    if not fields or "series" in fields:
+        statement = (
+            select(Series)
+            .where(or_(Series.team_a_id == team_id, Series.team_b_id == team_id))
+            .order_by(Series.match_date.desc(), Series.first_game_number.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+        series = session.exec(statement).all()
+        dimensions = await run_in_threadpool(dimension_cache.get)
+        record.series = [series_response(item, dimensions) for item in series]
+
+    if fields:
+        return sparse_item(record.model_dump(), fields)
+    return record
+
+
+def _series_counts(session: Session, team_id: str) -> Tuple[SeriesCount, Dict[str, SeriesCount]]:
+    """Series played, won and lost by the team, overall and per format"""
+    involved = or_(Series.team_a_id == team_id, Series.team_b_id == team_id)
+    record_statement = (
+        select(
+            Series.best_of,
+            func.count().label("played"),
+            func.sum(case((Series.winner_team_id == team_id, 1), else_=0)).label("wins"),
+            func.sum(
+                case((Series.winner_team_id.is_not(None) & (Series.winner_team_id != team_id), 1), else_=0)
+            ).label("losses"),
+        )
+        .where(involved)
+        .group_by(Series.best_of)
+    )
+    overall = SeriesCount()
+    by_format = {}
+    for best_of, played, wins, losses in session.exec(record_statement).all():
+        overall.played += played
+        overall.wins += wins or 0
+        overall.losses += losses or 0
+        if best_of is not None:
+            by_format[f"bo{best_of}"] = SeriesCount(played=played, wins=wins or 0, losses=losses or 0)
+    return overall, by_format
+
+
+@router.get("/{team_id}/lineups", response_model=List[LineupRow])
+async def get_team_lineups(
+    team_id: str,
+    min_games: int = Query(1, ge=1),
+    sort_by: Literal["games", "win_rate"] = Query("games"),
+    limit: int = Query(20, ge=1, le=100),
+    fields: Annotated[Optional[List[str]], Depends(sparse_fields(LineupRow))] = None,
+    session: Annotated[Session, Depends(get_session)] = None,
+):
+    """Team's five-player lineups with their record, read from the team_lineups aggregate"""
+    statement = select(TeamLineup).where(TeamLineup.team_id == team_id, TeamLineup.games >= min_games)
+    if sort_by == "win_rate":
+        statement = statement.order_by((TeamLineup.wins * 1.0 / TeamLineup.games).desc(), TeamLineup.games.desc())
+    else:
+        statement = statement.order_by(TeamLineup.games.desc(), TeamLineup.wins.desc())
+    lineups = session.exec(statement.limit(limit)).all()
+    dimensions = await run_in_threadpool(dimension_cache.get)
+
+    rows = [
+        LineupRow(
+            lineup=lineup.lineup,
+            players=[
+                LineupPlayer(
+                    player_id=player_id,
+                    player_name=dimensions.player_name(player_id),
+                    position=dimensions.player_position(player_id),
+                )
+                for player_id in lineup.player_ids.split(",")
+            ],
+            games=lineup.games,
+            wins=lineup.wins,
+            **per_game(lineup),
+            avg_gold=round(lineup.gold / lineup.games, 2),
+            avg_game_duration=round(lineup.game_length / lineup.games, 2),
+            first_match_date=lineup.first_match_date,
+            last_match_date=lineup.last_match_date,
+        )
+        for lineup in lineups
+    ]
+    if fields:
+        return sparse_response([row.model_dump() for row in rows], fields)
+    return rows
+
+
+@router.get("/{team_id}/vs/{opponent_id}")
+async def get_team_head_to_head(
+    team_id: str,
+    opponent_id: str,
+    limit: int = Query(50, ge=1, le=500),
+    session: Annotated[Session, Depends(get_session)] = None,
+):
+    """Get head-to-head record and shared games between two teams"""
+    team = session.get(Team, team_id)
+    opponent = session.get(Team, opponent_id)
+    if not team or not opponent:
+        raise HTTPException(status_code=404, detail="Team not found")
+
+    return team_head_to_head(session, team, opponent, limit)
+
+
 @router.get("/{team_id}/players")
 async def get_team_players(
     team_id: str,
-    session: Annotated[Session, Depends(get_session)],
+    window: Optional[int] = Query(None, ge=1, le=500, description="Only the team's last N games"),
+    session: Annotated[Session, Depends(get_session)] = None,
 ):
     """Get all players who have played for this team"""
     statement = (
         select(
-            Player.id,
-            Player.player_name,
-            Player.position,
+            MatchPlayerStats.player_id,
             func.count(MatchPlayerStats.match_id.distinct()).label("games_played"),
             func.sum(cast(MatchPlayerStats.result, Integer)).label("wins"),
             func.avg(MatchPlayerStats.kills).label("avg_kills"),
             func.avg(MatchPlayerStats.deaths).label("avg_deaths"),
             func.avg(MatchPlayerStats.assists).label("avg_assists"),
+            kda_column(
+                func.sum(MatchPlayerStats.kills), func.sum(MatchPlayerStats.deaths), func.sum(MatchPlayerStats.assists)
+            ).label("kda"),
         )
-        .join(MatchPlayerStats, MatchPlayerStats.player_id == Player.id)
         .where(MatchPlayerStats.team_id == team_id)
-        .group_by(Player.id, Player.player_name, Player.position)
+        .group_by(MatchPlayerStats.player_id)
         .order_by(func.count(MatchPlayerStats.match_id.distinct()).desc())
     )
+    if window:
+        index = await run_in_threadpool(form_index.get)
+        statement = statement.where(
+            MatchPlayerStats.match_id.in_(team_recent_match_ids(session, index, team_id, window))
+        )
     
     results = session.exec(statement).all()
+    dimensions = await run_in_threadpool(dimension_cache.get)
     
     players = []
     for result in results:
+        player = dimensions.players.get(result.player_id)
+        if player is None:
+            continue
         games = result.games_played or 0
         wins = result.wins or 0
-        deaths = result.avg_deaths or 0
         
         win_rate = (wins / games * 100) if games > 0 else 0
-        kda = ((result.avg_kills + result.avg_assists) / deaths) if deaths > 0 else (result.avg_kills + result.avg_assists)
         
         players.append({
-            "player_id": result.id,
-            "player_name": result.player_name,
-            "position": result.position,
+            "player_id": player.id,
+            "player_name": player.name,
+            "position": player.position,
             "games_played": games,
             "wins": wins,
             "win_rate": round(win_rate, 2),
             "avg_kills": round(result.avg_kills, 2),
             "avg_deaths": round(result.avg_deaths, 2),
             "avg_assists": round(result.avg_assists, 2),
-            "avg_kda": round(kda, 2),
+            "avg_kda": round(float(result.kda or 0), 2),
         })
     
     return players
@@ -287,7 +437,8 @@ async def get_team_players(
 @router.get("/{team_id}/stats")
 async def get_team_stats(
     team_id: str,
-    session: Annotated[Session, Depends(get_session)],
+    window: Optional[int] = Query(None, ge=1, le=500, description="Add recent form over the last N games"),
+    session: Annotated[Session, Depends(get_session)] = None,
 ):
     """Get overall team statistics"""
     # Count unique matches and calculate wins
@@ -313,6 +464,11 @@ async def get_team_stats(
             func.avg(MatchPlayerStats.deaths).label("avg_deaths"),
             func.avg(MatchPlayerStats.assists).label("avg_assists"),
             func.avg(Match.game_length).label("avg_game_duration"),
+            kda_column(
+                func.coalesce(func.sum(MatchPlayerStats.kills), 0),
+                func.coalesce(func.sum(MatchPlayerStats.deaths), 0),
+                func.coalesce(func.sum(MatchPlayerStats.assists), 0),
+            ).label("kda"),
         )
         .join(Match, MatchPlayerStats.match_id == Match.id)
         .where(MatchPlayerStats.team_id == team_id)
@@ -320,10 +476,7 @@ async def get_team_stats(
     
     result = session.exec(stats_statement).first()
     
-    deaths = result.avg_deaths or 0
-    
     win_rate = (total_wins / total_games * 100) if total_games > 0 else 0
-    kda = ((result.avg_kills + result.avg_assists) / deaths) if deaths > 0 else (result.avg_kills + result.avg_assists)
     
     # Count tournaments participated
     tournament_count_stmt = (
@@ -332,15 +485,22 @@ async def get_team_stats(
     )
     tournament_count = session.exec(tournament_count_stmt).first()
     
+    form = None
+    if window:
+        # Last N games come from the in-memory ring when N fits in it
+        index = await run_in_threadpool(form_index.get)
+        form = team_form(session, index, team_id, window)
+
     return {
         "total_games": total_games,
         "total_wins": total_wins,
         "total_losses": total_games - total_wins,
         "win_rate": round(win_rate, 2),
-        "avg_kda": round(kda, 2),
+        "avg_kda": round(float(result.kda or 0), 2),
         "avg_kills": round(result.avg_kills, 2) if result.avg_kills else 0,
         "avg_deaths": round(result.avg_deaths, 2) if result.avg_deaths else 0,
         "avg_assists": round(result.avg_assists, 2) if result.avg_assists else 0,
         "avg_game_duration": round(result.avg_game_duration, 2) if result.avg_game_duration else 0,
         "tournaments_participated": tournament_count or 0,
+        "form": form,
     }
@@ -1,14 +1,19 @@
-from typing import Annotated, List
+from typing import Annotated, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlmodel import Session, func, select
+from sqlmodel import Session, func, or_, select, update
+from starlette.concurrency import run_in_threadpool
 
 from app.api.deps import get_current_active_user, require_admin
+from app.api.sparse import columns_for, fetch_rows, get_batch_ids, sparse_fields, sparse_item, sparse_response
+from app.core.data_version import bump_data_version
 from app.core.database import get_session
+from app.core.response_store import cached_response
 from app.models.match import Match
+from app.models.match_card import MatchCard
 from app.models.match_player_stats import MatchPlayerStats
-from app.models.player import Player
-from app.models.team import Team
+from app.models.series import Series
+from app.models.series_standing import SeriesStanding
 from app.models.team_tournament import TeamTournament
 from app.models.tournament import Tournament
 from app.models.user import User
@@ -18,6 +23,13 @@ from app.schemas.tournament import (
     TournamentUpdate,
     TournamentWithStats,
 )
+from app.schemas.series import BracketRound, SeriesResponse, StandingRow
+from app.services.cascades import delete_matches, tournament_match_ids
+from app.services.dimensions import dimension_cache
+from app.services.ingest import apply_stat_changes, collect_stat_change
+from app.services.match_cards import MATCH_FIELDS, card_match, card_teams, refresh_match_cards
+from app.services.metrics import kda_column
+from app.services.series import bracket_rounds, series_response
 
 router = APIRouter(prefix="/tournaments", tags=["Tournaments"])
 
@@ -31,12 +43,16 @@ async def list_tournaments(
     playoffs: bool = Query(None, description="Filter by playoffs"),
     sort_by: str = Query("year", description="Sort by field (year, league, split)"),
     sort_order: str = Query("desc", description="Sort order (asc, desc)"),
+    ids: Annotated[Optional[List[str]], Depends(get_batch_ids)] = None,
+    fields: Annotated[Optional[List[str]], Depends(sparse_fields(Tournament))] = None,
     session: Annotated[Session, Depends(get_session)] = None,
 ):
     """Get all tournaments (Public access)"""
-    statement = select(Tournament)
+    statement = select(*columns_for(Tournament, fields)) if fields else select(Tournament)
 
     # Add filters
+    if ids:
+        statement = statement.where(Tournament.id.in_(ids))
     if year:
         statement = statement.where(Tournament.year == year)
     if league:
@@ -51,8 +67,12 @@ async def list_tournaments(
     else:
         statement = statement.order_by(sort_column.asc())
 
-    # Add pagination
-    statement = statement.offset(skip).limit(limit)
+    # Add pagination (a batch returns every requested id)
+    if not ids:
+        statement = statement.offset(skip).limit(limit)
+
+    if fields:
+        return sparse_response(fetch_rows(session, statement), fields)
 
     tournaments = session.exec(statement).all()
     return tournaments
@@ -60,9 +80,18 @@ async def list_tournaments(
 
 @router.get("/{tournament_id}", response_model=TournamentWithStats)
 async def get_tournament(
-    tournament_id: str, session: Annotated[Session, Depends(get_session)]
+    tournament_id: str,
+    fields: Annotated[Optional[List[str]], Depends(sparse_fields(Tournament))] = None,
+    session: Annotated[Session, Depends(get_session)] = None,
 ):
-    """Get tournament details with stats (Public access)"""
+    """Get tournament details with stats (Public access); fields= skips the counts"""
+    if fields:
+        statement = select(*columns_for(Tournament, fields)).where(Tournament.id == tournament_id)
+        rows = fetch_rows(session, statement)
+        if not rows:
+            raise HTTPException(status_code=404, detail="Tournament not found")
+        return sparse_item(rows[0], fields)
+
     tournament = session.get(Tournament, tournament_id)
     if not tournament:
         raise HTTPException(status_code=404, detail="Tournament not found")
@@ -103,6 +132,7 @@ async def create_tournament(
     db_tournament = Tournament(**tournament_data.model_dump())
     session.add(db_tournament)
     session.commit()
+    bump_data_version(session)
     session.refresh(db_tournament)
     return db_tournament
 
@@ -125,7 +155,19 @@ async def update_tournament(
         setattr(tournament, key, value)
 
     session.add(tournament)
+    if "year" in update_data:
+        # The year is the season partition key of the tournament's games and stat rows
+        match_ids = select(Match.id).where(Match.tournament_id == tournament_id)
+        session.exec(
+            update(MatchPlayerStats)
+            .where(MatchPlayerStats.match_id.in_(match_ids))
+            .values(season=tournament.year)
+        )
+        session.exec(update(Match).where(Match.tournament_id == tournament_id).values(season=tournament.year))
     session.commit()
+    # The tournament label is copied onto every match card
+    refresh_match_cards(session, tournament_ids=[tournament_id])
+    bump_data_version(session)
     session.refresh(tournament)
     return tournament
 
@@ -141,8 +183,14 @@ async def delete_tournament(
     if not tournament:
         raise HTTPException(status_code=404, detail="Tournament not found")
 
+    # Games are deleted explicitly (no cascades on the partitioned tables)
+    match_ids = tournament_match_ids(session, tournament_id)
+    change = collect_stat_change(session, match_ids)
+
+    delete_matches(session, match_ids)
     session.delete(tournament)
     session.commit()
+    apply_stat_changes(session, change)
     return None
 
 
@@ -170,30 +218,32 @@ async def get_tournament_teams(
     # Now aggregate team stats from the match-level results
     statement = (
         select(
-            Team.id,
-            Team.team_name,
+            match_results_subquery.c.team_id,
             func.count(match_results_subquery.c.match_id).label("games_played"),
             func.sum(match_results_subquery.c.team_result).label("wins"),
         )
-        .join(TeamTournament, TeamTournament.team_id == Team.id)
-        .join(match_results_subquery, match_results_subquery.c.team_id == Team.id)
+        .join(TeamTournament, TeamTournament.team_id == match_results_subquery.c.team_id)
         .where(TeamTournament.tournament_id == tournament_id)
-        .group_by(Team.id, Team.team_name)
+        .group_by(match_results_subquery.c.team_id)
         .order_by(func.sum(match_results_subquery.c.team_result).desc())
     )
     
     results = session.exec(statement).all()
+    dimensions = await run_in_threadpool(dimension_cache.get)
     
     teams = []
     for result in results:
+        team_name = dimensions.team_name(result.team_id)
+        if team_name is None:
+            continue
         games = result.games_played or 0
         wins = result.wins or 0
         losses = games - wins
         win_rate = (wins / games * 100) if games > 0 else 0
         
         teams.append({
-            "team_id": result.id,
-            "team_name": result.team_name,
+            "team_id": result.team_id,
+            "team_name": team_name,
             "games_played": games,
             "wins": wins,
             "losses": losses,
@@ -203,43 +253,101 @@ async def get_tournament_teams(
     return teams
 
 
+@router.get("/{tournament_id}/standings", response_model=List[StandingRow])
+async def get_tournament_standings(
+    tournament_id: str,
+    session: Annotated[Session, Depends(get_session)],
+):
+    """Series-based standings with head-to-head tiebreaks, precomputed at ingest"""
+    statement = (
+        select(SeriesStanding)
+        .where(SeriesStanding.tournament_id == tournament_id)
+        .order_by(SeriesStanding.rank, SeriesStanding.team_id)
+    )
+    rows = session.exec(statement).all()
+    dimensions = await run_in_threadpool(dimension_cache.get)
+
+    return [
+        StandingRow(
+            **row.model_dump(exclude={"tournament_id"}),
+            team_name=dimensions.team_name(row.team_id),
+            series_win_rate=round(row.series_wins / row.series_played * 100, 2) if row.series_played else 0,
+            game_differential=row.game_wins - row.game_losses,
+        )
+        for row in rows
+    ]
+
+
+@router.get("/{tournament_id}/series", response_model=List[SeriesResponse])
+async def get_tournament_series(
+    tournament_id: str,
+    team_id: Optional[str] = Query(None, description="Only this team's series"),
+    session: Annotated[Session, Depends(get_session)] = None,
+):
+    """Every series of the tournament, oldest first"""
+    statement = (
+        select(Series)
+        .where(Series.tournament_id == tournament_id)
+        .order_by(Series.match_date, Series.first_game_number, Series.id)
+    )
+    if team_id:
+        statement = statement.where(or_(Series.team_a_id == team_id, Series.team_b_id == team_id))
+    series = session.exec(statement).all()
+    dimensions = await run_in_threadpool(dimension_cache.get)
+
+    return [series_response(item, dimensions) for item in series]
+
+
+@router.get("/{tournament_id}/bracket", response_model=List[BracketRound])
+async def get_tournament_bracket(
+    tournament_id: str,
+    session: Annotated[Session, Depends(get_session)],
+):
+    """The tournament's series by round, for playoff brackets"""
+    statement = (
+        select(Series)
+        .where(Series.tournament_id == tournament_id)
+        .order_by(Series.match_date, Series.first_game_number, Series.id)
+    )
+    series = session.exec(statement).all()
+    dimensions = await run_in_threadpool(dimension_cache.get)
+
+    return [
+        BracketRound(round=number, series=[series_response(item, dimensions) for item in items])
+        for number, items in enumerate(bracket_rounds(series), start=1)
+    ]
+
+
 @router.get("/{tournament_id}/matches")
 async def get_tournament_matches(
     tournament_id: str,
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
+    fields: Annotated[Optional[List[str]], Depends(sparse_fields(extra=[*MATCH_FIELDS, "teams"]))] = None,
     session: Annotated[Session, Depends(get_session)] = None,
 ):
     """Get all matches in tournament"""
     statement = (
-        select(Match)
-        .where(Match.tournament_id == tournament_id)
-        .order_by(Match.match_date.desc(), Match.game_number.desc())
+        select(MatchCard)
+        .where(MatchCard.tournament_id == tournament_id)
+        .order_by(MatchCard.match_date.desc(), MatchCard.game_number.desc())
         .offset(skip)
         .limit(limit)
     )
-    
-    matches = session.exec(statement).all()
-    
-    enriched_matches = []
-    for match in matches:
-        # Get teams for this match
-        team_statement = (
-            select(Team.team_name, MatchPlayerStats.result)
-            .join(MatchPlayerStats, MatchPlayerStats.team_id == Team.id)
-            .where(MatchPlayerStats.match_id == match.id)
-            .distinct()
-        )
-        team_results = session.exec(team_statement).all()
-        
-        match_dict = match.model_dump()
-        match_dict["teams"] = [
-            {"team_name": name, "result": result}
-            for name, result in team_results
-        ]
-        enriched_matches.append(match_dict)
-    
-    return enriched_matches
+
+    matches = [
+        {
+            **card_match(card),
+            "teams": [
+                {"team_name": team["team_name"], "result": team["result"]}
+                for team in card_teams(card)
+            ],
+        }
+        for card in session.exec(statement).all()
+    ]
+    if fields:
+        return sparse_response(matches, fields)
+    return matches
 
 
 @router.get("/{tournament_id}/stats")
@@ -248,48 +356,61 @@ async def get_tournament_stats(
     session: Annotated[Session, Depends(get_session)],
 ):
     """Get tournament statistics and leaderboards"""
+    # Dashboards hit this all at once when a tournament ends; run it once per tournament
+    return await cached_response(
+        "tournaments/stats", compute_tournament_stats, session, {"tournament_id": tournament_id}
+    )
+
+
+def compute_tournament_stats(session: Session, tournament_id: str) -> dict:
     from sqlmodel import Integer, cast
+
+    # The tournament's year is the season partition key; filtering on it prunes the other seasons
+    tournament = session.get(Tournament, tournament_id)
+    season = tournament.year if tournament else None
     
     # Top players by KDA
+    player_kda = kda_column(
+        func.sum(MatchPlayerStats.kills), func.sum(MatchPlayerStats.deaths), func.sum(MatchPlayerStats.assists)
+    ).label("kda")
     top_kda_statement = (
         select(
-            Player.id,
-            Player.player_name,
-            Team.team_name,
+            MatchPlayerStats.player_id,
+            MatchPlayerStats.team_id,
             func.count(MatchPlayerStats.match_id).label("games"),
             func.avg(MatchPlayerStats.kills).label("avg_kills"),
             func.avg(MatchPlayerStats.deaths).label("avg_deaths"),
             func.avg(MatchPlayerStats.assists).label("avg_assists"),
+            player_kda,
         )
-        .join(MatchPlayerStats, MatchPlayerStats.player_id == Player.id)
-        .join(Team, MatchPlayerStats.team_id == Team.id)
         .join(Match, MatchPlayerStats.match_id == Match.id)
-        .where(Match.tournament_id == tournament_id)
-        .group_by(Player.id, Player.player_name, Team.team_name)
+        .where(Match.tournament_id == tournament_id, Match.season == season, MatchPlayerStats.season == season)
+        .group_by(MatchPlayerStats.player_id, MatchPlayerStats.team_id)
         .having(func.count(MatchPlayerStats.match_id) >= 3)
+        .order_by(player_kda.desc())
+        .limit(10)
     )
     
     kda_results = session.exec(top_kda_statement).all()
+    dimensions = dimension_cache.get(wait=True)
     
     top_players = []
     for result in kda_results:
-        deaths = result.avg_deaths or 0
-        kda = ((result.avg_kills + result.avg_assists) / deaths) if deaths > 0 else (result.avg_kills + result.avg_assists)
-        
+        player_name = dimensions.player_name(result.player_id)
+        team_name = dimensions.team_name(result.team_id)
+        if player_name is None or team_name is None:
+            continue
         top_players.append({
-            "player_id": result.id,
-            "player_name": result.player_name,
-            "team_name": result.team_name,
+            "player_id": result.player_id,
+            "player_name": player_name,
+            "team_name": team_name,
             "games_played": result.games,
-            "avg_kda": round(kda, 2),
+            "avg_kda": round(float(result.kda or 0), 2),
             "avg_kills": round(result.avg_kills, 2),
             "avg_deaths": round(result.avg_deaths, 2),
             "avg_assists": round(result.avg_assists, 2),
         })
     
-    # Sort by KDA
-    top_players.sort(key=lambda x: x["avg_kda"], reverse=True)
-    
     # Most picked champions
     champion_statement = (
         select(
@@ -298,7 +419,7 @@ async def get_tournament_stats(
             func.sum(cast(MatchPlayerStats.result, Integer)).label("wins"),
         )
         .join(Match, MatchPlayerStats.match_id == Match.id)
-        .where(Match.tournament_id == tournament_id)
+        .where(Match.tournament_id == tournament_id, Match.season == season, MatchPlayerStats.season == season)
         .where(MatchPlayerStats.champion.is_not(None))
         .group_by(MatchPlayerStats.champion)
         .order_by(func.count(MatchPlayerStats.match_id).desc())
@@ -322,12 +443,12 @@ async def get_tournament_stats(
     
     # Average game duration
     avg_duration_stmt = select(func.avg(Match.game_length)).where(
-        Match.tournament_id == tournament_id
+        Match.tournament_id == tournament_id, Match.season == season
     )
     avg_duration = session.exec(avg_duration_stmt).first() or 0
     
     return {
-        "top_players": top_players[:10],
+        "top_players": top_players,
         "champion_stats": champion_stats,
         "avg_game_duration": round(avg_duration, 2) if avg_duration else 0,
     }
@@ -2,6 +2,7 @@ from typing import Annotated, List
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlmodel import Session, select
 from app.core.database import get_session
+from app.core.principal_cache import principal_cache
 from app.models.user import User
 from app.schemas.user import UserResponse, UserUpdate
 from app.api.deps import get_current_active_user, require_admin
@@ -79,6 +80,9 @@ async def update_user(
     session.add(user)
     session.commit()
     session.refresh(user)
+
+    # Drop the cached principal so role / disabled changes apply immediately
+    principal_cache.invalidate(user.username)
     return user
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -94,4 +98,5 @@ async def delete_user(
     
     session.delete(user)
     session.commit()
+    principal_cache.invalidate(user.username)
     return None
@@ -0,0 +1,90 @@
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Type
+
+from fastapi import HTTPException, Query, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlmodel import Session, SQLModel
+
+from app.core.config import settings
+
+
+def _split(values: Optional[List[str]]) -> Optional[List[str]]:
+    """Accept both ?x=a,b and ?x=a&x=b, keeping order and dropping duplicates"""
+    if not values:
+        return None
+    items = [item.strip() for value in values for item in value.split(",") if item.strip()]
+    return list(dict.fromkeys(items)) or None
+
+
+# Batch fetch: ?ids=a,b,c resolves every id in one IN query
+def get_batch_ids(
+    ids: Optional[List[str]] = Query(None, description="Only these ids (comma-separated, batch fetch)"),
+) -> Optional[List[str]]:
+    batch = _split(ids)
+    if batch and len(batch) > settings.BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.BATCH_MAX_IDS} ids per request",
+        )
+    return batch
+
+
+# Sparse fieldsets: ?fields=id,player_name projects only those columns in SQL.
+# Routes whose rows are computed accept their response schema's fields (or
+# `extra` names alone) and trim each row instead.
+def sparse_fields(model: Optional[Type[BaseModel]] = None, extra: Sequence[str] = ()):
+    if model is None:
+        allowed = set(extra)
+    elif hasattr(model, "__table__"):
+        allowed = set(model.__table__.columns.keys()) | set(extra)
+    else:
+        allowed = set(model.model_fields) | set(extra)
+
+    def fields_checker(
+        fields: Optional[List[str]] = Query(None, description="Only return these fields (comma-separated)"),
+    ) -> Optional[List[str]]:
+        selected = _split(fields)
+        if selected is None:
+            return None
+        unknown = [name for name in selected if name not in allowed]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}",
+            )
+        return selected
+
+    return fields_checker
+
+
+def reject_with_fields(fields: Optional[Sequence[str]], **params: Any) -> None:
+    """400 when fields= comes with parameters only the full response honours"""
+    given = [name for name, value in params.items() if value is not None]
+    if fields and given:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"fields cannot be combined with {', '.join(given)}",
+        )
+
+
+def columns_for(model: Type[SQLModel], fields: Sequence[str], required: Sequence[str] = ()) -> List[Any]:
+    """Model columns to SELECT for `fields`, plus any the handler needs itself"""
+    names = dict.fromkeys([*required, *fields])
+    return [getattr(model, name) for name in names if name in model.__table__.columns]
+
+
+def fetch_rows(session: Session, statement, params: Optional[Mapping[str, Any]] = None) -> List[Dict[str, Any]]:
+    """Plain dict rows for a column projection (no ORM objects are built)"""
+    return [dict(row) for row in session.connection().execute(statement, params or {}).mappings()]
+
+
+def sparse_response(rows: Iterable[Mapping[str, Any]], fields: Sequence[str]) -> JSONResponse:
+    """Serialize only `fields`, bypassing the full response model (rows may be
+    column projections or computed dicts)"""
+    return JSONResponse(jsonable_encoder([{name: row.get(name) for name in fields} for row in rows]))
+
+
+def sparse_item(row: Mapping[str, Any], fields: Sequence[str]) -> JSONResponse:
+    """Serialize only `fields` of a single row (get-by-id counterpart of sparse_response)"""
+    return JSONResponse(jsonable_encoder({name: row.get(name) for name in fields}))
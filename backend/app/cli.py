@@ -0,0 +1,96 @@
+"""Maintenance commands.
+
+    python -m app.cli migrate             # create / upgrade the schema (run before starting the API)
+    python -m app.cli ingest              # after loading data with database/Data_Insertion.sql
+    python -m app.cli ratings --rebuild   # replay Elo ratings over all history
+    python -m app.cli partitions add 2026 # season partitions (MySQL)
+"""
+import argparse
+import logging
+
+from sqlmodel import Session
+
+from app.core.database import engine
+from app.core.data_version import bump_data_version
+from app.migrations import current_version, discover, migrate as apply_migrations
+from app.services.ingest import run_ingest
+from app.services.partitions import add_season, archive_seasons, list_partitions
+from app.services.ratings import update_ratings
+
+
+def migrate(args: argparse.Namespace) -> None:
+    if args.status:
+        with engine.connect() as connection:
+            version = current_version(connection)
+        for migration in discover():
+            state = "applied" if migration.version <= version else "pending"
+            print(f"{migration.version:04d} {migration.name:<32} {state}")
+        return
+    applied = apply_migrations(engine, target=args.target)
+    print(f"Applied {len(applied)} migrations")
+    for migration in applied:
+        print(f"  {migration.version:04d} {migration.name}")
+
+
+def ingest(args: argparse.Namespace) -> None:
+    with Session(engine) as session:
+        version = run_ingest(session)
+    print(f"Data version {version}")
+
+
+def ratings(args: argparse.Namespace) -> None:
+    with Session(engine) as session:
+        games = update_ratings(session, rebuild=args.rebuild)
+        version = bump_data_version(session)
+    print(f"Rated {games} games, data version {version}")
+
+
+def partitions(args: argparse.Namespace) -> None:
+    with engine.connect() as connection:
+        if args.action == "list":
+            for partition in list_partitions(connection):
+                print(f"{partition.table:<20} {partition.name:<8} ~{partition.rows} rows")
+        elif args.action == "add":
+            changed = add_season(connection, args.season)
+            print(f"Added season {args.season} to {', '.join(changed) or 'no table (already there)'}")
+        else:
+            archived = archive_seasons(connection, args.before)
+            for table, season, archive in archived:
+                print(f"{table} season {season} -> {archive}")
+            if archived:
+                print("Run `python -m app.cli ingest` to drop the archived games from derived data")
+
+
+def main(argv=None) -> None:
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = commands.add_parser("migrate", help="Apply pending schema migrations")
+    migrate_parser.add_argument("--target", type=int, help="Stop after this version")
+    migrate_parser.add_argument("--status", action="store_true", help="List migrations without applying")
+    migrate_parser.set_defaults(func=migrate)
+
+    ingest_parser = commands.add_parser("ingest", help="Refresh derived data after loading new games")
+    ingest_parser.set_defaults(func=ingest)
+
+    ratings_parser = commands.add_parser("ratings", help="Update Elo ratings with unrated games")
+    ratings_parser.add_argument("--rebuild", action="store_true", help="Replay all history (backfills)")
+    ratings_parser.set_defaults(func=ratings)
+
+    partitions_parser = commands.add_parser("partitions", help="Manage season partitions (MySQL)")
+    actions = partitions_parser.add_subparsers(dest="action", required=True)
+    actions.add_parser("list", help="Show partitions and row estimates")
+    add_parser = actions.add_parser("add", help="Add partitions up to a new season")
+    add_parser.add_argument("season", type=int)
+    archive_parser = actions.add_parser("archive", help="Move old seasons to *_archive_<season> tables")
+    archive_parser.add_argument("--before", type=int, required=True, help="Archive seasons older than this")
+    partitions_parser.set_defaults(func=partitions)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+import asyncio
+import math
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Protocol, Tuple
+
+from fastapi import status
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+from app.core.security import decode_access_token
+
+
+# Token buckets
+class BucketBackend(Protocol):
+    async def take(self, key: str, rate: float, burst: float, cost: float) -> float:
+        """Consume `cost` tokens from `key`; return 0 when admitted, else seconds to wait"""
+
+
+class InMemoryBucketBackend:
+    """Per-process token buckets"""
+
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, rate: float, burst: float, cost: float) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated_at) * rate)
+            if tokens >= cost:
+                self._buckets[key] = (tokens - cost, now)
+                return 0.0
+            self._buckets[key] = (tokens, now)
+        return (cost - tokens) / rate
+
+
+class RedisBucketBackend:
+    """Token buckets shared by every worker through Redis.
+
+    Any client exposing a redis.asyncio compatible `eval` coroutine works, so
+    tests can pass a local stand-in (e.g. fakeredis.aioredis) instead of a
+    server. The round trip is awaited, never run on the event loop thread.
+    """
+
+    SCRIPT = """
+    local rate, burst, cost, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4])
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+    local tokens = tonumber(state[1]) or burst
+    local updated_at = tonumber(state[2]) or now
+    tokens = math.min(burst, tokens + math.max(0, now - updated_at) * rate)
+    local wait = 0
+    if tokens >= cost then
+        tokens = tokens - cost
+    else
+        wait = (cost - tokens) / rate
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+    return tostring(wait)
+    """
+
+    def __init__(self, client, prefix: str = "ratelimit:"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisBucketBackend":
+        try:
+            import redis.asyncio
+        except ImportError as exc:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis requires the 'redis' package") from exc
+        return cls(redis.asyncio.Redis.from_url(url))
+
+    async def take(self, key: str, rate: float, burst: float, cost: float) -> float:
+        wait = await self.client.eval(self.SCRIPT, 1, self.prefix + key, rate, burst, cost, time.time())
+        return float(wait)
+
+
+# Route classification
+@dataclass(frozen=True)
+class Budget:
+    rate: float  # Tokens refilled per second
+    burst: float  # Bucket size
+
+
+@dataclass(frozen=True)
+class RouteCost:
+    pattern: re.Pattern
+    budget: str
+    cost: float
+    heavy: bool = False
+
+
+# First match wins; anything else under /api is a cheap CRUD read/write
+ROUTE_COSTS: List[RouteCost] = [
+    RouteCost(re.compile(r"^/api/auth/"), budget="", cost=0),  # Limited by the hashing pool
+    RouteCost(re.compile(r"^/api/analytics/dashboard$"), budget="crud", cost=1),
+    RouteCost(re.compile(r"^/api/analytics/"), budget="analytics", cost=1, heavy=True),
+    RouteCost(re.compile(r"^/api/(tournaments|teams)/[^/]+/stats$"), budget="analytics", cost=1, heavy=True),
+]
+DEFAULT_ROUTE_COST = RouteCost(re.compile(r"^/api/"), budget="crud", cost=1)
+
+# Filters that narrow an aggregate; without any of them it scans the whole fact table
+_NARROWING_PARAMS = ("year", "league", "split", "patch", "tournament_id")
+
+
+def classify(path: str, query_params) -> Optional[RouteCost]:
+    for route_cost in ROUTE_COSTS:
+        if route_cost.pattern.match(path):
+            break
+    else:
+        if not DEFAULT_ROUTE_COST.pattern.match(path):
+            return None
+        route_cost = DEFAULT_ROUTE_COST
+
+    if route_cost.heavy and not any(query_params.get(name) for name in _NARROWING_PARAMS):
+        return RouteCost(route_cost.pattern, route_cost.budget, route_cost.cost * 2, heavy=True)
+    return route_cost
+
+
+def client_key(request) -> str:
+    """Identify the caller by token subject, falling back to the client address"""
+    authorization = request.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        payload = decode_access_token(authorization[7:])
+        if payload and payload.get("sub"):
+            return f"user:{payload['sub']}"
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+def _rejected(detail: str, retry_after: float, status_code: int) -> JSONResponse:
+    return JSONResponse(
+        status_code=status_code,
+        content={"detail": detail},
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+class AdmissionController:
+    """Per-client token buckets plus a concurrency cap on heavy queries"""
+
+    def __init__(
+        self,
+        backend: BucketBackend,
+        budgets: Dict[str, Budget],
+        max_heavy: int,
+        max_waiting: int,
+        queue_timeout: float,
+    ):
+        self.backend = backend
+        self.budgets = budgets
+        self.max_heavy = max_heavy
+        self.max_waiting = max_waiting
+        self.queue_timeout = queue_timeout
+        self._heavy_slots: Optional[asyncio.Semaphore] = None
+        self._waiting = 0
+
+    @property
+    def heavy_slots(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the running event loop
+        if self._heavy_slots is None:
+            self._heavy_slots = asyncio.Semaphore(self.max_heavy)
+        return self._heavy_slots
+
+    async def __call__(self, request, call_next):
+        route_cost = classify(request.url.path, request.query_params)
+        if route_cost is None or not route_cost.budget or request.method == "OPTIONS":
+            return await call_next(request)
+
+        # Per-client budget
+        budget = self.budgets[route_cost.budget]
+        wait = await self.backend.take(
+            f"{route_cost.budget}:{client_key(request)}", budget.rate, budget.burst, route_cost.cost
+        )
+        if wait > 0:
+            return _rejected("Rate limit exceeded", wait, status.HTTP_429_TOO_MANY_REQUESTS)
+
+        if not route_cost.heavy:
+            return await call_next(request)
+
+        # Global cap on in-flight heavy queries, with a short wait queue
+        if self.heavy_slots.locked() and self._waiting >= self.max_waiting:
+            return _rejected("Server busy, please retry", self.queue_timeout, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self.heavy_slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            return _rejected("Server busy, please retry", self.queue_timeout, status.HTTP_503_SERVICE_UNAVAILABLE)
+        finally:
+            self._waiting -= 1
+
+        try:
+            return await call_next(request)
+        finally:
+            self.heavy_slots.release()
+
+
+def create_admission_controller() -> AdmissionController:
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        backend = RedisBucketBackend.from_url(settings.RATE_LIMIT_REDIS_URL)
+    else:
+        backend = InMemoryBucketBackend()
+
+    return AdmissionController(
+        backend=backend,
+        budgets={
+            "crud": Budget(settings.RATE_LIMIT_CRUD_PER_SECOND, settings.RATE_LIMIT_CRUD_BURST),
+            "analytics": Budget(settings.RATE_LIMIT_ANALYTICS_PER_SECOND, settings.RATE_LIMIT_ANALYTICS_BURST),
+        },
+        max_heavy=settings.ANALYTICS_MAX_CONCURRENCY,
+        max_waiting=settings.ANALYTICS_MAX_WAITING,
+        queue_timeout=settings.ANALYTICS_QUEUE_TIMEOUT_SECONDS,
+    )
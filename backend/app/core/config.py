@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 
 from pydantic_settings import BaseSettings
 
@@ -10,17 +10,83 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str
+    SCHEMA_CHECK: str = "raise"  # raise, warn, off: startup behaviour when migrations are pending
+    DB_POOL_WARMUP: int = 2  # Connections opened at startup
 
     # JWT
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
+    JWT_EMBED_ROLE: bool = False  # Add a "role" claim that role checks accept without the stored role
+
+    # Password hashing pool
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 16  # Waiting hashes beyond this get a 429
+
+    # Admission control (per-client token buckets, heavy query concurrency cap)
+    RATE_LIMIT_ENABLED: bool = False  # Opt in; the in-memory backend limits per worker
+    RATE_LIMIT_BACKEND: str = "memory"  # memory, redis
+    RATE_LIMIT_REDIS_URL: Optional[str] = None
+    RATE_LIMIT_CRUD_PER_SECOND: float = 20.0
+    RATE_LIMIT_CRUD_BURST: float = 60.0
+    RATE_LIMIT_ANALYTICS_PER_SECOND: float = 1.0
+    RATE_LIMIT_ANALYTICS_BURST: float = 10.0
+    ANALYTICS_MAX_CONCURRENCY: int = 4
+    ANALYTICS_MAX_WAITING: int = 8
+    ANALYTICS_QUEUE_TIMEOUT_SECONDS: float = 2.0
+
+    # Request coalescing: how long a follower waits on the leader's result
+    SINGLEFLIGHT_TIMEOUT_SECONDS: float = 10.0
+
+    # Response store and background leaderboard precompute
+    RESPONSE_STORE_SIZE: int = 2048
+    RESPONSE_STORE_TTL_SECONDS: float = 3600.0
+    DATA_VERSION_POLL_SECONDS: float = 5.0
+    DATA_VERSION_SETTLE_SECONDS: float = 2.0  # Bumps within this window start one rebuild
+    PRECOMPUTE_ENABLED: bool = True
+    WARM_ON_STARTUP: bool = False  # Build indexes and leaderboards at boot rather than lazily
+    PRECOMPUTE_LEAGUES: str = "LCK,LPL,LEC,LCS"
+    # e.g. [{"name": "leaderboard/players", "params": {"metric": "dpm", "league": "LCK"}}]
+    PRECOMPUTE_LEADERBOARDS: List[dict] = []
+    PRECOMPUTE_TOP_K: int = 20
+    PRECOMPUTE_CONCURRENCY: int = 2
+    PRECOMPUTE_JITTER_SECONDS: float = 2.0
+
+    # Authenticated principal cache
+    PRINCIPAL_CACHE_SIZE: int = 1024
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30.0
+
+    # Prebuilt statements for hot routes, one per route and filter combination
+    STATEMENT_CACHE_SIZE: int = 512
+
+    # Batch GET (?ids=) limit
+    BATCH_MAX_IDS: int = 500
+
+    # Elo ratings
+    RATING_INITIAL: float = 1500.0
+    RATING_K_FACTOR: float = 32.0
+
+    # Similar players search
+    SIMILARITY_MIN_GAMES: int = 10
+
+    # Percentile cohorts (position x league x year x split)
+    PERCENTILE_MIN_GAMES: int = 5
+    SCORE_CACHE_SIZE: int = 256  # Compiled composite score expressions
+
+    # Recent form: last N box scores kept in memory per player and team
+    FORM_RING_SIZE: int = 20
 
     # CORS
     CORS_ORIGINS: str = "http://localhost:3000,http://localhost:5173"
 
     DEBUG: bool = False
 
+    # Query diagnostics (slow-query log and N+1 detection)
+    QUERY_DIAGNOSTICS: bool = False
+    QUERY_DIAGNOSTICS_RAISE: bool = False  # Raise NPlusOneError instead of logging (tests)
+    NPLUSONE_THRESHOLD: int = 10  # Same query shape more than N times per request
+    SLOW_QUERY_MS: float = 200.0
+
     class Config:
         env_file = ".env"
         case_sensitive = True
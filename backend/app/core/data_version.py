@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Callable, List, Optional
+
+from sqlmodel import Session, update
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.data_version import DataVersion
+
+logger = logging.getLogger("app.data_version")
+
+_listeners: List[Callable[[int], None]] = []
+_current = 0
+_pending: Optional[threading.Timer] = None
+_pending_lock = threading.Lock()
+
+
+def current_data_version() -> int:
+    """Data version as last seen by this process"""
+    return _current
+
+
+def on_data_version_change(listener: Callable[[int], None]) -> Callable[[int], None]:
+    """Register a callback run whenever the data version changes.
+
+    Bumps are coalesced: callbacks run once per DATA_VERSION_SETTLE_SECONDS
+    window, with the latest version, on a timer thread (so they must be safe
+    to call from any thread).
+    """
+    _listeners.append(listener)
+    return listener
+
+
+def _notify() -> None:
+    global _pending
+    with _pending_lock:
+        _pending = None
+    version = _current
+    for listener in _listeners:
+        try:
+            listener(version)
+        except Exception:
+            logger.exception("Data version listener failed")
+
+
+def set_data_version(version: int, notify: bool = True) -> None:
+    """Adopt `version` at once (cached answers key on it); the listeners'
+    rebuilds wait for the settle window so a burst of writes, such as the
+    ten stat rows of one game, starts them once. `notify=False` only adopts
+    it, for a worker picking up the stored version at boot"""
+    global _current, _pending
+    if version == _current:
+        return
+    _current = version
+    if not notify:
+        return
+    if settings.DATA_VERSION_SETTLE_SECONDS <= 0:
+        _notify()
+        return
+    with _pending_lock:
+        if _pending is None:
+            _pending = threading.Timer(settings.DATA_VERSION_SETTLE_SECONDS, _notify)
+            _pending.daemon = True
+            _pending.start()
+
+
+def load_data_version() -> int:
+    with Session(engine) as session:
+        row = session.get(DataVersion, 1)
+        return row.version if row else 0
+
+
+def bump_data_version(session: Session) -> int:
+    """Mark derived data (caches, precomputed responses) stale after a write"""
+    result = session.exec(
+        update(DataVersion)
+        .where(DataVersion.id == 1)
+        .values(version=DataVersion.version + 1, updated_at=datetime.now(timezone.utc))
+    )
+    if result.rowcount == 0:
+        session.add(DataVersion(id=1, version=1))
+    session.commit()
+
+    version = session.get(DataVersion, 1, populate_existing=True).version
+    set_data_version(version)
+    return version
+
+
+async def watch_data_version(interval: float) -> None:
+    """Pick up bumps made by other workers or by the ingest command.
+    Startup has just loaded the version, so the first poll waits `interval`"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            set_data_version(await run_in_threadpool(load_data_version))
+        except Exception:
+            logger.exception("Could not load the data version")
@@ -1,6 +1,11 @@
-from sqlmodel import Session, SQLModel, create_engine
+import logging
+from sqlmodel import Session, create_engine
 from typing import Generator
 from app.core.config import settings
+from app.core.diagnostics import install_query_diagnostics
+from app.migrations import current_version, head
+
+logger = logging.getLogger("app.database")
 
 connect_args = {
     "ssl": {
@@ -17,9 +22,42 @@ engine = create_engine(
     connect_args=connect_args
 )
 
-# Create all tables
-def create_db_and_tables():
-    SQLModel.metadata.create_all(engine)
+if settings.QUERY_DIAGNOSTICS:
+    install_query_diagnostics(engine)
+
+class SchemaOutOfDate(RuntimeError):
+    pass
+
+
+# Startup check: the schema itself is owned by `python -m app.cli migrate`
+def check_schema_version() -> int:
+    expected = head()
+    with engine.connect() as connection:
+        version = current_version(connection)
+    if version < expected:
+        message = (
+            f"Database schema is at version {version} but this build needs {expected}; "
+            "run `python -m app.cli migrate`"
+        )
+        if settings.SCHEMA_CHECK == "raise":
+            raise SchemaOutOfDate(message)
+        logger.warning(message)
+    elif version > expected:
+        logger.info("Database schema version %d is newer than this build (%d)", version, expected)
+    return version
+
+
+# Open pool connections up front so the first requests skip connect + TLS handshake
+def warm_pool(connections: int) -> None:
+    held = []
+    try:
+        for _ in range(connections):
+            connection = engine.connect()
+            held.append(connection)
+            connection.exec_driver_sql("SELECT 1")
+    finally:
+        for connection in held:
+            connection.close()
 
 # Dependency to get database session
 def get_session() -> Generator[Session, None, None]:
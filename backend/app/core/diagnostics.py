@@ -0,0 +1,148 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.diagnostics")
+
+
+class NPlusOneError(RuntimeError):
+    """Raised in strict mode when a request repeats the same query shape too often"""
+
+
+# Patterns used to reduce a statement to its "shape"
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\([^)]+\)s|%s|\?|:\w+")
+_IN_LIST = re.compile(r"\bIN\s*\((?:\s*\?\s*,?)+\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str) -> str:
+    """Reduce a SQL statement to its shape (literals and bind markers replaced by ?)"""
+    shape = _STRING_LITERAL.sub("?", statement)
+    shape = _PLACEHOLDER.sub("?", shape)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _IN_LIST.sub("IN (?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+@dataclass
+class SlowQuery:
+    statement: str
+    parameters: Any
+    duration_ms: float
+
+
+@dataclass
+class QueryLog:
+    """Statements issued while handling one request"""
+    route: str
+    threshold: int = settings.NPLUSONE_THRESHOLD
+    slow_ms: float = settings.SLOW_QUERY_MS
+    shapes: Counter = field(default_factory=Counter)
+    samples: Dict[str, str] = field(default_factory=dict)
+    slow: List[SlowQuery] = field(default_factory=list)
+    total_ms: float = 0.0
+
+    def record(self, statement: str, parameters: Any, duration_ms: float) -> None:
+        shape = normalize_sql(statement)
+        self.shapes[shape] += 1
+        self.samples.setdefault(shape, statement)
+        self.total_ms += duration_ms
+        if duration_ms >= self.slow_ms:
+            self.slow.append(SlowQuery(statement, parameters, duration_ms))
+
+    @property
+    def total_queries(self) -> int:
+        return sum(self.shapes.values())
+
+    def repeated_shapes(self) -> Dict[str, int]:
+        """Shapes executed more than `threshold` times (probable N+1)"""
+        return {shape: count for shape, count in self.shapes.items() if count > self.threshold}
+
+    def report(self, raise_on_nplusone: bool = False) -> None:
+        for query in self.slow:
+            logger.warning(
+                "Slow query (%.1f ms) in %s: %s | params=%r",
+                query.duration_ms, self.route, query.statement, query.parameters,
+            )
+
+        repeated = self.repeated_shapes()
+        for shape, count in repeated.items():
+            logger.warning(
+                "Probable N+1 in %s: shape executed %d times: %s",
+                self.route, count, shape,
+            )
+
+        if repeated and raise_on_nplusone:
+            shape, count = max(repeated.items(), key=lambda item: item[1])
+            raise NPlusOneError(
+                f"{self.route} executed the same query shape {count} times "
+                f"(threshold {self.threshold}): {shape}"
+            )
+
+
+_current_log: ContextVar[Optional[QueryLog]] = ContextVar("query_log", default=None)
+
+
+@contextmanager
+def track_queries(
+    route: str = "<unknown>",
+    threshold: Optional[int] = None,
+    raise_on_nplusone: Optional[bool] = None,
+) -> Iterator[QueryLog]:
+    """Collect the statements issued inside the block and report slow / repeated shapes.
+
+    Usable around a request (see `query_diagnostics_middleware`) or directly in tests.
+    """
+    log = QueryLog(route=route)
+    if threshold is not None:
+        log.threshold = threshold
+    if raise_on_nplusone is None:
+        raise_on_nplusone = settings.QUERY_DIAGNOSTICS_RAISE
+
+    token = _current_log.set(log)
+    try:
+        yield log
+    finally:
+        _current_log.reset(token)
+    log.report(raise_on_nplusone=raise_on_nplusone)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start_time"].pop()
+    log = _current_log.get()
+    if log is not None:
+        log.record(statement, parameters, (time.perf_counter() - started) * 1000)
+
+
+def install_query_diagnostics(engine: Engine) -> None:
+    """Attach the timing listeners to an engine"""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+async def query_diagnostics_middleware(request, call_next):
+    """Group the statements of each request by shape and flag N+1 patterns"""
+    with track_queries(route=f"{request.method} {request.url.path}") as log:
+        response = await call_next(request)
+        # Prefer the route template (/api/teams/{team_id}/matches) once routing is done
+        route = request.scope.get("route")
+        if route is not None:
+            log.route = f"{request.method} {route.path}"
+    return response
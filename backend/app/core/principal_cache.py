@@ -0,0 +1,61 @@
+import itertools
+import threading
+from typing import Optional, Tuple
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.user import User
+
+
+class PrincipalCache:
+    """Authenticated users cached by token subject.
+
+    Each entry holds (version stamp, user). Invalidating a user replaces its
+    entry with a newer stamp and no user, so a request that loaded the user
+    before the change cannot store its stale copy afterwards; the stamps
+    live in the bounded cache itself. Other workers pick the change up once
+    their entry's TTL runs out.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._stamps = itertools.count(1)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, username: str) -> Tuple[int, Optional[User]]:
+        """(version stamp, cached user or None); hand the stamp back to put()"""
+        version, user = self._entries.get(username, (0, None))
+        if user is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return version, user
+
+    def put(self, user: User, version: int) -> User:
+        """Cache a detached copy of `user` unless it was invalidated since get() and return it"""
+        principal = User.model_validate(user.model_dump())
+        with self._lock:
+            current, _ = self._entries.get(user.username, (0, None))
+            if current == version:
+                self._entries.set(user.username, (version, principal))
+        return principal
+
+    def invalidate(self, username: str) -> None:
+        with self._lock:
+            self._entries.set(username, (next(self._stamps), None))
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+principal_cache = PrincipalCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,70 @@
+from collections import Counter
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from sqlmodel import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.data_version import current_data_version
+from app.core.singleflight import request_key, single_flight
+
+_MAX_TRACKED_KEYS = 1000
+
+_MISSING = object()
+
+
+class ResponseStore:
+    """Computed responses keyed by (request key, data version).
+
+    Bumping the data version makes every stored answer unreachable at once;
+    the background precompute then refills the popular keys. Request counts
+    are kept so the precompute can learn which keys are popular.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.requests: Dict[str, Counter] = {}
+
+    def get(self, key: Tuple, default: Any = None) -> Any:
+        return self._entries.get((key, current_data_version()), default)
+
+    def put(self, key: Tuple, value: Any, version: Optional[int] = None) -> None:
+        if version is None:
+            version = current_data_version()
+        self._entries.set((key, version), value)
+
+    def record(self, key: Tuple) -> None:
+        counter = self.requests.setdefault(key[0], Counter())
+        counter[key] += 1
+        # Keep the tally bounded when clients send many one-off filter combinations
+        if len(counter) > _MAX_TRACKED_KEYS:
+            self.requests[key[0]] = Counter(dict(counter.most_common(_MAX_TRACKED_KEYS // 2)))
+
+    def top_keys(self, name: str, k: int) -> List[Tuple]:
+        return [key for key, _ in self.requests.get(name, Counter()).most_common(k)]
+
+    @property
+    def hit_rate(self) -> float:
+        return self._entries.hit_rate
+
+
+response_store = ResponseStore(
+    maxsize=settings.RESPONSE_STORE_SIZE,
+    ttl=settings.RESPONSE_STORE_TTL_SECONDS,
+)
+
+
+async def cached_response(
+    name: str, compute: Callable, session: Session, params: Mapping[str, Any]
+) -> Any:
+    """Serve `compute(session, **params)` from the response store, coalescing misses"""
+    key = request_key(name, params)
+    response_store.record(key)
+
+    # None is a valid answer (e.g. no data yet), so look up with a sentinel
+    result = response_store.get(key, _MISSING)
+    if result is _MISSING:
+        version = current_data_version()
+        result = await single_flight.do(key, compute, session, **params)
+        response_store.put(key, result, version)
+    return result
@@ -1,5 +1,8 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Optional, Tuple
 import jwt
 from jwt.exceptions import InvalidTokenError
 from pwdlib import PasswordHash
@@ -17,10 +20,57 @@ def get_password_hash(password: str) -> str:
     """Hash a password"""
     return password_hash.hash(password)
 
+# Non-blocking hashing
+# Argon2 is deliberately slow, so async routes hand it to a small dedicated pool
+# (argon2-cffi releases the GIL) instead of stalling the event loop.
+class PasswordHashingBusy(Exception):
+    """Raised when the hashing pool and its wait queue are full"""
+
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+)
+_hash_pending = 0
+_hash_pending_lock = threading.Lock()
+
+def _hash_done(_future) -> None:
+    global _hash_pending
+    with _hash_pending_lock:
+        _hash_pending -= 1
+
+async def _run_hashing(fn, *args):
+    # A hash counts as pending until its thread is done with it: a request that
+    # stops waiting (client gone, cancelled) does not free the worker
+    global _hash_pending
+    with _hash_pending_lock:
+        if _hash_pending >= settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_MAX_QUEUE:
+            raise PasswordHashingBusy()
+        _hash_pending += 1
+    future = _hash_executor.submit(fn, *args)
+    future.add_done_callback(_hash_done)
+    return await asyncio.wrap_future(future)
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """Verify a password off the event loop.
+
+    Returns (valid, updated_hash); updated_hash is set when the stored hash uses
+    outdated parameters and should be replaced.
+    """
+    return await _run_hashing(password_hash.verify_and_update, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password off the event loop"""
+    return await _run_hashing(password_hash.hash, password)
+
 # JWT token functions
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
-    """Create JWT access token"""
+def create_access_token(
+    data: dict, expires_delta: Optional[timedelta] = None, role: Optional[str] = None
+) -> str:
+    """Create JWT access token (with a role claim when JWT_EMBED_ROLE is enabled)"""
     to_encode = data.copy()
+    if role is not None and settings.JWT_EMBED_ROLE:
+        to_encode["role"] = role
     if expires_delta:
         expire = datetime.now(timezone.utc) + expires_delta
     else:
@@ -0,0 +1,66 @@
+import asyncio
+from typing import Any, Callable, Dict, Hashable, Mapping, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+
+
+def request_key(name: str, params: Mapping[str, Any]) -> Tuple:
+    """Normalized key for a request: route name plus its non-empty parameters"""
+    return (name, tuple(sorted((k, v) for k, v in params.items() if v is not None)))
+
+
+class SingleFlight:
+    """Share one in-flight computation between concurrent callers with the same key.
+
+    The first caller (leader) runs `fn` in the threadpool; callers arriving while
+    it runs (followers) await its result. A follower waits at most `timeout`
+    seconds before computing on its own, and retries if the leader is cancelled
+    rather than inheriting the cancellation.
+    """
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self.leaders = 0
+        self.followers = 0
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        while True:
+            future = self._calls.get(key)
+            if future is None:
+                return await self._lead(key, fn, *args, **kwargs)
+
+            self.followers += 1
+            try:
+                return await asyncio.wait_for(asyncio.shield(future), timeout=self.timeout)
+            except asyncio.TimeoutError:
+                return await run_in_threadpool(fn, *args, **kwargs)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise  # This follower was cancelled itself
+                # The leader went away: try again (possibly as the new leader)
+
+    async def _lead(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self.leaders += 1
+        try:
+            result = await run_in_threadpool(fn, *args, **kwargs)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            future.exception()  # Mark as retrieved when there are no followers
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+
+single_flight = SingleFlight(timeout=settings.SINGLEFLIGHT_TIMEOUT_SECONDS)
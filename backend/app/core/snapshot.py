@@ -0,0 +1,74 @@
+import asyncio
+import logging
+import threading
+from typing import Callable, Generic, List, Optional, TypeVar
+
+from sqlmodel import Session
+
+from app.core.data_version import current_data_version, on_data_version_change
+from app.core.database import engine
+
+logger = logging.getLogger("app.snapshot")
+
+T = TypeVar("T")
+
+_snapshots: List["VersionedSnapshot"] = []
+
+
+class VersionedSnapshot(Generic[T]):
+    """In-process structure built from the database for one data version.
+
+    `get()` rebuilds when the data version has moved on. While a rebuild is
+    running other callers keep getting the previous build instead of waiting;
+    only the very first build blocks. Answers that are stored under the
+    current data version pass `wait=True` so they are never computed from a
+    previous build. Call `get()` from a worker thread.
+    """
+
+    def __init__(self, name: str, build: Callable[[Session], T]):
+        self.name = name
+        self.build = build
+        self.builds = 0
+        self._value: Optional[T] = None
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+        _snapshots.append(self)
+
+    def get(self, wait: bool = False) -> T:
+        version = current_data_version()
+        if self._version == version:
+            return self._value
+
+        if not self._lock.acquire(blocking=wait or self._value is None):
+            return self._value  # Someone else is rebuilding
+        try:
+            if self._version != version:
+                with Session(engine) as session:
+                    self._value = self.build(session)
+                self._version = version
+                self.builds += 1
+                logger.info("Built %s for data version %d", self.name, version)
+        finally:
+            self._lock.release()
+        return self._value
+
+
+def start_snapshots(loop: asyncio.AbstractEventLoop, warm: bool = False) -> None:
+    """Rebuild every snapshot in the background as soon as the data version
+    changes; with `warm` also build them now instead of on first use"""
+
+    def refresh(snapshot: VersionedSnapshot) -> None:
+        try:
+            snapshot.get()
+        except Exception:
+            logger.exception("Rebuilding %s failed", snapshot.name)
+
+    def rebuild(version: int) -> None:
+        if loop.is_closed():
+            return
+        for snapshot in _snapshots:
+            loop.call_soon_threadsafe(loop.run_in_executor, None, refresh, snapshot)
+
+    on_data_version_change(rebuild)
+    if warm:
+        rebuild(current_data_version())
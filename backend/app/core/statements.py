@@ -0,0 +1,37 @@
+from typing import Callable, Hashable, TypeVar
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+T = TypeVar("T")
+
+
+class StatementCache:
+    """Prebuilt select() trees for hot routes, keyed by route and query shape.
+
+    The key names the route plus whichever optional filters, sort and
+    pagination the request uses; every value the client sends goes in as a
+    bound parameter at execution. A hit skips building the tree and reuses
+    its memoized cache key, so SQLAlchemy finds the compiled SQL without
+    traversing the statement again.
+    """
+
+    def __init__(self, maxsize: int):
+        self._entries = TTLCache(maxsize=maxsize, ttl=float("inf"))
+
+    def get(self, key: Hashable, build: Callable[[], T]) -> T:
+        statement = self._entries.get(key)
+        if statement is None:
+            statement = build()
+            self._entries.set(key, statement)
+        return statement
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        return self._entries.hit_rate
+
+
+statement_cache = StatementCache(maxsize=settings.STATEMENT_CACHE_SIZE)
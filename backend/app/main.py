@@ -1,9 +1,16 @@
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.routes import auth, users, teams, players, tournaments, matches, analytics
+from app.core.admission import create_admission_controller
 from app.core.config import settings
-from app.core.database import create_db_and_tables
+from app.core.data_version import load_data_version, set_data_version, watch_data_version
+from app.core.database import check_schema_version, warm_pool
+from app.core.diagnostics import query_diagnostics_middleware
+from app.core.snapshot import start_snapshots
+from app.services.precompute import start_precompute
 
 # Create FastAPI app
 app = FastAPI(
@@ -14,7 +21,15 @@ app = FastAPI(
     openapi_url="/api/openapi.json",
 )
 
-# Configure CORS
+# Slow-query log and N+1 detection
+if settings.QUERY_DIAGNOSTICS:
+    app.middleware("http")(query_diagnostics_middleware)
+
+# Rate limiting and heavy query admission
+if settings.RATE_LIMIT_ENABLED:
+    app.middleware("http")(create_admission_controller())
+
+# Configure CORS (added last so it also wraps rejected requests)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins_list,
@@ -24,10 +39,32 @@ app.add_middleware(
 )
 
 
-# Create database tables on startup
+# Tables are created by `python -m app.cli migrate`; workers only check the version
 @app.on_event("startup")
 def on_startup():
-    create_db_and_tables()
+    if settings.SCHEMA_CHECK != "off":
+        check_schema_version()
+    warm_pool(settings.DB_POOL_WARMUP)
+
+
+# Track the data version and keep popular leaderboards and in-memory indexes warm.
+# The stored version is adopted before the listeners register, so booting rebuilds
+# nothing: indexes build on first use and leaderboards after the next data change,
+# unless WARM_ON_STARTUP asks for both now
+@app.on_event("startup")
+async def start_background_tasks():
+    set_data_version(load_data_version(), notify=False)
+    start_snapshots(asyncio.get_running_loop(), warm=settings.WARM_ON_STARTUP)
+    if settings.PRECOMPUTE_ENABLED:
+        start_precompute(warm=settings.WARM_ON_STARTUP)
+    app.state.data_version_watcher = asyncio.create_task(
+        watch_data_version(settings.DATA_VERSION_POLL_SECONDS)
+    )
+
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    app.state.data_version_watcher.cancel()
 
 
 # Include routers
@@ -0,0 +1,113 @@
+"""Versioned schema migrations.
+
+Every table, index, view, trigger and stored procedure is created here, by
+`python -m app.cli migrate`, never by the API workers. Migrations are the
+modules `mNNNN_<name>.py` in this package, applied in order and recorded in
+`schema_migrations`. Each one exposes `upgrade(connection)` and its module
+docstring is the description.
+
+A migration is frozen once released: it declares the tables it creates itself
+instead of importing app.models, so later model changes go in a new migration.
+MySQL commits DDL implicitly, so a migration is not atomic; write it so that
+running it again after a failure is safe (see app.migrations.ops).
+"""
+import importlib
+import logging
+import pkgutil
+import re
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from types import ModuleType
+from typing import Iterator, List, Optional
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, insert, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger("app.migrations")
+
+_MODULE_NAME = re.compile(r"^m(\d{4})_(\w+)$")
+
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", Integer, primary_key=True, autoincrement=False),
+    Column("description", String(200), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+
+    @property
+    def module(self) -> ModuleType:
+        return importlib.import_module(f"{__name__}.m{self.version:04d}_{self.name}")
+
+    @property
+    def description(self) -> str:
+        return (self.module.__doc__ or self.name).strip().splitlines()[0][:200]
+
+
+def discover() -> List[Migration]:
+    """Migrations shipped with this build, oldest first (modules are not imported)"""
+    migrations = []
+    for module in pkgutil.iter_modules(__path__):
+        match = _MODULE_NAME.match(module.name)
+        if match:
+            migrations.append(Migration(int(match.group(1)), match.group(2)))
+    return sorted(migrations, key=lambda migration: migration.version)
+
+
+def head() -> int:
+    """Schema version this build expects"""
+    migrations = discover()
+    return migrations[-1].version if migrations else 0
+
+
+def current_version(connection: Connection) -> int:
+    """Latest applied migration, 0 for a database that was never migrated"""
+    if not inspect(connection).has_table(schema_migrations.name):
+        return 0
+    return connection.execute(select(func.max(schema_migrations.c.version))).scalar() or 0
+
+
+@contextmanager
+def _migration_lock(connection: Connection) -> Iterator[None]:
+    """Keep two `migrate` runs (e.g. two deploys) from interleaving"""
+    if connection.dialect.name != "mysql":
+        yield
+        return
+    if not connection.execute(text("SELECT GET_LOCK('schema_migrations', 600)")).scalar():
+        raise RuntimeError("Timed out waiting for another migration run")
+    try:
+        yield
+    finally:
+        connection.execute(text("SELECT RELEASE_LOCK('schema_migrations')"))
+
+
+def migrate(engine: Engine, target: Optional[int] = None) -> List[Migration]:
+    """Apply the pending migrations up to `target` (default: all); returns those applied"""
+    applied = []
+    with engine.connect() as connection, _migration_lock(connection):
+        schema_migrations.create(connection, checkfirst=True)
+        connection.commit()
+        done = set(connection.execute(select(schema_migrations.c.version)).scalars())
+
+        for migration in discover():
+            if migration.version in done or (target is not None and migration.version > target):
+                continue
+            logger.info("Applying %04d %s", migration.version, migration.name)
+            migration.module.upgrade(connection)
+            connection.execute(
+                insert(schema_migrations).values(
+                    version=migration.version,
+                    description=migration.description,
+                    applied_at=datetime.now(timezone.utc),
+                )
+            )
+            connection.commit()
+            applied.append(migration)
+    return applied
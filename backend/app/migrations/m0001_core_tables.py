@@ -0,0 +1,145 @@
+"""Core tables: users, teams, players, tournaments, matches and their link tables"""
+from sqlalchemy import (
+    CHAR,
+    Boolean,
+    Column,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    Numeric,
+    String,
+    Table,
+    Text,
+    UniqueConstraint,
+    text,
+)
+from sqlalchemy.engine import Connection
+
+from app.migrations.ops import create_tables, is_mysql
+
+
+def _tables(uuid_default) -> MetaData:
+    metadata = MetaData()
+
+    def uuid_pk() -> Column:
+        # Data_Insertion.sql relies on the database filling in ids
+        return Column("id", CHAR(36), primary_key=True, server_default=uuid_default)
+
+    Table(
+        "users",
+        metadata,
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("username", String(50), nullable=False),
+        Column("email", String(100), nullable=False),
+        Column("full_name", String(100)),
+        Column("hashed_password", String(255), nullable=False),
+        Column("role", String(20), nullable=False),
+        Column("disabled", Boolean, nullable=False),
+        Column("created_at", DateTime, nullable=False),
+        Index("ix_users_username", "username", unique=True),
+        Index("ix_users_email", "email", unique=True),
+    )
+    Table(
+        "teams",
+        metadata,
+        uuid_pk(),
+        Column("external_id", String(64)),
+        Column("team_name", String(100), nullable=False),
+        Index("ix_teams_external_id", "external_id", unique=True),
+        Index("ix_teams_team_name", "team_name"),
+    )
+    Table(
+        "tournaments",
+        metadata,
+        uuid_pk(),
+        Column("league", String(50), nullable=False),
+        Column("year", Integer, nullable=False),
+        Column("split", String(20)),
+        Column("playoffs", Boolean),
+        UniqueConstraint("league", "year", "split", "playoffs", name="unique_tournament"),
+        Index("ix_tournaments_league", "league"),
+        Index("ix_tournaments_year", "year"),
+    )
+    Table(
+        "matches",
+        metadata,
+        uuid_pk(),
+        Column("external_id", String(64), nullable=False),
+        Column("tournament_id", CHAR(36), ForeignKey("tournaments.id", ondelete="CASCADE")),
+        Column("game_number", Integer),
+        Column("game_length", Integer),
+        Column("patch", String(20)),
+        Column("match_date", Date),
+        Column("data_completeness", String(20)),
+        Column("url", Text),
+        Index("ix_matches_external_id", "external_id", unique=True),
+        Index("ix_matches_tournament_id", "tournament_id"),
+        Index("ix_matches_match_date", "match_date"),
+    )
+    Table(
+        "players",
+        metadata,
+        uuid_pk(),
+        Column("external_id", String(64), nullable=False),
+        Column("player_name", String(100), nullable=False),
+        Column("position", String(20)),
+        Index("ix_players_external_id", "external_id", unique=True),
+        Index("ix_players_player_name", "player_name"),
+    )
+    Table(
+        "team_tournaments",
+        metadata,
+        Column("team_id", CHAR(36), ForeignKey("teams.id", ondelete="CASCADE"), primary_key=True),
+        Column("tournament_id", CHAR(36), ForeignKey("tournaments.id", ondelete="CASCADE"), primary_key=True),
+    )
+    Table(
+        "match_player_stats",
+        metadata,
+        Column("match_id", CHAR(36), ForeignKey("matches.id", ondelete="CASCADE"), primary_key=True),
+        Column("player_id", CHAR(36), ForeignKey("players.id", ondelete="CASCADE"), primary_key=True),
+        Column("team_id", CHAR(36), ForeignKey("teams.id", ondelete="CASCADE")),
+        Column("side", String(10)),
+        Column("champion", String(50)),
+        Column("result", Boolean),
+        # Combat stats
+        Column("kills", Integer),
+        Column("deaths", Integer),
+        Column("assists", Integer),
+        Column("doublekills", Integer, server_default="0"),
+        Column("triplekills", Integer, server_default="0"),
+        Column("quadrakills", Integer, server_default="0"),
+        Column("pentakills", Integer, server_default="0"),
+        # Objectives (player contribution)
+        Column("firstblood", Boolean, server_default="0"),
+        Column("firstbloodkill", Boolean, server_default="0"),
+        Column("firstbloodassist", Boolean, server_default="0"),
+        # Economy
+        Column("totalgold", Integer),
+        Column("earnedgold", Integer),
+        Column("earned_gpm", Numeric(10, 2)),
+        Column("goldspent", Integer),
+        # Damage
+        Column("damagetochampions", Integer),
+        Column("dpm", Numeric(10, 2)),
+        Column("damageshare", Numeric(5, 4)),
+        # Vision
+        Column("wardsplaced", Integer),
+        Column("wardskilled", Integer),
+        Column("controlwardsbought", Integer),
+        Column("visionscore", Integer),
+        # Farm
+        Column("total_cs", Integer),
+        Column("minionkills", Integer),
+        Column("monsterkills", Integer),
+        Column("cspm", Numeric(10, 4)),
+        Index("ix_match_player_stats_team_id", "team_id"),
+    )
+    return metadata
+
+
+def upgrade(connection: Connection) -> None:
+    uuid_default = text("(UUID())") if is_mysql(connection) else None
+    create_tables(connection, _tables(uuid_default))
@@ -0,0 +1,11 @@
+"""Lookup indexes (formerly database/Performance_optimization.sql)"""
+from sqlalchemy.engine import Connection
+
+from app.migrations.ops import create_index
+
+
+def upgrade(connection: Connection) -> None:
+    create_index(connection, "idx_mps_team_result", "match_player_stats", ["team_id", "result"])
+    create_index(connection, "idx_player_stats_composite", "match_player_stats", ["player_id", "match_id", "result"])
+    create_index(connection, "idx_tournament_lookup", "tournaments", ["league", "year", "split", "playoffs"])
+    create_index(connection, "idx_champion", "match_player_stats", ["champion"])
@@ -0,0 +1,93 @@
+"""player_match_summary view, match_player_stats trigger and stored procedures"""
+from sqlalchemy.engine import Connection
+
+from app.migrations.ops import execute_all, is_mysql
+
+VIEWS = [
+    "DROP VIEW IF EXISTS player_match_summary",
+    """
+    CREATE VIEW player_match_summary AS
+    SELECT
+        p.player_name,
+        t.team_name,
+        m.external_id AS match_id,
+        mps.kills,
+        mps.deaths,
+        mps.assists,
+        mps.earnedgold,
+        mps.cspm
+    FROM match_player_stats mps
+    JOIN players p ON mps.player_id = p.id
+    JOIN teams t ON mps.team_id = t.id
+    JOIN matches m ON mps.match_id = m.id
+    """,
+]
+
+# MySQL only: trigger and procedure bodies use MySQL syntax
+TRIGGERS = [
+    "DROP TRIGGER IF EXISTS validate_match_player",
+    """
+    CREATE TRIGGER validate_match_player
+    BEFORE INSERT ON match_player_stats
+    FOR EACH ROW
+    BEGIN
+        -- Only player-level rows belong in match_player_stats
+        IF NEW.player_id IS NULL THEN
+            SIGNAL SQLSTATE '45000'
+            SET MESSAGE_TEXT = 'Invalid record: non-player data is not allowed in match_player_stats';
+        END IF;
+
+        IF NEW.side NOT IN ('BLUE', 'RED') THEN
+            SIGNAL SQLSTATE '45000'
+            SET MESSAGE_TEXT = 'Invalid side value (must be BLUE or RED)';
+        END IF;
+    END
+    """,
+]
+
+PROCEDURES = [
+    "DROP PROCEDURE IF EXISTS get_champion_stats",
+    "DROP PROCEDURE IF EXISTS get_player_performance",
+    """
+    CREATE PROCEDURE get_champion_stats(IN min_games INT)
+    BEGIN
+        -- Reads the champion_patch_stats aggregate (maintained by ingest)
+        -- instead of scanning match_player_stats
+        SELECT
+            champion,
+            SUM(games) AS games_played,
+            SUM(wins) AS wins,
+            SUM(games) - SUM(wins) AS losses,
+            ROUND(SUM(wins) * 100.0 / SUM(games), 2) AS win_rate,
+            ROUND(SUM(kills) / SUM(games), 2) AS avg_kills,
+            ROUND(SUM(deaths) / SUM(games), 2) AS avg_deaths,
+            ROUND(SUM(assists) / SUM(games), 2) AS avg_assists
+        FROM champion_patch_stats
+        GROUP BY champion
+        HAVING games_played >= min_games
+        ORDER BY win_rate DESC, games_played DESC;
+    END
+    """,
+    """
+    CREATE PROCEDURE get_player_performance(IN external_id VARCHAR(64))
+    BEGIN
+        SELECT
+            p.player_name,
+            COUNT(*) AS games_played,
+            ROUND(AVG(mps.goldspent), 2) AS avg_goldspent,
+            ROUND(AVG(mps.dpm), 2) AS avg_damage_per_min,
+            ROUND(AVG(mps.wardsplaced), 0) AS avg_wards_placed
+        FROM match_player_stats mps
+        JOIN players p ON p.id = mps.player_id
+        WHERE p.external_id = external_id
+        GROUP BY p.player_name;
+    END
+    """,
+]
+
+
+def upgrade(connection: Connection) -> None:
+    execute_all(connection, VIEWS)
+    if is_mysql(connection):
+        execute_all(connection, TRIGGERS)
+        execute_all(connection, PROCEDURES)
@@ -0,0 +1,17 @@
+"""data_version: single row bumped after writes so caches know to refresh"""
+from sqlalchemy import Column, DateTime, Integer, MetaData, Table
+from sqlalchemy.engine import Connection
+
+from app.migrations.ops import create_tables
+
+
+def upgrade(connection: Connection) -> None:
+    metadata = MetaData()
+    Table(
+        "data_version",
+        metadata,
+        Column("id", Integer, primary_key=True, autoincrement=False),
+        Column("version", Integer, nullable=False),
+        Column("updated_at", DateTime, nullable=False),
+    )
+    create_tables(connection, metadata)
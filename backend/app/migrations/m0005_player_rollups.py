@@ -0,0 +1,37 @@
+"""Player rollups: career, per team and per champion totals"""
+from sqlalchemy import CHAR, Column, ForeignKey, Integer, MetaData, String, Table
+from sqlalchemy.engine import Connection
+
+from app.migrations.ops import create_tables
+
+
+def _totals(*columns: str):
+    return [Column(name, Integer, nullable=False) for name in columns]
+
+
+def upgrade(connection: Connection) -> None:
+    metadata = MetaData()
+    Table("players", metadata, Column("id", CHAR(36), primary_key=True))
+    Table("teams", metadata, Column("id", CHAR(36), primary_key=True))
+
+    Table(
+        "player_career_stats",
+        metadata,
+        Column("player_id", CHAR(36), ForeignKey("players.id", ondelete="CASCADE"), primary_key=True),
+        *_totals("games", "wins", "kills", "deaths", "assists"),
+    )
+    Table(
+        "player_team_stats",
+        metadata,
+        Column("player_id", CHAR(36), ForeignKey("players.id", ondelete="CASCADE"), primary_key=True),
+        Column("team_id", CHAR(36), ForeignKey("teams.id", ondelete="CASCADE"), primary_key=True),
+        *_totals("games", "wins"),
+    )
+    Table(
+        "player_champion_stats",
+        metadata,
+        Column("player_id", CHAR(36), ForeignKey("players.id", ondelete="CASCADE"), primary_key=True),
+        Column("champion", String(50), primary_key=True),
+        *_totals("games", "wins", "kills", "deaths", "assists"),
+    )
+    create_tables(connection, metadata, references=("players", "teams"))
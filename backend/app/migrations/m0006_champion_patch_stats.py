@@ -0,0 +1,26 @@
+"""champion_patch_stats: champion x patch x league x position aggregate"""
+from sqlalchemy import Column, Float, Index, Integer, MetaData, String, Table
+from sqlalchemy.engine import Connection
+
+from app.migrations.ops import create_tables
+
+
+def upgrade(connection: Connection) -> None:
+    metadata = MetaData()
+    Table(
+        "champion_patch_stats",
+        metadata,
+        Column("champion", String(50), primary_key=True),
+        Column("patch", String(20), primary_key=True),
+        Column("league", String(50), primary_key=True),
+        Column("position", String(20), primary_key=True),
+        Column("games", Integer, nullable=False),
+        Column("wins", Integer, nullable=False),
+        Column("kills", Integer, nullable=False),
+        Column("deaths", Integer, nullable=False),
+        Column("assists", Integer, nullable=False),
+        Column("dpm_sum", Float, nullable=False),
+        Index("idx_champion_stats_patch_league", "patch", "league", "position"),
+        Index("idx_champion_stats_league_patch", "league", "patch"),
+    )
+    create_tables(connection, metadata)
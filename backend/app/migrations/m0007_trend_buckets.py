@@ -0,0 +1,30 @@
+"""trend_buckets: per week / month / patch / split totals for trend lines"""
+from sqlalchemy import Column, Date, Float, Index, Integer, MetaData, String, Table
+from sqlalchemy.engine import Connection
+
+from app.migrations.ops import create_tables
+
+
+def upgrade(connection: Connection) -> None:
+    metadata = MetaData()
+    Table(
+        "trend_buckets",
+        metadata,
+        Column("entity_type", String(10), primary_key=True),
+        Column("entity_id", String(64), primary_key=True),
+        Column("granularity", String(10), primary_key=True),
+        Column("bucket", String(40), primary_key=True),
+        Column("bucket_start", Date, nullable=False),
+        Column("games", Integer, nullable=False),
+        Column("wins", Integer, nullable=False),
+        Column("kills", Integer, nullable=False),
+        Column("deaths", Integer, nullable=False),
+        Column("assists", Integer, nullable=False),
+        Column("dpm_sum", Float, nullable=False),
+        Column("cspm_sum", Float, nullable=False),
+        Column("vision_sum", Integer, nullable=False),
+        Column("gold_sum", Integer, nullable=False),
+        Column("game_length_sum", Integer, nullable=False),
+        Index("idx_trend_series", "entity_type", "entity_id", "granularity", "bucket_start"),
+    )
+    create_tables(connection, metadata)
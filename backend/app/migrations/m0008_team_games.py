@@ -0,0 +1,28 @@
+"""team_games: one row per (team, game) paired with the opponent"""
+from sqlalchemy import CHAR, Boolean, Column, Date, ForeignKey, Index, Integer, MetaData, String, Table
+from sqlalchemy.engine import Connection
+
+from app.migrations.ops import create_tables
+
+
+def upgrade(connection: Connection) -> None:
+    metadata = MetaData()
+    Table("teams", metadata, Column("id", CHAR(36), primary_key=True))
+    Table("matches", metadata, Column("id", CHAR(36), primary_key=True))
+
+    Table(
+        "team_games",
+        metadata,
+        Column("team_id", CHAR(36), ForeignKey("teams.id", ondelete="CASCADE"), primary_key=True),
+        Column("match_id", CHAR(36), ForeignKey("matches.id", ondelete="CASCADE"), primary_key=True),
+        Column("opponent_id", CHAR(36), ForeignKey("teams.id", ondelete="CASCADE"), nullable=False),
+        Column("side", String(10)),
+        Column("result", Boolean, nullable=False),
+        Column("tournament_id", CHAR(36), nullable=False),
+        Column("match_date", Date),
+        Column("patch", String(20)),
+        Column("game_number", Integer),
+        Index("idx_team_games_opponent", "team_id", "opponent_id", "match_date"),
+        Index("idx_team_games_date", "team_id", "match_date"),
+    )
+    create_tables(connection, metadata, references=("teams", "matches"))
@@ -0,0 +1,38 @@
+"""Elo ratings: per-game rating_snapshots and current_ratings"""
+from sqlalchemy import CHAR, Column, Date, Float, ForeignKey, Index, Integer, MetaData, String, Table
+from sqlalchemy.engine import Connection
+
+from app.migrations.ops import create_tables
+
+
+def upgrade(connection: Connection) -> None:
+    metadata = MetaData()
+    Table("matches", metadata, Column("id", CHAR(36), primary_key=True))
+
+    Table(
+        "rating_snapshots",
+        metadata,
+        Column("entity_type", String(10), primary_key=True),
+        Column("entity_id", String(64), primary_key=True),
+        Column("match_id", CHAR(36), ForeignKey("matches.id", ondelete="CASCADE"), primary_key=True),
+        Column("match_date", Date, nullable=False),
+        Column("game_number", Integer, nullable=False),
+        Column("rating_before", Float, nullable=False),
+        Column("rating_after", Float, nullable=False),
+        Column("games", Integer, nullable=False),
+        Index("idx_rating_snapshots_history", "entity_type", "entity_id", "match_date", "game_number"),
+        Index("idx_rating_snapshots_order", "match_date", "game_number", "match_id"),
+        Index("idx_rating_snapshots_match", "match_id", "entity_type"),
+    )
+    Table(
+        "current_ratings",
+        metadata,
+        Column("entity_type", String(10), primary_key=True),
+        Column("entity_id", String(64), primary_key=True),
+        Column("rating", Float, nullable=False),
+        Column("peak_rating", Float, nullable=False),
+        Column("games", Integer, nullable=False),
+        Column("last_match_date", Date),
+        Index("idx_current_ratings_rank", "entity_type", "rating"),
+    )
+    create_tables(connection, metadata, references=("matches",))
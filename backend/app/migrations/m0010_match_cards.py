@@ -0,0 +1,39 @@
+"""match_cards: denormalized match list rows (tournament label, both teams, winner)"""
+from sqlalchemy import CHAR, Boolean, Column, Date, ForeignKey, Index, Integer, MetaData, String, Table, Text
+from sqlalchemy.engine import Connection
+
+from app.migrations.ops import create_tables
+
+
+def upgrade(connection: Connection) -> None:
+    metadata = MetaData()
+    Table("matches", metadata, Column("id", CHAR(36), primary_key=True))
+
+    Table(
+        "match_cards",
+        metadata,
+        Column("id", CHAR(36), ForeignKey("matches.id", ondelete="CASCADE"), primary_key=True),
+        Column("external_id", String(64)),
+        Column("tournament_id", CHAR(36), nullable=False),
+        Column("tournament_name", String(100)),
+        Column("league", String(50)),
+        Column("year", Integer),
+        Column("split", String(20)),
+        Column("playoffs", Boolean),
+        Column("game_number", Integer),
+        Column("game_length", Integer),
+        Column("patch", String(20)),
+        Column("match_date", Date),
+        Column("data_completeness", String(20)),
+        Column("url", Text),
+        Column("blue_team_id", CHAR(36)),
+        Column("blue_team_name", String(100)),
+        Column("red_team_id", CHAR(36)),
+        Column("red_team_name", String(100)),
+        Column("winner_team_id", CHAR(36)),
+        Index("idx_match_cards_date", "match_date", "game_number"),
+        Index("idx_match_cards_tournament", "tournament_id", "match_date", "game_number"),
+        Index("idx_match_cards_blue_team", "blue_team_id", "match_date"),
+        Index("idx_match_cards_red_team", "red_team_id", "match_date"),
+    )
+    create_tables(connection, metadata, references=("matches",))
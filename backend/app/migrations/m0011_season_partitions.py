@@ -0,0 +1,94 @@
+"""Season column on matches / match_player_stats, RANGE partitioned by season on MySQL"""
+from datetime import date
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.migrations.ops import (
+    add_column,
+    drop_foreign_keys,
+    drop_index,
+    has_index,
+    is_mysql,
+    set_primary_key,
+)
+
+FACT_TABLES = ("matches", "match_player_stats")
+
+# Partitioned tables can neither have nor be the target of foreign keys;
+# app.services.cascades deletes these rows explicitly instead
+MATCH_REFERENCES = ("team_games", "rating_snapshots", "match_cards")
+
+
+def _backfill(connection: Connection) -> None:
+    if is_mysql(connection):
+        connection.execute(text(
+            "UPDATE matches m JOIN tournaments t ON t.id = m.tournament_id SET m.season = t.year"
+        ))
+        connection.execute(text(
+            "UPDATE match_player_stats mps JOIN matches m ON m.id = mps.match_id SET mps.season = m.season"
+        ))
+    else:
+        connection.execute(text(
+            "UPDATE matches SET season = "
+            "(SELECT year FROM tournaments WHERE tournaments.id = matches.tournament_id)"
+        ))
+        connection.execute(text(
+            "UPDATE match_player_stats SET season = "
+            "(SELECT season FROM matches WHERE matches.id = match_player_stats.match_id)"
+        ))
+
+
+def _is_partitioned(connection: Connection, table: str) -> bool:
+    return bool(connection.execute(
+        text(
+            "SELECT COUNT(*) FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table AND PARTITION_NAME IS NOT NULL"
+        ),
+        {"table": table},
+    ).scalar())
+
+
+def _partition_clause(connection: Connection) -> str:
+    """One partition per season seen so far plus a catch-all for future seasons"""
+    first, last = connection.execute(text("SELECT MIN(year), MAX(year) FROM tournaments")).one()
+    first = first or date.today().year
+    last = max(last or first, first)
+    partitions = [
+        f"PARTITION p{season} VALUES LESS THAN ({season + 1})" for season in range(first, last + 1)
+    ]
+    partitions.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+    return "PARTITION BY RANGE (season) (" + ", ".join(partitions) + ")"
+
+
+def upgrade(connection: Connection) -> None:
+    add_column(connection, "matches", "season", "INT NULL")
+    add_column(connection, "match_player_stats", "season", "INT NULL")
+    _backfill(connection)
+
+    if not is_mysql(connection):
+        return
+
+    # Games without a tournament land in the first partition
+    connection.execute(text("UPDATE matches SET season = 0 WHERE season IS NULL"))
+    connection.execute(text("UPDATE match_player_stats SET season = 0 WHERE season IS NULL"))
+    connection.execute(text("ALTER TABLE matches MODIFY season INT NOT NULL"))
+    connection.execute(text("ALTER TABLE match_player_stats MODIFY season INT NOT NULL"))
+
+    for table in MATCH_REFERENCES:
+        drop_foreign_keys(connection, table, referred_table="matches")
+    for table in FACT_TABLES:
+        drop_foreign_keys(connection, table)
+
+    # Every unique key of a partitioned table must contain the partition column
+    for index in ("external_id", "ix_matches_external_id"):
+        drop_index(connection, index, "matches")
+    if not has_index(connection, "matches", "ix_matches_external_season"):
+        connection.execute(text("CREATE UNIQUE INDEX ix_matches_external_season ON matches (external_id, season)"))
+    set_primary_key(connection, "matches", ["id", "season"])
+    set_primary_key(connection, "match_player_stats", ["match_id", "player_id", "season"])
+
+    clause = _partition_clause(connection)
+    for table in FACT_TABLES:
+        if not _is_partitioned(connection, table):
+            connection.execute(text(f"ALTER TABLE {table} {clause}"))
@@ -0,0 +1,47 @@
+"""series (games grouped into Bo1/Bo3/Bo5) and series_standings per tournament"""
+from sqlalchemy import CHAR, Column, Date, ForeignKey, Index, Integer, MetaData, Table
+from sqlalchemy.engine import Connection
+
+from app.migrations.ops import create_tables
+
+
+def upgrade(connection: Connection) -> None:
+    metadata = MetaData()
+    Table("teams", metadata, Column("id", CHAR(36), primary_key=True))
+    Table("tournaments", metadata, Column("id", CHAR(36), primary_key=True))
+
+    Table(
+        "series",
+        metadata,
+        Column("id", CHAR(36), primary_key=True),
+        Column("tournament_id", CHAR(36), ForeignKey("tournaments.id", ondelete="CASCADE"), nullable=False),
+        Column("match_date", Date),
+        Column("team_a_id", CHAR(36), ForeignKey("teams.id", ondelete="CASCADE"), nullable=False),
+        Column("team_b_id", CHAR(36), ForeignKey("teams.id", ondelete="CASCADE"), nullable=False),
+        Column("team_a_wins", Integer, nullable=False),
+        Column("team_b_wins", Integer, nullable=False),
+        Column("games", Integer, nullable=False),
+        Column("best_of", Integer),
+        Column("winner_team_id", CHAR(36)),
+        Column("first_match_id", CHAR(36), nullable=False),
+        Column("first_game_number", Integer),
+        Column("last_game_number", Integer),
+        Index("idx_series_tournament", "tournament_id", "match_date", "first_game_number"),
+        Index("idx_series_team_a", "team_a_id", "match_date"),
+        Index("idx_series_team_b", "team_b_id", "match_date"),
+    )
+    Table(
+        "series_standings",
+        metadata,
+        Column("tournament_id", CHAR(36), ForeignKey("tournaments.id", ondelete="CASCADE"), primary_key=True),
+        Column("team_id", CHAR(36), ForeignKey("teams.id", ondelete="CASCADE"), primary_key=True),
+        Column("rank", Integer, nullable=False),
+        Column("series_played", Integer, nullable=False),
+        Column("series_wins", Integer, nullable=False),
+        Column("series_losses", Integer, nullable=False),
+        Column("game_wins", Integer, nullable=False),
+        Column("game_losses", Integer, nullable=False),
+        Column("head_to_head_wins", Integer, nullable=False),
+        Index("idx_series_standings_rank", "tournament_id", "rank"),
+    )
+    create_tables(connection, metadata, references=("teams", "tournaments"))
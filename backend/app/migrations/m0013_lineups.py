@@ -0,0 +1,50 @@
+"""Lineup signature on team_games, team_lineups and player_duos aggregates"""
+from sqlalchemy import CHAR, Column, Date, ForeignKey, Index, Integer, MetaData, String, Table
+from sqlalchemy.engine import Connection
+
+from app.migrations.ops import add_column, create_index, create_tables
+
+
+def upgrade(connection: Connection) -> None:
+    add_column(connection, "team_games", "lineup", "VARCHAR(40) NULL")
+    create_index(connection, "idx_team_games_lineup", "team_games", ["team_id", "lineup", "match_date"])
+
+    metadata = MetaData()
+    Table("teams", metadata, Column("id", CHAR(36), primary_key=True))
+    Table("players", metadata, Column("id", CHAR(36), primary_key=True))
+
+    Table(
+        "team_lineups",
+        metadata,
+        Column("team_id", CHAR(36), ForeignKey("teams.id", ondelete="CASCADE"), primary_key=True),
+        Column("lineup", String(40), primary_key=True),
+        Column("player_ids", String(255), nullable=False),
+        Column("games", Integer, nullable=False),
+        Column("wins", Integer, nullable=False),
+        Column("kills", Integer, nullable=False),
+        Column("deaths", Integer, nullable=False),
+        Column("assists", Integer, nullable=False),
+        Column("damage", Integer, nullable=False),
+        Column("gold", Integer, nullable=False),
+        Column("game_length", Integer, nullable=False),
+        Column("first_match_date", Date),
+        Column("last_match_date", Date),
+        Index("idx_team_lineups_games", "team_id", "games"),
+    )
+    Table(
+        "player_duos",
+        metadata,
+        Column("player_id", CHAR(36), ForeignKey("players.id", ondelete="CASCADE"), primary_key=True),
+        Column("partner_id", CHAR(36), ForeignKey("players.id", ondelete="CASCADE"), primary_key=True),
+        Column("team_id", CHAR(36), primary_key=True),
+        Column("games", Integer, nullable=False),
+        Column("wins", Integer, nullable=False),
+        Column("kills", Integer, nullable=False),
+        Column("deaths", Integer, nullable=False),
+        Column("assists", Integer, nullable=False),
+        Column("damage", Integer, nullable=False),
+        Column("first_match_date", Date),
+        Column("last_match_date", Date),
+        Index("idx_player_duos_games", "player_id", "games"),
+    )
+    create_tables(connection, metadata, references=("teams", "players"))
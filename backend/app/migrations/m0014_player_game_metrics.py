@@ -0,0 +1,29 @@
+"""player_game_metrics: kda, kill participation and team shares per player-game"""
+from sqlalchemy import CHAR, Column, Float, ForeignKey, Index, Integer, MetaData, Table
+from sqlalchemy.engine import Connection
+
+from app.migrations.ops import create_tables
+
+
+def upgrade(connection: Connection) -> None:
+    metadata = MetaData()
+    Table("players", metadata, Column("id", CHAR(36), primary_key=True))
+
+    Table(
+        "player_game_metrics",
+        metadata,
+        Column("match_id", CHAR(36), primary_key=True),
+        Column("player_id", CHAR(36), ForeignKey("players.id", ondelete="CASCADE"), primary_key=True),
+        Column("team_id", CHAR(36), nullable=False),
+        Column("season", Integer, nullable=False),
+        Column("team_kills", Integer, nullable=False),
+        Column("kda", Float, nullable=False),
+        Column("kill_participation", Float),
+        Column("gold_share", Float),
+        Column("damage_share", Float),
+        Column("vision_share", Float),
+        Index("idx_player_game_metrics_player", "player_id", "kda"),
+        Index("idx_player_game_metrics_kda", "kda"),
+        Index("idx_player_game_metrics_kp", "kill_participation"),
+    )
+    create_tables(connection, metadata, references=("players",))
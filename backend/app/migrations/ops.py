@@ -0,0 +1,73 @@
+"""Re-runnable building blocks for migrations.
+
+Databases set up before migrations existed (from database/*.sql or the old
+create_all on startup) already have some of these objects, so every helper
+skips what is already there.
+"""
+from typing import Iterable, Optional, Sequence
+
+from sqlalchemy import MetaData, inspect, text
+from sqlalchemy.engine import Connection
+
+
+def is_mysql(connection: Connection) -> bool:
+    return connection.dialect.name == "mysql"
+
+
+def create_tables(connection: Connection, metadata: MetaData, references: Sequence[str] = ()) -> None:
+    """Create the tables (with their indexes) that do not exist yet.
+
+    `references` are tables declared in `metadata` only as foreign key
+    targets; they belong to an earlier migration and are never created here.
+    """
+    tables = [table for table in metadata.sorted_tables if table.name not in references]
+    metadata.create_all(connection, tables=tables, checkfirst=True)
+
+
+def has_index(connection: Connection, table: str, name: str) -> bool:
+    return any(index["name"] == name for index in inspect(connection).get_indexes(table))
+
+
+def create_index(connection: Connection, name: str, table: str, columns: Sequence[str], unique: bool = False) -> None:
+    if has_index(connection, table, name):
+        return
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    connection.execute(text(f"CREATE {kind} {name} ON {table} ({', '.join(columns)})"))
+
+
+def drop_index(connection: Connection, name: str, table: str) -> None:
+    if not has_index(connection, table, name):
+        return
+    if is_mysql(connection):
+        connection.execute(text(f"DROP INDEX {name} ON {table}"))
+    else:
+        connection.execute(text(f"DROP INDEX {name}"))
+
+
+def execute_all(connection: Connection, statements: Iterable[str]) -> None:
+    """Run statements one by one (trigger and procedure bodies contain semicolons)"""
+    for statement in statements:
+        connection.execute(text(statement))
+
+
+def has_column(connection: Connection, table: str, name: str) -> bool:
+    return any(column["name"] == name for column in inspect(connection).get_columns(table))
+
+
+def add_column(connection: Connection, table: str, name: str, definition: str) -> None:
+    if not has_column(connection, table, name):
+        connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {definition}"))
+
+
+def drop_foreign_keys(connection: Connection, table: str, referred_table: Optional[str] = None) -> None:
+    """Drop the table's foreign keys (only those pointing at `referred_table`, if given); MySQL only"""
+    for foreign_key in inspect(connection).get_foreign_keys(table):
+        if referred_table is None or foreign_key["referred_table"] == referred_table:
+            connection.execute(text(f"ALTER TABLE {table} DROP FOREIGN KEY {foreign_key['name']}"))
+
+
+def set_primary_key(connection: Connection, table: str, columns: Sequence[str]) -> None:
+    """Rebuild the primary key on `columns` unless it already is exactly that; MySQL only"""
+    if inspect(connection).get_pk_constraint(table)["constrained_columns"] == list(columns):
+        return
+    connection.execute(text(f"ALTER TABLE {table} DROP PRIMARY KEY, ADD PRIMARY KEY ({', '.join(columns)})"))
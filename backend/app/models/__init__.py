@@ -6,6 +6,21 @@ from app.models.tournament import Tournament
 from app.models.match import Match
 from app.models.match_player_stats import MatchPlayerStats
 from app.models.team_tournament import TeamTournament
+from app.models.data_version import DataVersion
+from app.models.player_career_stats import PlayerCareerStats
+from app.models.player_team_stats import PlayerTeamStats
+from app.models.player_champion_stats import PlayerChampionStats
+from app.models.champion_patch_stats import ChampionPatchStats
+from app.models.trend_bucket import TrendBucket
+from app.models.team_game import TeamGame
+from app.models.rating_snapshot import RatingSnapshot
+from app.models.current_rating import CurrentRating
+from app.models.match_card import MatchCard
+from app.models.series import Series
+from app.models.series_standing import SeriesStanding
+from app.models.team_lineup import TeamLineup
+from app.models.player_duo import PlayerDuo
+from app.models.player_game_metrics import PlayerGameMetrics
 
 __all__ = [
     "User",
@@ -15,4 +30,19 @@ __all__ = [
     "Match",
     "MatchPlayerStats",
     "TeamTournament",
+    "DataVersion",
+    "PlayerCareerStats",
+    "PlayerTeamStats",
+    "PlayerChampionStats",
+    "ChampionPatchStats",
+    "TrendBucket",
+    "TeamGame",
+    "RatingSnapshot",
+    "CurrentRating",
+    "MatchCard",
+    "Series",
+    "SeriesStanding",
+    "TeamLineup",
+    "PlayerDuo",
+    "PlayerGameMetrics",
 ]
\ No newline at end of file
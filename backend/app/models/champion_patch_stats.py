@@ -0,0 +1,22 @@
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel
+
+class ChampionPatchStats(SQLModel, table=True):
+    __tablename__ = "champion_patch_stats"
+    __table_args__ = (
+        Index("idx_champion_stats_patch_league", "patch", "league", "position"),
+        Index("idx_champion_stats_league_patch", "league", "patch"),
+    )
+
+    # Aggregate of match_player_stats per champion x patch x league x position
+    # (missing patch / position are stored as "")
+    champion: str = Field(primary_key=True, max_length=50)
+    patch: str = Field(primary_key=True, max_length=20)
+    league: str = Field(primary_key=True, max_length=50)
+    position: str = Field(primary_key=True, max_length=20)
+    games: int = Field(default=0)
+    wins: int = Field(default=0)
+    kills: int = Field(default=0)
+    deaths: int = Field(default=0)
+    assists: int = Field(default=0)
+    dpm_sum: float = Field(default=0)
@@ -0,0 +1,18 @@
+from datetime import date
+from typing import Optional
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel
+
+class CurrentRating(SQLModel, table=True):
+    __tablename__ = "current_ratings"
+    __table_args__ = (
+        Index("idx_current_ratings_rank", "entity_type", "rating"),
+    )
+
+    # Latest rating snapshot per team / player, for leaderboards
+    entity_type: str = Field(primary_key=True, max_length=10)  # team, player
+    entity_id: str = Field(primary_key=True, max_length=64)
+    rating: float = Field(nullable=False)
+    peak_rating: float = Field(nullable=False)
+    games: int = Field(default=0)
+    last_match_date: Optional[date] = Field(default=None)
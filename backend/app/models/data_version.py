@@ -0,0 +1,10 @@
+from sqlmodel import Field, SQLModel
+from datetime import datetime, timezone
+
+class DataVersion(SQLModel, table=True):
+    __tablename__ = "data_version"
+
+    # Single row, bumped by ingest and admin writes so caches know to refresh
+    id: int = Field(default=1, primary_key=True)
+    version: int = Field(default=0)
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
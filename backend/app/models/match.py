@@ -1,3 +1,4 @@
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel, Relationship
 from typing import Optional, List
 from datetime import date
@@ -5,10 +6,16 @@ import uuid
 
 class Match(SQLModel, table=True):
     __tablename__ = "matches"
+    __table_args__ = (
+        # Unique keys of a partitioned table must contain the partition column
+        Index("ix_matches_external_season", "external_id", "season", unique=True),
+    )
     
+    # Keyed by (id, season) as migration 0011 builds it; id alone is still unique
     id: str = Field(default_factory=lambda: str(uuid.uuid4()), primary_key=True)
-    external_id: Optional[str] = Field(default=None, unique=True, index=True)
-    tournament_id: str = Field(foreign_key="tournaments.id", nullable=False, index=True)
+    external_id: Optional[str] = Field(default=None)
+    tournament_id: str = Field(nullable=False, index=True)  # No foreign key: partitioned table
+    season: int = Field(nullable=False, primary_key=True)  # Tournament year, the partition key
     game_number: Optional[int] = Field(default=None)
     game_length: Optional[int] = Field(default=None)  # Duration in seconds
     patch: Optional[str] = Field(default=None)  # Game version
@@ -0,0 +1,34 @@
+from datetime import date
+from typing import Optional
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel
+
+class MatchCard(SQLModel, table=True):
+    __tablename__ = "match_cards"
+    __table_args__ = (
+        Index("idx_match_cards_date", "match_date", "game_number"),
+        Index("idx_match_cards_tournament", "tournament_id", "match_date", "game_number"),
+        Index("idx_match_cards_blue_team", "blue_team_id", "match_date"),
+        Index("idx_match_cards_red_team", "red_team_id", "match_date"),
+    )
+
+    # One row per game with everything a match list shows, rebuilt by ingest and match / stat writes
+    id: str = Field(primary_key=True)  # The match's id
+    external_id: Optional[str] = Field(default=None)
+    tournament_id: str = Field(nullable=False)
+    tournament_name: Optional[str] = Field(default=None)  # LCK 2024 Spring
+    league: Optional[str] = Field(default=None)
+    year: Optional[int] = Field(default=None)
+    split: Optional[str] = Field(default=None)
+    playoffs: Optional[bool] = Field(default=None)
+    game_number: Optional[int] = Field(default=None)
+    game_length: Optional[int] = Field(default=None)
+    patch: Optional[str] = Field(default=None)
+    match_date: Optional[date] = Field(default=None)
+    data_completeness: Optional[str] = Field(default=None)
+    url: Optional[str] = Field(default=None)
+    blue_team_id: Optional[str] = Field(default=None)
+    blue_team_name: Optional[str] = Field(default=None)
+    red_team_id: Optional[str] = Field(default=None)
+    red_team_name: Optional[str] = Field(default=None)
+    winner_team_id: Optional[str] = Field(default=None)
@@ -5,9 +5,11 @@ from decimal import Decimal
 class MatchPlayerStats(SQLModel, table=True):
     __tablename__ = "match_player_stats"
     
-    match_id: str = Field(foreign_key="matches.id", primary_key=True)
-    player_id: str = Field(foreign_key="players.id", primary_key=True)
-    team_id: str = Field(foreign_key="teams.id", nullable=False, index=True)
+    # No foreign keys: the table is partitioned by season (see app.services.cascades)
+    match_id: str = Field(primary_key=True)
+    player_id: str = Field(primary_key=True)
+    team_id: str = Field(nullable=False, index=True)
+    season: int = Field(nullable=False, primary_key=True)  # Copy of matches.season, the partition key
     side: Optional[str] = Field(default=None)  # Blue or Red
     champion: Optional[str] = Field(default=None)
     result: Optional[bool] = Field(default=None)  # 0=loss, 1=win
@@ -0,0 +1,12 @@
+from sqlmodel import Field, SQLModel
+
+class PlayerCareerStats(SQLModel, table=True):
+    __tablename__ = "player_career_stats"
+
+    # Rollup of match_player_stats per player, rebuilt by ingest and stat writes
+    player_id: str = Field(foreign_key="players.id", primary_key=True, ondelete="CASCADE")
+    games: int = Field(default=0)
+    wins: int = Field(default=0)
+    kills: int = Field(default=0)
+    deaths: int = Field(default=0)
+    assists: int = Field(default=0)
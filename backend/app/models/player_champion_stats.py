@@ -0,0 +1,16 @@
+from sqlmodel import Field, SQLModel
+
+# Games with no champion recorded roll up under this key (key columns cannot be NULL)
+NO_CHAMPION = ""
+
+class PlayerChampionStats(SQLModel, table=True):
+    __tablename__ = "player_champion_stats"
+
+    # Rollup of match_player_stats per (player, champion)
+    player_id: str = Field(foreign_key="players.id", primary_key=True, ondelete="CASCADE")
+    champion: str = Field(primary_key=True, max_length=50)
+    games: int = Field(default=0)
+    wins: int = Field(default=0)
+    kills: int = Field(default=0)
+    deaths: int = Field(default=0)
+    assists: int = Field(default=0)
@@ -0,0 +1,23 @@
+from datetime import date
+from typing import Optional
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel
+
+class PlayerDuo(SQLModel, table=True):
+    __tablename__ = "player_duos"
+    __table_args__ = (
+        Index("idx_player_duos_games", "player_id", "games"),
+    )
+
+    # Two teammates' games together, stored once per direction so either player is the key
+    player_id: str = Field(foreign_key="players.id", primary_key=True, ondelete="CASCADE")
+    partner_id: str = Field(foreign_key="players.id", primary_key=True, ondelete="CASCADE")
+    team_id: str = Field(primary_key=True)
+    games: int = Field(default=0)
+    wins: int = Field(default=0)
+    kills: int = Field(default=0)  # Both players combined
+    deaths: int = Field(default=0)
+    assists: int = Field(default=0)
+    damage: int = Field(default=0)
+    first_match_date: Optional[date] = Field(default=None)
+    last_match_date: Optional[date] = Field(default=None)
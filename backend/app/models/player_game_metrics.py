@@ -0,0 +1,23 @@
+from typing import Optional
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel
+
+class PlayerGameMetrics(SQLModel, table=True):
+    __tablename__ = "player_game_metrics"
+    __table_args__ = (
+        Index("idx_player_game_metrics_player", "player_id", "kda"),
+        Index("idx_player_game_metrics_kda", "kda"),
+        Index("idx_player_game_metrics_kp", "kill_participation"),
+    )
+
+    # Derived per-game metrics, one row per match_player_stats row; computed at ingest
+    match_id: str = Field(primary_key=True)
+    player_id: str = Field(foreign_key="players.id", primary_key=True, ondelete="CASCADE")
+    team_id: str = Field(nullable=False)
+    season: int = Field(nullable=False)
+    team_kills: int = Field(default=0)
+    kda: float = Field(default=0)  # (kills + assists) / max(deaths, 1)
+    kill_participation: Optional[float] = Field(default=None)  # 0-1, None when the team had no kills
+    gold_share: Optional[float] = Field(default=None)  # 0-1 of the team's total gold
+    damage_share: Optional[float] = Field(default=None)  # 0-1 of the team's damage to champions
+    vision_share: Optional[float] = Field(default=None)  # 0-1 of the team's vision score
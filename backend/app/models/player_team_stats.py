@@ -0,0 +1,10 @@
+from sqlmodel import Field, SQLModel
+
+class PlayerTeamStats(SQLModel, table=True):
+    __tablename__ = "player_team_stats"
+
+    # Rollup of match_player_stats per (player, team)
+    player_id: str = Field(foreign_key="players.id", primary_key=True, ondelete="CASCADE")
+    team_id: str = Field(foreign_key="teams.id", primary_key=True, ondelete="CASCADE")
+    games: int = Field(default=0)
+    wins: int = Field(default=0)
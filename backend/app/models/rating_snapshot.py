@@ -0,0 +1,21 @@
+from datetime import date
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel
+
+class RatingSnapshot(SQLModel, table=True):
+    __tablename__ = "rating_snapshots"
+    __table_args__ = (
+        Index("idx_rating_snapshots_history", "entity_type", "entity_id", "match_date", "game_number"),
+        Index("idx_rating_snapshots_order", "match_date", "game_number", "match_id"),
+        Index("idx_rating_snapshots_match", "match_id", "entity_type"),
+    )
+
+    # Elo rating of a team or player after each game, written by app.services.ratings
+    entity_type: str = Field(primary_key=True, max_length=10)  # team, player
+    entity_id: str = Field(primary_key=True, max_length=64)
+    match_id: str = Field(primary_key=True)
+    match_date: date = Field(nullable=False)
+    game_number: int = Field(default=0)
+    rating_before: float = Field(nullable=False)
+    rating_after: float = Field(nullable=False)
+    games: int = Field(default=0)  # Rated games including this one
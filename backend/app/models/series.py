@@ -0,0 +1,27 @@
+from datetime import date
+from typing import Optional
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel
+
+class Series(SQLModel, table=True):
+    __tablename__ = "series"
+    __table_args__ = (
+        Index("idx_series_tournament", "tournament_id", "match_date", "first_game_number"),
+        Index("idx_series_team_a", "team_a_id", "match_date"),
+        Index("idx_series_team_b", "team_b_id", "match_date"),
+    )
+
+    # One row per Bo1/Bo3/Bo5: consecutive games of the same two teams on one day, built from team_games
+    id: str = Field(primary_key=True)  # uuid5 of the first game's match id
+    tournament_id: str = Field(foreign_key="tournaments.id", nullable=False, ondelete="CASCADE")
+    match_date: Optional[date] = Field(default=None)
+    team_a_id: str = Field(foreign_key="teams.id", nullable=False, ondelete="CASCADE")  # Lower team id
+    team_b_id: str = Field(foreign_key="teams.id", nullable=False, ondelete="CASCADE")
+    team_a_wins: int = Field(default=0)
+    team_b_wins: int = Field(default=0)
+    games: int = Field(default=0)
+    best_of: Optional[int] = Field(default=None)  # Inferred from the score; None while undecided
+    winner_team_id: Optional[str] = Field(default=None)
+    first_match_id: str = Field(nullable=False)
+    first_game_number: Optional[int] = Field(default=None)
+    last_game_number: Optional[int] = Field(default=None)
@@ -0,0 +1,19 @@
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel
+
+class SeriesStanding(SQLModel, table=True):
+    __tablename__ = "series_standings"
+    __table_args__ = (
+        Index("idx_series_standings_rank", "tournament_id", "rank"),
+    )
+
+    # Series-based table of each tournament, rebuilt with the series rows
+    tournament_id: str = Field(foreign_key="tournaments.id", primary_key=True, ondelete="CASCADE")
+    team_id: str = Field(foreign_key="teams.id", primary_key=True, ondelete="CASCADE")
+    rank: int = Field(nullable=False)  # Teams tied on every tiebreaker share a rank
+    series_played: int = Field(default=0)
+    series_wins: int = Field(default=0)
+    series_losses: int = Field(default=0)
+    game_wins: int = Field(default=0)
+    game_losses: int = Field(default=0)
+    head_to_head_wins: int = Field(default=0)  # Series won against teams level on series record
@@ -0,0 +1,24 @@
+from datetime import date
+from typing import Optional
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel
+
+class TeamGame(SQLModel, table=True):
+    __tablename__ = "team_games"
+    __table_args__ = (
+        Index("idx_team_games_opponent", "team_id", "opponent_id", "match_date"),
+        Index("idx_team_games_date", "team_id", "match_date"),
+        Index("idx_team_games_lineup", "team_id", "lineup", "match_date"),
+    )
+
+    # One row per (team, game), paired with the opponent; derived from match_player_stats
+    team_id: str = Field(foreign_key="teams.id", primary_key=True, ondelete="CASCADE")
+    match_id: str = Field(primary_key=True)
+    opponent_id: str = Field(foreign_key="teams.id", nullable=False, ondelete="CASCADE")
+    side: Optional[str] = Field(default=None)  # Blue or Red
+    result: bool = Field(default=False)
+    tournament_id: str = Field(nullable=False)
+    match_date: Optional[date] = Field(default=None)
+    patch: Optional[str] = Field(default=None)
+    game_number: Optional[int] = Field(default=None)
+    lineup: Optional[str] = Field(default=None, max_length=40)  # team_lineups key of the five who played
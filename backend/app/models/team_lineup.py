@@ -0,0 +1,25 @@
+from datetime import date
+from typing import Optional
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel
+
+class TeamLineup(SQLModel, table=True):
+    __tablename__ = "team_lineups"
+    __table_args__ = (
+        Index("idx_team_lineups_games", "team_id", "games"),
+    )
+
+    # Totals per five-player lineup, keyed by team_games.lineup; rebuilt by ingest and stat writes
+    team_id: str = Field(foreign_key="teams.id", primary_key=True, ondelete="CASCADE")
+    lineup: str = Field(primary_key=True, max_length=40)  # sha1 of the sorted player ids
+    player_ids: str = Field(nullable=False, max_length=255)  # Comma-separated, top to support
+    games: int = Field(default=0)
+    wins: int = Field(default=0)
+    kills: int = Field(default=0)
+    deaths: int = Field(default=0)
+    assists: int = Field(default=0)
+    damage: int = Field(default=0)  # damagetochampions
+    gold: int = Field(default=0)  # totalgold
+    game_length: int = Field(default=0)  # Seconds, summed
+    first_match_date: Optional[date] = Field(default=None)
+    last_match_date: Optional[date] = Field(default=None)
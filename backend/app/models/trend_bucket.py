@@ -0,0 +1,26 @@
+from datetime import date
+from sqlalchemy import Index
+from sqlmodel import Field, SQLModel
+
+class TrendBucket(SQLModel, table=True):
+    __tablename__ = "trend_buckets"
+    __table_args__ = (
+        Index("idx_trend_series", "entity_type", "entity_id", "granularity", "bucket_start"),
+    )
+
+    # Pre-bucketed totals per player / team / champion, rebuilt by ingest
+    entity_type: str = Field(primary_key=True, max_length=10)  # player, team, champion
+    entity_id: str = Field(primary_key=True, max_length=64)  # Player / team id or champion name
+    granularity: str = Field(primary_key=True, max_length=10)  # week, month, patch, split
+    bucket: str = Field(primary_key=True, max_length=40)  # 2024-W05, 2024-03, 14.5, 2024 Spring
+    bucket_start: date = Field(nullable=False)
+    games: int = Field(default=0)
+    wins: int = Field(default=0)
+    kills: int = Field(default=0)
+    deaths: int = Field(default=0)
+    assists: int = Field(default=0)
+    dpm_sum: float = Field(default=0)
+    cspm_sum: float = Field(default=0)
+    vision_sum: int = Field(default=0)
+    gold_sum: int = Field(default=0)
+    game_length_sum: int = Field(default=0)  # Seconds
@@ -7,10 +7,13 @@ from app.schemas.user import (
     UserResponse
 )
 from app.schemas.team import TeamBase, TeamCreate, TeamUpdate, TeamResponse
-from app.schemas.player import PlayerBase, PlayerCreate, PlayerUpdate, PlayerResponse, PlayerWithStats
+from app.schemas.player import PlayerBase, PlayerCreate, PlayerUpdate, PlayerResponse, PlayerWithStats, SimilarPlayer
 from app.schemas.tournament import TournamentBase, TournamentCreate, TournamentUpdate, TournamentResponse, TournamentWithStats
 from app.schemas.match import MatchBase, MatchCreate, MatchUpdate, MatchResponse
 from app.schemas.match_player_stats import MatchPlayerStatsBase, MatchPlayerStatsCreate, MatchPlayerStatsResponse
+from app.schemas.form import FormStats
+from app.schemas.lineup import DuoRow, LineupPlayer, LineupRow
+from app.schemas.series import BracketRound, SeriesCount, SeriesRecord, SeriesResponse, StandingRow
 
 __all__ = [
     "Token",
@@ -28,6 +31,7 @@ __all__ = [
     "PlayerUpdate",
     "PlayerResponse",
     "PlayerWithStats",
+    "SimilarPlayer",
     "TournamentBase",
     "TournamentCreate",
     "TournamentUpdate",
@@ -40,4 +44,13 @@ __all__ = [
     "MatchPlayerStatsBase",
     "MatchPlayerStatsCreate",
     "MatchPlayerStatsResponse",
+    "FormStats",
+    "BracketRound",
+    "SeriesCount",
+    "SeriesRecord",
+    "SeriesResponse",
+    "StandingRow",
+    "DuoRow",
+    "LineupPlayer",
+    "LineupRow",
 ]
\ No newline at end of file
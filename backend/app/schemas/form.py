@@ -0,0 +1,20 @@
+from datetime import date
+from pydantic import BaseModel
+from typing import Optional
+
+class FormStats(BaseModel):
+    """Averages over the last N games"""
+    window: int
+    games: int
+    wins: int
+    win_rate: float
+    avg_kills: float
+    avg_deaths: float
+    avg_assists: float
+    avg_kda: float
+    avg_dpm: float
+    avg_cspm: float
+    avg_vision: float
+    avg_game_duration: float
+    first_game: Optional[date] = None
+    last_game: Optional[date] = None
@@ -0,0 +1,43 @@
+from datetime import date
+from pydantic import BaseModel
+from typing import List, Optional
+
+class LineupPlayer(BaseModel):
+    player_id: str
+    player_name: Optional[str] = None
+    position: Optional[str] = None
+
+class LineupRow(BaseModel):
+    """A team's five-player lineup with per-game averages"""
+    lineup: str
+    players: List[LineupPlayer]
+    games: int
+    wins: int
+    win_rate: float
+    avg_kills: float
+    avg_deaths: float
+    avg_assists: float
+    kda: float
+    avg_damage: float
+    avg_gold: float
+    avg_game_duration: float
+    first_match_date: Optional[date] = None
+    last_match_date: Optional[date] = None
+
+class DuoRow(BaseModel):
+    """A player's record with one teammate; kills, deaths and assists are both players combined"""
+    partner_id: str
+    partner_name: Optional[str] = None
+    partner_position: Optional[str] = None
+    team_id: str
+    team_name: Optional[str] = None
+    games: int
+    wins: int
+    win_rate: float
+    avg_kills: float
+    avg_deaths: float
+    avg_assists: float
+    kda: float
+    avg_damage: float
+    first_match_date: Optional[date] = None
+    last_match_date: Optional[date] = None
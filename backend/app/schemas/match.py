@@ -28,6 +28,12 @@ class MatchUpdate(BaseModel):
 class MatchResponse(MatchBase):
     id: str
     team_names: Optional[List[str]] = None  # List of team names in the match
+    tournament_name: Optional[str] = None
+    blue_team_id: Optional[str] = None
+    blue_team_name: Optional[str] = None
+    red_team_id: Optional[str] = None
+    red_team_name: Optional[str] = None
+    winner_team_id: Optional[str] = None
     
     class Config:
         from_attributes = True
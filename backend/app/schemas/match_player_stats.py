@@ -51,8 +51,8 @@ class MatchPlayerStatsCreate(MatchPlayerStatsBase):
 
 class MatchPlayerStatsResponse(MatchPlayerStatsBase):
     match_id: str
-    player_name: Optional[str] = None  # Joined from player table
-    team_name: Optional[str] = None  # Joined from team table
+    player_name: Optional[str] = None  # From the dimension cache
+    team_name: Optional[str] = None  # From the dimension cache
     
     class Config:
         from_attributes = True
\ No newline at end of file
@@ -1,5 +1,7 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Dict, Optional, List
+
+from app.schemas.form import FormStats
 
 class PlayerBase(BaseModel):
     player_name: str
@@ -30,3 +32,15 @@ class PlayerWithStats(PlayerResponse):
     total_assists: int = 0
     avg_kda: float = 0.0
     win_rate: float = 0.0
+    # Percentile per leaderboard metric among players of the same position
+    # (narrowed by the league / year / split query parameters)
+    percentiles: Optional[Dict[str, float]] = None
+    # Averages over the last `window` games, when requested
+    form: Optional[FormStats] = None
+
+class SimilarPlayer(BaseModel):
+    player_id: str
+    player_name: str
+    position: Optional[str] = None
+    games: int
+    similarity: float  # Cosine similarity of position-standardized stat profiles
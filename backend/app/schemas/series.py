@@ -0,0 +1,48 @@
+from datetime import date
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+
+class SeriesResponse(BaseModel):
+    """A Bo1/Bo3/Bo5 between two teams"""
+    id: str
+    tournament_id: str
+    tournament_name: Optional[str] = None
+    match_date: Optional[date] = None
+    best_of: Optional[int] = None
+    games: int
+    team_a_id: str
+    team_a_name: Optional[str] = None
+    team_a_wins: int
+    team_b_id: str
+    team_b_name: Optional[str] = None
+    team_b_wins: int
+    winner_team_id: Optional[str] = None
+
+class StandingRow(BaseModel):
+    rank: int
+    team_id: str
+    team_name: Optional[str] = None
+    series_played: int
+    series_wins: int
+    series_losses: int
+    series_win_rate: float
+    game_wins: int
+    game_losses: int
+    game_differential: int
+    head_to_head_wins: int
+
+class BracketRound(BaseModel):
+    round: int
+    series: List[SeriesResponse]
+
+class SeriesCount(BaseModel):
+    played: int = 0
+    wins: int = 0
+    losses: int = 0
+
+class SeriesRecord(BaseModel):
+    """A team's series record, overall and per format (keyed "bo1", "bo3", "bo5")"""
+    team_id: str
+    overall: SeriesCount
+    by_format: Dict[str, SeriesCount]
+    series: List[SeriesResponse]
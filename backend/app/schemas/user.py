@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import Literal, Optional
 from datetime import datetime
 
 class Token(BaseModel):
@@ -9,6 +9,8 @@ class Token(BaseModel):
 class TokenData(BaseModel):
     username: Optional[str] = None
 
+Role = Literal["admin", "analyst", "public"]
+
 class UserBase(BaseModel):
     username: str
     email: EmailStr
@@ -16,11 +18,13 @@ class UserBase(BaseModel):
 
 class UserCreate(UserBase):
     password: str
-    role: str = "public"
+    role: Role = "public"
 
 class UserUpdate(BaseModel):
     email: Optional[EmailStr] = None
     full_name: Optional[str] = None
+    role: Optional[Role] = None
+    disabled: Optional[bool] = None
 
 class UserResponse(UserBase):
     id: int
@@ -0,0 +1,56 @@
+from typing import Iterable, List
+
+from sqlmodel import Session, delete, select
+
+from app.models.match import Match
+from app.models.match_card import MatchCard
+from app.models.match_player_stats import MatchPlayerStats
+from app.models.player_game_metrics import PlayerGameMetrics
+from app.models.rating_snapshot import RatingSnapshot
+from app.models.team_game import TeamGame
+
+# matches and match_player_stats are partitioned by season, and partitioned
+# tables cannot have foreign keys, so what ON DELETE CASCADE used to remove is
+# deleted here. None of these commit; the caller commits with its own delete.
+
+
+def delete_matches(session: Session, match_ids: Iterable[str]) -> None:
+    """Delete games with their stat rows and the rows derived from them"""
+    match_ids = list(set(match_ids))
+    if not match_ids:
+        return
+    for model, column in (
+        (MatchPlayerStats, MatchPlayerStats.match_id),
+        (PlayerGameMetrics, PlayerGameMetrics.match_id),
+        (TeamGame, TeamGame.match_id),
+        (RatingSnapshot, RatingSnapshot.match_id),
+        (MatchCard, MatchCard.id),
+        (Match, Match.id),
+    ):
+        session.exec(delete(model).where(column.in_(match_ids)))
+
+
+def tournament_match_ids(session: Session, tournament_id: str) -> List[str]:
+    return list(session.exec(select(Match.id).where(Match.tournament_id == tournament_id)).all())
+
+
+def team_match_ids(session: Session, team_id: str) -> List[str]:
+    return list(session.exec(
+        select(MatchPlayerStats.match_id).where(MatchPlayerStats.team_id == team_id).distinct()
+    ).all())
+
+
+def player_match_ids(session: Session, player_id: str) -> List[str]:
+    return list(session.exec(
+        select(MatchPlayerStats.match_id).where(MatchPlayerStats.player_id == player_id)
+    ).all())
+
+
+def delete_team_stats(session: Session, team_id: str) -> None:
+    session.exec(delete(MatchPlayerStats).where(MatchPlayerStats.team_id == team_id))
+    session.exec(delete(PlayerGameMetrics).where(PlayerGameMetrics.team_id == team_id))
+
+
+def delete_player_stats(session: Session, player_id: str) -> None:
+    session.exec(delete(MatchPlayerStats).where(MatchPlayerStats.player_id == player_id))
+    session.exec(delete(PlayerGameMetrics).where(PlayerGameMetrics.player_id == player_id))
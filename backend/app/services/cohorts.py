@@ -0,0 +1,145 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlmodel import Integer, Session, cast, func, select
+
+from app.core.config import settings
+from app.core.snapshot import VersionedSnapshot
+from app.models.match import Match
+from app.models.match_player_stats import MatchPlayerStats
+from app.models.player import Player
+from app.models.player_game_metrics import PlayerGameMetrics
+from app.models.tournament import Tournament
+from app.services.metrics import kda
+
+# Same definitions as the players leaderboard
+METRICS = ("kda", "dpm", "cspm", "vision", "winrate", "kp")
+
+# (position, league, year, split); None means "any"
+CohortKey = Tuple[Optional[str], Optional[str], Optional[int], Optional[str]]
+
+QUANTILES = (10, 25, 50, 75, 90)
+
+
+def _metric_values(games, wins, kills, deaths, assists, dpm_sum, cspm_sum, vision_sum, team_kills) -> Tuple[float, ...]:
+    return (
+        kda(kills, deaths, assists),
+        dpm_sum / games,
+        cspm_sum / games,
+        vision_sum / games,
+        wins / games * 100.0,
+        (kills + assists) / team_kills * 100.0 if team_kills > 0 else 0.0,
+    )
+
+
+def _wider_cohorts(position, league, year, split):
+    """Every cohort a (position, league, year, split) cell rolls up into"""
+    for cohort_position in {position, None}:
+        for cohort_league in {league, None}:
+            for cohort_year, cohort_split in {(year, split), (year, None), (None, None)}:
+                yield cohort_position, cohort_league, cohort_year, cohort_split
+
+
+@dataclass
+class Cohort:
+    players: Dict[str, Tuple[float, ...]]  # player -> value of each metric
+    sorted_values: Dict[str, np.ndarray]
+    player_ids: List[str]  # Row order of matrix
+    matrix: np.ndarray  # (players, METRICS) float64, for vectorized scoring
+
+    def __len__(self) -> int:
+        return len(self.players)
+
+    def percentile(self, metric: str, value: float) -> float:
+        """Share of the cohort at or below `value`, by binary search"""
+        values = self.sorted_values[metric]
+        return round(float(np.searchsorted(values, value, side="right")) / len(values) * 100, 1)
+
+    def player_percentiles(self, player_id: str) -> Optional[Dict[str, float]]:
+        if player_id not in self.players:
+            return None
+        return {
+            metric: self.percentile(metric, value)
+            for metric, value in zip(METRICS, self.players[player_id])
+        }
+
+
+class CohortIndex:
+    """Sorted metric arrays per cohort, for percentile ranks without touching the database"""
+
+    def __init__(self, cohorts: Dict[CohortKey, Cohort]):
+        self.cohorts = cohorts
+
+    def get(
+        self,
+        position: Optional[str] = None,
+        league: Optional[str] = None,
+        year: Optional[int] = None,
+        split: Optional[str] = None,
+    ) -> Optional[Cohort]:
+        return self.cohorts.get((position, league, year, split if year is not None else None))
+
+    def percentile(self, cohort: CohortKey, metric: str, value: float) -> Optional[float]:
+        members = self.get(*cohort)
+        return members.percentile(metric, value) if members else None
+
+
+def build_cohort_index(session: Session) -> CohortIndex:
+    statement = (
+        select(
+            MatchPlayerStats.player_id,
+            Player.position,
+            Tournament.league,
+            Tournament.year,
+            Tournament.split,
+            func.count(),
+            func.sum(cast(MatchPlayerStats.result, Integer)),
+            func.sum(MatchPlayerStats.kills),
+            func.sum(MatchPlayerStats.deaths),
+            func.sum(MatchPlayerStats.assists),
+            func.sum(MatchPlayerStats.dpm),
+            func.sum(MatchPlayerStats.cspm),
+            func.sum(MatchPlayerStats.visionscore),
+            func.sum(PlayerGameMetrics.team_kills),
+        )
+        .join(Player, MatchPlayerStats.player_id == Player.id)
+        .join(Match, MatchPlayerStats.match_id == Match.id)
+        .join(Tournament, Match.tournament_id == Tournament.id)
+        .outerjoin(
+            PlayerGameMetrics,
+            (PlayerGameMetrics.match_id == MatchPlayerStats.match_id)
+            & (PlayerGameMetrics.player_id == MatchPlayerStats.player_id),
+        )
+        .group_by(MatchPlayerStats.player_id, Player.position, Tournament.league, Tournament.year, Tournament.split)
+    )
+
+    # Wide cohorts are built by summing the finest cells, never by averaging averages
+    totals: Dict[CohortKey, Dict[str, List[float]]] = {}
+    for player_id, position, league, year, split, *sums in session.exec(statement):
+        sums = [float(value or 0) for value in sums]
+        for cohort in _wider_cohorts(position, league, year, split):
+            player_totals = totals.setdefault(cohort, {}).setdefault(player_id, [0.0] * len(sums))
+            for index, value in enumerate(sums):
+                player_totals[index] += value
+
+    cohorts = {}
+    for cohort, players in totals.items():
+        values = {
+            player_id: _metric_values(*sums)
+            for player_id, sums in players.items()
+            if sums[0] >= settings.PERCENTILE_MIN_GAMES
+        }
+        if not values:
+            continue
+        matrix = np.array(list(values.values()))
+        cohorts[cohort] = Cohort(
+            players=values,
+            sorted_values={metric: np.sort(matrix[:, column]) for column, metric in enumerate(METRICS)},
+            player_ids=list(values),
+            matrix=matrix,
+        )
+    return CohortIndex(cohorts)
+
+
+cohort_index = VersionedSnapshot("cohort percentiles", build_cohort_index)
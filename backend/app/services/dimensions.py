@@ -0,0 +1,114 @@
+from typing import Dict, Iterable, List, Optional
+
+from sqlmodel import Session, select
+
+from app.core.snapshot import VersionedSnapshot
+from app.models.player import Player
+from app.models.team import Team
+from app.models.tournament import Tournament
+from app.services.match_cards import tournament_label
+
+
+class TeamRecord:
+    __slots__ = ("id", "name")
+
+    def __init__(self, id: str, name: str):
+        self.id = id
+        self.name = name
+
+
+class PlayerRecord:
+    __slots__ = ("id", "name", "position")
+
+    def __init__(self, id: str, name: str, position: Optional[str]):
+        self.id = id
+        self.name = name
+        self.position = position
+
+
+class TournamentRecord:
+    __slots__ = ("id", "league", "year", "split", "playoffs", "label")
+
+    def __init__(self, id: str, league: str, year: int, split: Optional[str], playoffs: bool):
+        self.id = id
+        self.league = league
+        self.year = year
+        self.split = split
+        self.playoffs = bool(playoffs)
+        self.label = tournament_label(league, year, split)
+
+
+class Dimensions:
+    """Teams, players and tournaments by id, so fact queries can select ids only
+    and get names (and tournament labels) from memory instead of a join"""
+
+    __slots__ = ("teams", "players", "tournaments")
+
+    def __init__(
+        self,
+        teams: Dict[str, TeamRecord],
+        players: Dict[str, PlayerRecord],
+        tournaments: Dict[str, TournamentRecord],
+    ):
+        self.teams = teams
+        self.players = players
+        self.tournaments = tournaments
+
+    def team_name(self, team_id: Optional[str]) -> Optional[str]:
+        team = self.teams.get(team_id)
+        return team.name if team else None
+
+    def player_name(self, player_id: Optional[str]) -> Optional[str]:
+        player = self.players.get(player_id)
+        return player.name if player else None
+
+    def player_position(self, player_id: Optional[str]) -> Optional[str]:
+        player = self.players.get(player_id)
+        return player.position if player else None
+
+    def tournament_ids(
+        self,
+        league: Optional[str] = None,
+        year: Optional[int] = None,
+        split: Optional[str] = None,
+        playoffs: Optional[int] = None,
+    ) -> List[str]:
+        """Ids of the tournaments matching every given filter"""
+        return [
+            tournament.id
+            for tournament in self.tournaments.values()
+            if (league is None or tournament.league == league)
+            and (year is None or tournament.year == year)
+            and (split is None or tournament.split == split)
+            and (playoffs is None or tournament.playoffs == bool(playoffs))
+        ]
+
+    def sorted_tournaments(self, tournament_ids: Iterable[str]) -> List[TournamentRecord]:
+        """Known tournaments among `tournament_ids`, newest first"""
+        found = [self.tournaments[i] for i in tournament_ids if i in self.tournaments]
+        found.sort(key=lambda t: (t.year, t.split or ""), reverse=True)
+        return found
+
+
+def build_dimensions(session: Session) -> Dimensions:
+    return Dimensions(
+        teams={
+            team_id: TeamRecord(team_id, name)
+            for team_id, name in session.exec(select(Team.id, Team.team_name))
+        },
+        players={
+            player_id: PlayerRecord(player_id, name, position)
+            for player_id, name, position in session.exec(
+                select(Player.id, Player.player_name, Player.position)
+            )
+        },
+        tournaments={
+            row.id: TournamentRecord(row.id, row.league, row.year, row.split, row.playoffs)
+            for row in session.exec(
+                select(Tournament.id, Tournament.league, Tournament.year, Tournament.split, Tournament.playoffs)
+            )
+        },
+    )
+
+
+dimension_cache = VersionedSnapshot("dimensions", build_dimensions)
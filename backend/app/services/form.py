@@ -0,0 +1,201 @@
+from collections import deque
+from datetime import date
+from typing import Deque, Dict, List, NamedTuple, Optional, Sequence
+
+from sqlmodel import Integer, Session, cast, func, over, select
+
+from app.core.config import settings
+from app.core.snapshot import VersionedSnapshot
+from app.models.match import Match
+from app.models.match_player_stats import MatchPlayerStats
+from app.models.player import Player
+from app.models.team_game import TeamGame
+from app.schemas.form import FormStats
+from app.services.metrics import kda
+
+
+class BoxScore(NamedTuple):
+    """One game of a player, or of a team (summed over its player rows)"""
+    match_id: str
+    match_date: Optional[date]
+    won: bool
+    kills: int
+    deaths: int
+    assists: int
+    dpm: float
+    cspm: float
+    vision: int
+    game_length: int
+    rows: int  # Player rows summed (1 for a player, 5 for a team)
+
+
+def summarize(scores: Sequence[BoxScore], window: int) -> FormStats:
+    """Averages over `scores` (oldest first); kills etc. are per player row, like the all-time stats"""
+    games = len(scores)
+    wins = sum(score.won for score in scores)
+    rows = sum(score.rows for score in scores) or 1
+    kills = sum(score.kills for score in scores)
+    deaths = sum(score.deaths for score in scores)
+    assists = sum(score.assists for score in scores)
+
+    return FormStats(
+        window=window,
+        games=games,
+        wins=wins,
+        win_rate=round(wins / games * 100, 2) if games else 0.0,
+        avg_kills=round(kills / rows, 2),
+        avg_deaths=round(deaths / rows, 2),
+        avg_assists=round(assists / rows, 2),
+        avg_kda=round(kda(kills, deaths, assists), 2),
+        avg_dpm=round(sum(score.dpm for score in scores) / rows, 2),
+        avg_cspm=round(sum(score.cspm for score in scores) / rows, 2),
+        avg_vision=round(sum(score.vision for score in scores) / rows, 2),
+        avg_game_duration=round(sum(score.game_length for score in scores) / games, 2) if games else 0.0,
+        first_game=scores[0].match_date if scores else None,
+        last_game=scores[-1].match_date if scores else None,
+    )
+
+
+def _recency(*partition_by):
+    """Row number of a game within its entity, 1 being the most recent"""
+    return over(
+        func.row_number(),
+        partition_by=partition_by,
+        order_by=(Match.match_date.desc(), func.coalesce(Match.game_number, 0).desc(), Match.id.desc()),
+    ).label("recency")
+
+
+def _box_score_columns():
+    return (
+        Match.match_date,
+        func.coalesce(func.max(cast(MatchPlayerStats.result, Integer)), 0),
+        func.coalesce(func.sum(MatchPlayerStats.kills), 0),
+        func.coalesce(func.sum(MatchPlayerStats.deaths), 0),
+        func.coalesce(func.sum(MatchPlayerStats.assists), 0),
+        func.coalesce(func.sum(MatchPlayerStats.dpm), 0),
+        func.coalesce(func.sum(MatchPlayerStats.cspm), 0),
+        func.coalesce(func.sum(MatchPlayerStats.visionscore), 0),
+        func.coalesce(Match.game_length, 0),
+        func.count(),
+    )
+
+
+def _box_score(match_id, match_date, won, kills, deaths, assists, dpm, cspm, vision, game_length, rows) -> BoxScore:
+    return BoxScore(
+        match_id, match_date, bool(won), int(kills), int(deaths), int(assists),
+        float(dpm), float(cspm), int(vision), int(game_length), int(rows),
+    )
+
+
+class FormIndex:
+    """Ring of the last FORM_RING_SIZE box scores per player and team, oldest first"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.players: Dict[str, Deque[BoxScore]] = {}
+        self.teams: Dict[str, Deque[BoxScore]] = {}
+        self.positions: Dict[str, Optional[str]] = {}
+
+    def push(self, rings: Dict[str, Deque[BoxScore]], entity_id: str, score: BoxScore) -> None:
+        ring = rings.get(entity_id)
+        if ring is None:
+            ring = rings[entity_id] = deque(maxlen=self.size)
+        ring.append(score)
+
+    def last(self, rings: Dict[str, Deque[BoxScore]], entity_id: str, window: int) -> Optional[List[BoxScore]]:
+        """Last `window` games, or None when the ring is too short to answer"""
+        if window > self.size:
+            return None
+        ring = rings.get(entity_id, ())
+        return list(ring)[-window:]
+
+
+def build_form_index(session: Session) -> FormIndex:
+    index = FormIndex(settings.FORM_RING_SIZE)
+
+    # Last N games per player in one pass, via ROW_NUMBER() over the player's games
+    player_games = (
+        select(
+            MatchPlayerStats.player_id,
+            MatchPlayerStats.match_id,
+            _recency(MatchPlayerStats.player_id),
+        )
+        .join(Match, MatchPlayerStats.match_id == Match.id)
+        .where(Match.match_date.is_not(None))
+    ).subquery()
+    players = (
+        select(MatchPlayerStats.player_id, Match.id, *_box_score_columns())
+        .join(player_games, (player_games.c.player_id == MatchPlayerStats.player_id)
+              & (player_games.c.match_id == MatchPlayerStats.match_id))
+        .join(Match, MatchPlayerStats.match_id == Match.id)
+        .where(player_games.c.recency <= index.size)
+        .group_by(MatchPlayerStats.player_id, Match.id, Match.match_date, Match.game_number, Match.game_length)
+        .order_by(Match.match_date, func.coalesce(Match.game_number, 0), Match.id)
+    )
+    for player_id, *score in session.exec(players):
+        index.push(index.players, player_id, _box_score(*score))
+
+    # Teams: rank the team_games pair table, then sum the five player rows
+    team_games = (
+        select(TeamGame.team_id, TeamGame.match_id, _recency(TeamGame.team_id))
+        .join(Match, TeamGame.match_id == Match.id)
+        .where(Match.match_date.is_not(None))
+    ).subquery()
+    teams = (
+        select(MatchPlayerStats.team_id, Match.id, *_box_score_columns())
+        .join(team_games, (team_games.c.team_id == MatchPlayerStats.team_id)
+              & (team_games.c.match_id == MatchPlayerStats.match_id))
+        .join(Match, MatchPlayerStats.match_id == Match.id)
+        .where(team_games.c.recency <= index.size)
+        .group_by(MatchPlayerStats.team_id, Match.id, Match.match_date, Match.game_number, Match.game_length)
+        .order_by(Match.match_date, func.coalesce(Match.game_number, 0), Match.id)
+    )
+    for team_id, *score in session.exec(teams):
+        index.push(index.teams, team_id, _box_score(*score))
+
+    index.positions = dict(session.exec(select(Player.id, Player.position)).all())
+    return index
+
+
+def _recent_games(session: Session, column, entity_id: str, window: int) -> List[BoxScore]:
+    """SQL fallback for windows longer than the ring"""
+    statement = (
+        select(Match.id, *_box_score_columns())
+        .select_from(MatchPlayerStats)
+        .join(Match, MatchPlayerStats.match_id == Match.id)
+        .where(column == entity_id, Match.match_date.is_not(None))
+        .group_by(Match.id, Match.match_date, Match.game_number, Match.game_length)
+        .order_by(Match.match_date.desc(), func.coalesce(Match.game_number, 0).desc(), Match.id.desc())
+        .limit(window)
+    )
+    return [_box_score(*row) for row in reversed(session.exec(statement).all())]
+
+
+def player_form(session: Session, index: FormIndex, player_id: str, window: int) -> FormStats:
+    scores = index.last(index.players, player_id, window)
+    if scores is None:
+        scores = _recent_games(session, MatchPlayerStats.player_id, player_id, window)
+    return summarize(scores, window)
+
+
+def team_form(session: Session, index: FormIndex, team_id: str, window: int) -> FormStats:
+    scores = index.last(index.teams, team_id, window)
+    if scores is None:
+        scores = _recent_games(session, MatchPlayerStats.team_id, team_id, window)
+    return summarize(scores, window)
+
+
+def team_recent_match_ids(session: Session, index: FormIndex, team_id: str, window: int) -> List[str]:
+    scores = index.last(index.teams, team_id, window)
+    if scores is not None:
+        return [score.match_id for score in scores]
+    statement = (
+        select(TeamGame.match_id)
+        .where(TeamGame.team_id == team_id, TeamGame.match_date.is_not(None))
+        .order_by(TeamGame.match_date.desc(), TeamGame.game_number.desc())
+        .limit(window)
+    )
+    return list(session.exec(statement).all())
+
+
+form_index = VersionedSnapshot("recent form rings", build_form_index)
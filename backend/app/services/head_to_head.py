@@ -0,0 +1,147 @@
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import aliased
+from sqlmodel import Session, select
+
+from app.models.match import Match
+from app.models.match_player_stats import MatchPlayerStats
+from app.models.player import Player
+from app.models.team import Team
+from app.models.team_game import TeamGame
+
+# Box-score fields compared between two players in the same game
+DIFF_FIELDS = (
+    "kills", "deaths", "assists", "totalgold", "damagetochampions",
+    "dpm", "cspm", "visionscore", "total_cs",
+)
+
+
+def _rate(wins: int, games: int) -> float:
+    return round(wins / games * 100, 2) if games else 0.0
+
+
+def record_splits(games: List[Dict]) -> Dict:
+    """Win record of side A over `games`, overall, by series, by side and by patch.
+
+    Each game needs `won` (from A's point of view), `side`, `patch`,
+    `tournament_id` and `match_date`. Games of the same tournament and day
+    make up one series.
+    """
+    wins = sum(game["won"] for game in games)
+
+    series: Dict = {}
+    by_side: Dict = {}
+    by_patch: Dict = {}
+    for game in games:
+        key = (game["tournament_id"], game["match_date"])
+        series[key] = series.get(key, 0) + (1 if game["won"] else -1)
+        for groups, value in ((by_side, game["side"]), (by_patch, game["patch"])):
+            split = groups.setdefault(value, {"games": 0, "wins": 0})
+            split["games"] += 1
+            split["wins"] += int(game["won"])
+
+    def split_rows(groups, label):
+        return [
+            {label: value, "games": split["games"], "wins": split["wins"],
+             "win_rate": _rate(split["wins"], split["games"])}
+            for value, split in groups.items()
+        ]
+
+    return {
+        "games": len(games),
+        "wins": wins,
+        "losses": len(games) - wins,
+        "win_rate": _rate(wins, len(games)),
+        "series": {
+            "played": len(series),
+            "wins": sum(1 for margin in series.values() if margin > 0),
+            "losses": sum(1 for margin in series.values() if margin < 0),
+            "draws": sum(1 for margin in series.values() if margin == 0),
+        },
+        "by_side": split_rows(by_side, "side"),
+        "by_patch": sorted(split_rows(by_patch, "patch"), key=lambda x: x["patch"] or "", reverse=True),
+    }
+
+
+def team_head_to_head(session: Session, team_a: Team, team_b: Team, limit: int) -> Dict:
+    """Games between two teams, read from the team_games pair table"""
+    statement = (
+        select(TeamGame)
+        .where(TeamGame.team_id == team_a.id, TeamGame.opponent_id == team_b.id)
+        .order_by(TeamGame.match_date.desc(), TeamGame.game_number.desc())
+    )
+
+    games = [
+        {
+            "match_id": row.match_id,
+            "tournament_id": row.tournament_id,
+            "match_date": row.match_date,
+            "game_number": row.game_number,
+            "patch": row.patch,
+            "side": row.side,
+            "won": row.result,
+            "winner_id": team_a.id if row.result else team_b.id,
+        }
+        for row in session.exec(statement).all()
+    ]
+
+    return {
+        "team_a": {"id": team_a.id, "team_name": team_a.team_name},
+        "team_b": {"id": team_b.id, "team_name": team_b.team_name},
+        **record_splits(games),
+        "matches": games[:limit],
+    }
+
+
+def player_head_to_head(session: Session, player_a: Player, player_b: Player, limit: int) -> Dict:
+    """Games where two players were on opposite teams, with A-minus-B stat differentials"""
+    opponent = aliased(MatchPlayerStats)
+
+    statement = (
+        select(MatchPlayerStats, opponent, Match)
+        .join(
+            opponent,
+            (opponent.match_id == MatchPlayerStats.match_id)
+            & (opponent.team_id != MatchPlayerStats.team_id),
+        )
+        .join(Match, MatchPlayerStats.match_id == Match.id)
+        .where(MatchPlayerStats.player_id == player_a.id, opponent.player_id == player_b.id)
+        .order_by(Match.match_date.desc(), Match.game_number.desc())
+    )
+
+    games = []
+    diff_totals = dict.fromkeys(DIFF_FIELDS, 0.0)
+    for stats_a, stats_b, match in session.exec(statement).all():
+        diffs = {
+            name: round(float(getattr(stats_a, name) or 0) - float(getattr(stats_b, name) or 0), 2)
+            for name in DIFF_FIELDS
+        }
+        for name, value in diffs.items():
+            diff_totals[name] += value
+
+        games.append({
+            "match_id": match.id,
+            "tournament_id": match.tournament_id,
+            "match_date": match.match_date,
+            "game_number": match.game_number,
+            "patch": match.patch,
+            "side": stats_a.side,
+            "won": bool(stats_a.result),
+            "champion_a": stats_a.champion,
+            "champion_b": stats_b.champion,
+            "diffs": diffs,
+        })
+
+    avg_diffs: Optional[Dict] = None
+    if games:
+        avg_diffs = {name: round(total / len(games), 2) for name, total in diff_totals.items()}
+
+    return {
+        "player_a": {"id": player_a.id, "player_name": player_a.player_name, "position": player_a.position},
+        "player_b": {"id": player_b.id, "player_name": player_b.player_name, "position": player_b.position},
+        # Differentials are direct lane matchups when both play the same position
+        "same_lane": bool(player_a.position) and player_a.position == player_b.position,
+        **record_splits(games),
+        "avg_diffs": avg_diffs,
+        "matches": games[:limit],
+    }
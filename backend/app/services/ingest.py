@@ -0,0 +1,128 @@
+import logging
+from dataclasses import dataclass, field
+from typing import Iterable, Optional, Set, Tuple
+
+from sqlmodel import Session, func, select
+
+from app.core.data_version import bump_data_version
+from app.models.match import Match
+from app.models.match_player_stats import MatchPlayerStats
+from app.models.tournament import Tournament
+from app.services.lineups import refresh_duos, refresh_lineups
+from app.services.match_cards import refresh_match_cards
+from app.services.metrics import refresh_game_metrics
+from app.services.ratings import GameKey, game_key_columns, update_ratings
+from app.services.rollups import refresh_champion_stats, refresh_player_rollups, refresh_team_games
+from app.services.series import refresh_series
+from app.services.trends import refresh_trend_buckets
+
+logger = logging.getLogger("app.ingest")
+
+
+def run_ingest(session: Session) -> int:
+    """Post-load step, run after database/Data_Insertion.sql.
+
+    Rebuilds every derived table from match_player_stats (Elo ratings are
+    only extended with the new games), then bumps the data version so every
+    worker drops its cached answers and the precompute scheduler refreshes
+    the popular leaderboards.
+    """
+    refresh_player_rollups(session)
+    logger.info("Rebuilt player rollups")
+    refresh_game_metrics(session)
+    logger.info("Rebuilt per-game metrics")
+    refresh_champion_stats(session)
+    logger.info("Rebuilt champion stats")
+    refresh_team_games(session)
+    logger.info("Rebuilt team games")
+    refresh_series(session)
+    logger.info("Rebuilt series and standings")
+    refresh_lineups(session)
+    refresh_duos(session)
+    logger.info("Rebuilt lineups and duos")
+    refresh_trend_buckets(session)
+    logger.info("Rebuilt trend buckets")
+    refresh_match_cards(session)
+    logger.info("Rebuilt match cards")
+    update_ratings(session)
+
+    version = bump_data_version(session)
+    logger.info("Ingest complete, data version is now %d", version)
+    return version
+
+
+@dataclass
+class StatChange:
+    """What an admin write touches, so only those slices of derived data are rebuilt"""
+    match_ids: Set[str] = field(default_factory=set)
+    player_ids: Set[str] = field(default_factory=set)
+    team_ids: Set[str] = field(default_factory=set)
+    tournament_ids: Set[str] = field(default_factory=set)
+    champions: Set[str] = field(default_factory=set)
+    patch_leagues: Set[Tuple[str, str]] = field(default_factory=set)
+    # Earliest affected game in rating order; ratings are replayed from there
+    first_game: Optional[GameKey] = None
+
+    def update(self, other: "StatChange") -> "StatChange":
+        self.match_ids |= other.match_ids
+        self.player_ids |= other.player_ids
+        self.team_ids |= other.team_ids
+        self.tournament_ids |= other.tournament_ids
+        self.champions |= other.champions
+        self.patch_leagues |= other.patch_leagues
+        if other.first_game is not None and (self.first_game is None or other.first_game < self.first_game):
+            self.first_game = other.first_game
+        return self
+
+
+def collect_stat_change(
+    session: Session, match_ids: Iterable[str], player_ids: Iterable[str] = ()
+) -> StatChange:
+    """Describe the derived data depending on `match_ids`.
+
+    Call it before a delete (the rows are gone afterwards) and, for updates
+    that can move a match, both before and after.
+    """
+    change = StatChange(match_ids=set(match_ids), player_ids=set(player_ids))
+    if not change.match_ids:
+        return change
+
+    stat_rows = session.exec(
+        select(MatchPlayerStats.player_id, MatchPlayerStats.team_id, MatchPlayerStats.champion)
+        .where(MatchPlayerStats.match_id.in_(change.match_ids))
+    ).all()
+    for player_id, team_id, champion in stat_rows:
+        change.player_ids.add(player_id)
+        change.team_ids.add(team_id)
+        if champion is not None:
+            change.champions.add(champion)
+    for tournament_id, patch, league in session.exec(
+        select(Match.tournament_id, func.coalesce(Match.patch, ""), Tournament.league)
+        .join(Tournament, Match.tournament_id == Tournament.id)
+        .where(Match.id.in_(change.match_ids))
+    ).all():
+        change.tournament_ids.add(tournament_id)
+        change.patch_leagues.add((patch, league))
+    first_game = session.exec(
+        select(*game_key_columns())
+        .where(Match.id.in_(change.match_ids), Match.match_date.is_not(None))
+        .order_by(*game_key_columns())
+        .limit(1)
+    ).first()
+    change.first_game = tuple(first_game) if first_game else None
+    return change
+
+
+def apply_stat_changes(session: Session, change: StatChange) -> int:
+    """Incremental counterpart of run_ingest for admin writes touching match stats"""
+    refresh_player_rollups(session, change.player_ids)
+    refresh_game_metrics(session, change.match_ids)
+    refresh_champion_stats(session, change.patch_leagues)
+    refresh_team_games(session, change.match_ids)
+    refresh_series(session, change.tournament_ids)
+    refresh_lineups(session, change.team_ids)
+    refresh_duos(session, change.player_ids)
+    refresh_trend_buckets(session, change.player_ids, change.team_ids, change.champions)
+    refresh_match_cards(session, change.match_ids)
+    update_ratings(session, since=change.first_game)
+    return bump_data_version(session)
@@ -0,0 +1,178 @@
+import hashlib
+from itertools import combinations, groupby
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import aliased
+from sqlmodel import Session, bindparam, delete, insert, select, tuple_, update
+
+from app.models.match import Match
+from app.models.match_player_stats import MatchPlayerStats
+from app.models.player import Player
+from app.models.player_duo import PlayerDuo
+from app.models.team_game import TeamGame
+from app.models.team_lineup import TeamLineup
+from app.services.metrics import kda
+
+_INSERT_BATCH = 5000
+
+# Lineups list players top to support; positions are the players' registered roles
+POSITION_ORDER = {
+    "top": 0,
+    "jng": 1, "jungle": 1,
+    "mid": 2,
+    "bot": 3, "adc": 3,
+    "sup": 4, "support": 4,
+}
+
+
+def lineup_key(player_ids: Iterable[str]) -> str:
+    """Canonical signature of a set of players, independent of order"""
+    return hashlib.sha1(",".join(sorted(player_ids)).encode()).hexdigest()
+
+
+def _position_rank(position: Optional[str]) -> int:
+    return POSITION_ORDER.get((position or "").lower(), len(POSITION_ORDER))
+
+
+def _team_games(session: Session, scope) -> Iterable[Tuple[str, str, list]]:
+    """(match_id, team_id, box score rows) per team-game, streamed from match_player_stats"""
+    statement = (
+        select(
+            MatchPlayerStats.match_id,
+            MatchPlayerStats.team_id,
+            MatchPlayerStats.player_id,
+            MatchPlayerStats.result,
+            MatchPlayerStats.kills,
+            MatchPlayerStats.deaths,
+            MatchPlayerStats.assists,
+            MatchPlayerStats.damagetochampions,
+            MatchPlayerStats.totalgold,
+            Match.match_date,
+            Match.game_length,
+        )
+        .join(Match, MatchPlayerStats.match_id == Match.id)
+        .order_by(MatchPlayerStats.match_id, MatchPlayerStats.team_id)
+    )
+    if scope is not None:
+        statement = statement.where(scope)
+    rows = session.exec(statement.execution_options(yield_per=10000))
+    for (match_id, team_id), players in groupby(rows, key=lambda row: (row.match_id, row.team_id)):
+        yield match_id, team_id, list(players)
+
+
+def _add_game(totals: dict, players: list, with_gold: bool) -> None:
+    match_date = players[0].match_date
+    totals["games"] += 1
+    totals["wins"] += 1 if any(player.result for player in players) else 0
+    totals["kills"] += sum(player.kills or 0 for player in players)
+    totals["deaths"] += sum(player.deaths or 0 for player in players)
+    totals["assists"] += sum(player.assists or 0 for player in players)
+    totals["damage"] += sum(player.damagetochampions or 0 for player in players)
+    if with_gold:
+        totals["gold"] += sum(player.totalgold or 0 for player in players)
+        totals["game_length"] += players[0].game_length or 0
+    if match_date is not None:
+        if totals["first_match_date"] is None or match_date < totals["first_match_date"]:
+            totals["first_match_date"] = match_date
+        if totals["last_match_date"] is None or match_date > totals["last_match_date"]:
+            totals["last_match_date"] = match_date
+
+
+def _empty(**key) -> dict:
+    return {
+        **key,
+        "games": 0, "wins": 0, "kills": 0, "deaths": 0, "assists": 0, "damage": 0,
+        "first_match_date": None, "last_match_date": None,
+    }
+
+
+def _insert(session: Session, model, rows: List[dict]) -> None:
+    for start in range(0, len(rows), _INSERT_BATCH):
+        session.exec(insert(model), params=rows[start:start + _INSERT_BATCH])
+
+
+def refresh_lineups(session: Session, team_ids: Optional[Iterable[str]] = None) -> None:
+    """Stamp team_games.lineup and rebuild team_lineups, fully (ingest) or for
+    the given teams (admin writes). Run after refresh_team_games."""
+    scope = None
+    clear = delete(TeamLineup)
+    if team_ids is not None:
+        team_ids = list(set(team_ids))
+        if not team_ids:
+            return
+        scope = MatchPlayerStats.team_id.in_(team_ids)
+        clear = clear.where(TeamLineup.team_id.in_(team_ids))
+
+    positions = dict(session.exec(select(Player.id, Player.position)).all())
+    lineups: Dict[Tuple[str, str], dict] = {}
+    stamps = []
+    for match_id, team_id, players in _team_games(session, scope):
+        player_ids = [player.player_id for player in players]
+        key = lineup_key(player_ids)
+        stamps.append({"b_team_id": team_id, "b_match_id": match_id, "b_lineup": key})
+        totals = lineups.get((team_id, key))
+        if totals is None:
+            ordered = sorted(player_ids, key=lambda player_id: (_position_rank(positions.get(player_id)), player_id))
+            totals = lineups[(team_id, key)] = _empty(
+                team_id=team_id, lineup=key, player_ids=",".join(ordered), gold=0, game_length=0
+            )
+        _add_game(totals, players, with_gold=True)
+
+    stamp = (
+        update(TeamGame.__table__)
+        .where(TeamGame.team_id == bindparam("b_team_id"), TeamGame.match_id == bindparam("b_match_id"))
+        .values(lineup=bindparam("b_lineup"))
+    )
+    for start in range(0, len(stamps), _INSERT_BATCH):
+        session.connection().execute(stamp, stamps[start:start + _INSERT_BATCH])
+    session.exec(clear)
+    _insert(session, TeamLineup, list(lineups.values()))
+    session.commit()
+
+
+def refresh_duos(session: Session, player_ids: Optional[Iterable[str]] = None) -> None:
+    """Rebuild player_duos, fully (ingest) or the rows of the given players
+    (admin writes). Every pair of teammates is counted once per game and
+    stored in both directions."""
+    scope = None
+    clear = delete(PlayerDuo)
+    if player_ids is not None:
+        player_ids = set(player_ids)
+        if not player_ids:
+            return
+        own = aliased(MatchPlayerStats)
+        scope = tuple_(MatchPlayerStats.match_id, MatchPlayerStats.team_id).in_(
+            select(own.match_id, own.team_id).where(own.player_id.in_(player_ids))
+        )
+        clear = clear.where(PlayerDuo.player_id.in_(player_ids))
+
+    duos: Dict[Tuple[str, str, str], dict] = {}
+    for _, team_id, players in _team_games(session, scope):
+        for first, second in combinations(players, 2):
+            for player, partner in ((first, second), (second, first)):
+                if player_ids is not None and player.player_id not in player_ids:
+                    continue
+                key = (player.player_id, partner.player_id, team_id)
+                totals = duos.get(key)
+                if totals is None:
+                    totals = duos[key] = _empty(
+                        player_id=player.player_id, partner_id=partner.player_id, team_id=team_id
+                    )
+                _add_game(totals, [player, partner], with_gold=False)
+
+    session.exec(clear)
+    _insert(session, PlayerDuo, list(duos.values()))
+    session.commit()
+
+
+def per_game(totals) -> dict:
+    """Win rate and per-game averages shared by lineup and duo rows"""
+    games = totals.games or 1
+    return {
+        "win_rate": round(totals.wins / games * 100, 2),
+        "avg_kills": round(totals.kills / games, 2),
+        "avg_deaths": round(totals.deaths / games, 2),
+        "avg_assists": round(totals.assists / games, 2),
+        "kda": round(kda(totals.kills, totals.deaths, totals.assists), 2),
+        "avg_damage": round(totals.damage / games, 2),
+    }
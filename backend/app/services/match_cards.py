@@ -0,0 +1,140 @@
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlmodel import Integer, Session, cast, delete, func, insert, or_, select
+
+from app.models.match import Match
+from app.models.match_card import MatchCard
+from app.models.match_player_stats import MatchPlayerStats
+from app.models.team import Team
+from app.models.tournament import Tournament
+
+_INSERT_BATCH = 5000
+
+# Columns copied from matches as they are
+MATCH_FIELDS = (
+    "id", "external_id", "tournament_id", "game_number", "game_length",
+    "patch", "match_date", "data_completeness", "url",
+)
+
+
+def tournament_label(league: Optional[str], year: Optional[int], split: Optional[str]) -> str:
+    return " ".join(str(part) for part in (league, year, split) if part)
+
+
+def _side_order(team) -> tuple:
+    """Blue first, then red, then teams without a side"""
+    side = (team["side"] or "").upper()
+    return {"BLUE": 0, "RED": 1}.get(side, 2), team["team_name"] or ""
+
+
+def refresh_match_cards(
+    session: Session,
+    match_ids: Optional[Iterable[str]] = None,
+    team_ids: Optional[Iterable[str]] = None,
+    tournament_ids: Optional[Iterable[str]] = None,
+) -> None:
+    """Rebuild match_cards, fully (ingest) or for the given matches plus
+    every game of the given teams / tournaments (renames)"""
+    full = match_ids is None and team_ids is None and tournament_ids is None
+    scope = None
+    if not full:
+        scope = set(match_ids or ())
+        team_ids = list(set(team_ids or ()))
+        if team_ids:
+            scope.update(session.exec(
+                select(MatchCard.id).where(
+                    or_(MatchCard.blue_team_id.in_(team_ids), MatchCard.red_team_id.in_(team_ids))
+                )
+            ).all())
+            scope.update(session.exec(
+                select(MatchPlayerStats.match_id).where(MatchPlayerStats.team_id.in_(team_ids)).distinct()
+            ).all())
+        tournament_ids = list(set(tournament_ids or ()))
+        if tournament_ids:
+            scope.update(session.exec(select(Match.id).where(Match.tournament_id.in_(tournament_ids))).all())
+        if not scope:
+            return
+        scope = list(scope)
+
+    # Both teams of every game, with side and result
+    team_rows = (
+        select(
+            MatchPlayerStats.match_id,
+            MatchPlayerStats.team_id,
+            Team.team_name,
+            func.max(MatchPlayerStats.side).label("side"),
+            func.max(cast(MatchPlayerStats.result, Integer)).label("result"),
+        )
+        .outerjoin(Team, MatchPlayerStats.team_id == Team.id)
+        .group_by(MatchPlayerStats.match_id, MatchPlayerStats.team_id, Team.team_name)
+    )
+    matches = (
+        select(
+            *(getattr(Match, name) for name in MATCH_FIELDS),
+            Tournament.league,
+            Tournament.year,
+            Tournament.split,
+            Tournament.playoffs,
+        )
+        .outerjoin(Tournament, Match.tournament_id == Tournament.id)
+    )
+    clear = delete(MatchCard)
+    if scope is not None:
+        team_rows = team_rows.where(MatchPlayerStats.match_id.in_(scope))
+        matches = matches.where(Match.id.in_(scope))
+        clear = clear.where(MatchCard.id.in_(scope))
+
+    teams: Dict[str, List[dict]] = {}
+    for row in session.exec(team_rows.execution_options(yield_per=10000)):
+        teams.setdefault(row.match_id, []).append(row._asdict())
+
+    cards = []
+    for row in session.exec(matches.execution_options(yield_per=10000)):
+        card = row._asdict()
+        card["tournament_name"] = tournament_label(card["league"], card["year"], card["split"])
+        # Each team goes to its side's slot; teams without a (free) side fill what is left
+        slots = {"blue": None, "red": None}
+        for team in sorted(teams.get(card["id"], ()), key=_side_order):
+            side = (team["side"] or "").lower()
+            if side not in slots or slots[side] is not None:
+                side = next((slot for slot, taken in slots.items() if taken is None), None)
+            if side:
+                slots[side] = team
+        for slot, team in slots.items():
+            card[f"{slot}_team_id"] = team["team_id"] if team else None
+            card[f"{slot}_team_name"] = team["team_name"] if team else None
+        card["winner_team_id"] = next(
+            (team["team_id"] for team in slots.values() if team and team["result"]), None
+        )
+        cards.append(card)
+
+    session.exec(clear)
+    for start in range(0, len(cards), _INSERT_BATCH):
+        session.exec(insert(MatchCard), params=cards[start:start + _INSERT_BATCH])
+    session.commit()
+
+
+def card_team_names(card: Any) -> List[str]:
+    """Team names in the old `team_names` shape; works for cards and plain dict rows"""
+    get = card.get if isinstance(card, dict) else lambda name: getattr(card, name)
+    return [name for name in (get("blue_team_name"), get("red_team_name")) if name]
+
+
+def card_teams(card: MatchCard) -> List[Dict[str, Any]]:
+    teams = []
+    for side in ("Blue", "Red"):
+        team_id = getattr(card, f"{side.lower()}_team_id")
+        if team_id is None:
+            continue
+        teams.append({
+            "team_id": team_id,
+            "team_name": getattr(card, f"{side.lower()}_team_name"),
+            "side": side,
+            "result": team_id == card.winner_team_id if card.winner_team_id else None,
+        })
+    return teams
+
+
+def card_match(card: MatchCard) -> Dict[str, Any]:
+    """The card's columns that mirror `matches`"""
+    return {name: getattr(card, name) for name in MATCH_FIELDS}
@@ -0,0 +1,190 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlmodel import Integer, Session, cast, func, select
+
+from app.core.snapshot import VersionedSnapshot
+from app.models.match import Match
+from app.models.match_player_stats import MatchPlayerStats
+from app.models.player import Player
+
+# (position, patch); patch None is every patch together
+MatrixKey = Tuple[str, Optional[str]]
+
+
+@dataclass
+class MatchupMatrix:
+    """Champion x champion lane results for one position (and patch).
+
+    Cell [a, b] is champion a against champion b: games, a's wins, and the
+    summed gold / damage-to-champions differential from a's side. Only the
+    champions seen in the slice get a row, so patch slices stay small.
+    """
+    champions: List[str]
+    index: Dict[str, int]
+    games: np.ndarray  # (n, n) int32
+    wins: np.ndarray  # (n, n) int32
+    gold_diff: np.ndarray  # (n, n) float64, summed
+    damage_diff: np.ndarray  # (n, n) float64, summed
+
+    def cells(self, rows: np.ndarray, columns: np.ndarray) -> List[dict]:
+        games = self.games[rows, columns]
+        return [
+            {
+                "champion": self.champions[row],
+                "opponent": self.champions[column],
+                "games": int(count),
+                "wins": int(wins),
+                "win_rate": round(float(wins) / count * 100, 2),
+                "avg_gold_diff": round(float(gold) / count, 1),
+                "avg_damage_diff": round(float(damage) / count, 1),
+            }
+            for row, column, count, wins, gold, damage in zip(
+                rows, columns, games, self.wins[rows, columns],
+                self.gold_diff[rows, columns], self.damage_diff[rows, columns],
+            )
+        ]
+
+    def matchups(
+        self,
+        champion: Optional[str] = None,
+        opponent: Optional[str] = None,
+        min_games: int = 1,
+        sort_by: str = "win_rate",
+        limit: int = 50,
+    ) -> List[dict]:
+        """Cells with at least `min_games`, optionally restricted to one
+        champion's row and / or one opponent's column, best first"""
+        mask = self.games >= max(min_games, 1)
+        if champion is not None:
+            if champion not in self.index:
+                return []
+            mask &= np.arange(len(self.champions))[:, None] == self.index[champion]
+        if opponent is not None:
+            if opponent not in self.index:
+                return []
+            mask &= np.arange(len(self.champions))[None, :] == self.index[opponent]
+        rows, columns = np.nonzero(mask)
+        if not len(rows):
+            return []
+
+        games = self.games[rows, columns]
+        values = {
+            "games": games.astype(np.float64),
+            "win_rate": self.wins[rows, columns] / games,
+            "gold_diff": self.gold_diff[rows, columns] / games,
+            "damage_diff": self.damage_diff[rows, columns] / games,
+        }[sort_by]
+        order = np.lexsort((-games, -values))[:limit]
+        return self.cells(rows[order], columns[order])
+
+
+class MatchupIndex:
+    def __init__(self, matrices: Dict[MatrixKey, MatchupMatrix], patches: List[str]):
+        self.matrices = matrices
+        self.patches = patches
+
+    def get(self, position: str, patch: Optional[str] = None) -> Optional[MatchupMatrix]:
+        return self.matrices.get((position.lower(), patch))
+
+
+def _pair_lanes(match: np.ndarray, position: np.ndarray, side: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Row numbers of (blue, red) lane opponents: the two rows of a game that
+    share a position and sit on opposite sides. Lanes with any other number
+    of rows (missing stats, two players registered for one role) are skipped."""
+    key = match * (position.max() + 1) + position
+    order = np.lexsort((side, key))
+    _, starts, counts = np.unique(key[order], return_index=True, return_counts=True)
+    starts = starts[counts == 2]
+    blue, red = order[starts], order[starts + 1]
+    valid = (side[blue] == 0) & (side[red] == 1)
+    return blue[valid], red[valid]
+
+
+def _matrix(champion: np.ndarray, opponent: np.ndarray, won: np.ndarray,
+            gold_diff: np.ndarray, damage_diff: np.ndarray, names: np.ndarray) -> MatchupMatrix:
+    """Dense matrix over the champions present. Every pairing is counted from
+    both sides, except mirror matches, which fill one cell once."""
+    present, local = np.unique(np.concatenate([champion, opponent]), return_inverse=True)
+    a, b = local[:len(champion)], local[len(champion):]
+    n = len(present)
+    forward, backward = a * n + b, b * n + a
+    not_mirror = (a != b).astype(np.float64)
+
+    def accumulate(weights_forward, weights_backward) -> np.ndarray:
+        total = np.bincount(forward, weights=weights_forward, minlength=n * n)
+        total += np.bincount(backward, weights=weights_backward * not_mirror, minlength=n * n)
+        return total.reshape(n, n)
+
+    champions = [str(name) for name in names[present]]
+    return MatchupMatrix(
+        champions=champions,
+        index={name: i for i, name in enumerate(champions)},
+        games=accumulate(np.ones(len(a)), np.ones(len(a))).astype(np.int32),
+        wins=accumulate(won.astype(np.float64), 1.0 - won).astype(np.int32),
+        gold_diff=accumulate(gold_diff, -gold_diff),
+        damage_diff=accumulate(damage_diff, -damage_diff),
+    )
+
+
+def build_matchup_index(session: Session) -> MatchupIndex:
+    statement = (
+        select(
+            MatchPlayerStats.match_id,
+            func.lower(Player.position),
+            MatchPlayerStats.side,
+            MatchPlayerStats.champion,
+            cast(MatchPlayerStats.result, Integer),
+            func.coalesce(MatchPlayerStats.totalgold, 0),
+            func.coalesce(MatchPlayerStats.damagetochampions, 0),
+            Match.patch,
+        )
+        .join(Player, MatchPlayerStats.player_id == Player.id)
+        .join(Match, MatchPlayerStats.match_id == Match.id)
+        .where(
+            MatchPlayerStats.champion.is_not(None),
+            Player.position.is_not(None),
+            MatchPlayerStats.side.in_(("Blue", "Red")),
+        )
+    )
+    rows = session.exec(statement).all()
+    if not rows:
+        return MatchupIndex({}, [])
+
+    match_ids, positions, sides, champions, results, gold, damage, patches = zip(*rows)
+    _, match = np.unique(np.array(match_ids, dtype=object), return_inverse=True)
+    position_names, position = np.unique(np.array(positions, dtype=object), return_inverse=True)
+    champion_names, champion = np.unique(np.array(champions, dtype=object), return_inverse=True)
+    patch_names, patch = np.unique(np.array([p or "" for p in patches], dtype=object), return_inverse=True)
+    side = (np.array(sides, dtype=object) == "Red").astype(np.int8)
+    won = np.array([r or 0 for r in results], dtype=np.float64)
+    gold = np.array(gold, dtype=np.float64)
+    damage = np.array(damage, dtype=np.float64)
+
+    blue, red = _pair_lanes(match, position, side)
+    lane_position, lane_patch = position[blue], patch[blue]
+    gold_diff, damage_diff = gold[blue] - gold[red], damage[blue] - damage[red]
+
+    def lane_matrix(lanes: np.ndarray) -> MatchupMatrix:
+        return _matrix(
+            champion[blue[lanes]], champion[red[lanes]], won[blue[lanes]],
+            gold_diff[lanes], damage_diff[lanes], champion_names,
+        )
+
+    matrices: Dict[MatrixKey, MatchupMatrix] = {}
+    for position_code, position_name in enumerate(position_names):
+        lanes = np.flatnonzero(lane_position == position_code)
+        if not len(lanes):
+            continue
+        matrices[(position_name, None)] = lane_matrix(lanes)
+        # One sort splits the position's lanes by patch
+        lanes = lanes[np.argsort(lane_patch[lanes], kind="stable")]
+        patch_codes, starts = np.unique(lane_patch[lanes], return_index=True)
+        for patch_code, patch_lanes in zip(patch_codes, np.split(lanes, starts[1:])):
+            if patch_names[patch_code]:
+                matrices[(position_name, patch_names[patch_code])] = lane_matrix(patch_lanes)
+    return MatchupIndex(matrices, [name for name in patch_names if name])
+
+
+matchup_index = VersionedSnapshot("champion matchups", build_matchup_index)
@@ -0,0 +1,79 @@
+from typing import Iterable, Optional
+
+from sqlmodel import Session, and_, case, delete, func, insert, select
+
+from app.models.match_player_stats import MatchPlayerStats
+from app.models.player_game_metrics import PlayerGameMetrics
+
+
+def kda(kills: float, deaths: float, assists: float) -> float:
+    """(kills + assists) / deaths, with deathless totals divided by one"""
+    return (kills + assists) / (deaths if deaths > 0 else 1)
+
+
+def kda_column(kills, deaths, assists):
+    """SQL counterpart of kda() for summed or per-row columns"""
+    return (kills + assists) * 1.0 / case((deaths > 0, deaths), else_=1)
+
+
+def share_column(part, total):
+    """part / total as a float, NULL when the total is zero"""
+    return part * 1.0 / func.nullif(total, 0)
+
+
+def refresh_game_metrics(session: Session, match_ids: Optional[Iterable[str]] = None) -> None:
+    """Rebuild player_game_metrics, fully (ingest) or for the given matches
+    (admin writes), with one set-based DELETE + INSERT ... SELECT that joins
+    every stat row to its team's totals for the game"""
+    kills = func.coalesce(MatchPlayerStats.kills, 0)
+    deaths = func.coalesce(MatchPlayerStats.deaths, 0)
+    assists = func.coalesce(MatchPlayerStats.assists, 0)
+    gold = func.coalesce(MatchPlayerStats.totalgold, 0)
+    damage = func.coalesce(MatchPlayerStats.damagetochampions, 0)
+    vision = func.coalesce(MatchPlayerStats.visionscore, 0)
+
+    team = select(
+        MatchPlayerStats.match_id,
+        MatchPlayerStats.team_id,
+        func.sum(kills).label("kills"),
+        func.sum(gold).label("gold"),
+        func.sum(damage).label("damage"),
+        func.sum(vision).label("vision"),
+    ).group_by(MatchPlayerStats.match_id, MatchPlayerStats.team_id)
+    clear = delete(PlayerGameMetrics)
+    scope = None
+
+    if match_ids is not None:
+        match_ids = list(set(match_ids))
+        if not match_ids:
+            return
+        scope = MatchPlayerStats.match_id.in_(match_ids)
+        team = team.where(scope)
+        clear = clear.where(PlayerGameMetrics.match_id.in_(match_ids))
+
+    team = team.subquery()
+    source = (
+        select(
+            MatchPlayerStats.match_id,
+            MatchPlayerStats.player_id,
+            MatchPlayerStats.team_id,
+            MatchPlayerStats.season,
+            team.c.kills.label("team_kills"),
+            kda_column(kills, deaths, assists).label("kda"),
+            share_column(kills + assists, team.c.kills).label("kill_participation"),
+            share_column(gold, team.c.gold).label("gold_share"),
+            share_column(damage, team.c.damage).label("damage_share"),
+            share_column(vision, team.c.vision).label("vision_share"),
+        )
+        .join(
+            team,
+            and_(team.c.match_id == MatchPlayerStats.match_id, team.c.team_id == MatchPlayerStats.team_id),
+        )
+    )
+    if scope is not None:
+        source = source.where(scope)
+
+    session.exec(clear)
+    columns = [column.name for column in source.selected_columns]
+    session.exec(insert(PlayerGameMetrics).from_select(columns, source))
+    session.commit()
@@ -0,0 +1,92 @@
+"""Season partitions of matches / match_player_stats (MySQL, see migration 0011).
+
+Partition p<season> holds the seasons up to and including <season>, pmax
+everything newer. New seasons are split off pmax; old ones are archived by
+swapping the partition with a plain <table>_archive_<season> table.
+"""
+import logging
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from sqlalchemy import bindparam, text
+from sqlalchemy.engine import Connection
+
+logger = logging.getLogger("app.partitions")
+
+# Stat rows first, so a failure never leaves stats whose game was archived
+PARTITIONED_TABLES = ("match_player_stats", "matches")
+
+
+@dataclass
+class Partition:
+    table: str
+    name: str
+    season: Optional[int]  # None for pmax
+    rows: int  # InnoDB estimate
+
+
+def _require_mysql(connection: Connection) -> None:
+    if connection.dialect.name != "mysql":
+        raise RuntimeError("Season partitions need MySQL")
+
+
+def list_partitions(connection: Connection) -> List[Partition]:
+    _require_mysql(connection)
+    statement = text(
+        "SELECT TABLE_NAME, PARTITION_NAME, PARTITION_DESCRIPTION, TABLE_ROWS "
+        "FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN :tables AND PARTITION_NAME IS NOT NULL "
+        "ORDER BY TABLE_NAME, PARTITION_ORDINAL_POSITION"
+    ).bindparams(bindparam("tables", expanding=True))
+    return [
+        Partition(table, name, None if bound == "MAXVALUE" else int(bound) - 1, rows or 0)
+        for table, name, bound, rows in connection.execute(statement, {"tables": list(PARTITIONED_TABLES)})
+    ]
+
+
+def add_season(connection: Connection, season: int) -> List[str]:
+    """Split pmax so that `season` (and any season before it) gets its own partition"""
+    _require_mysql(connection)
+    partitions = list_partitions(connection)
+    changed = []
+    for table in PARTITIONED_TABLES:
+        seasons = [partition.season for partition in partitions if partition.table == table and partition.season]
+        if not seasons:
+            raise RuntimeError(f"{table} is not partitioned; run `python -m app.cli migrate`")
+        if season <= max(seasons):
+            continue
+        new = ", ".join(
+            f"PARTITION p{year} VALUES LESS THAN ({year + 1})" for year in range(max(seasons) + 1, season + 1)
+        )
+        connection.execute(text(
+            f"ALTER TABLE {table} REORGANIZE PARTITION pmax INTO "
+            f"({new}, PARTITION pmax VALUES LESS THAN MAXVALUE)"
+        ))
+        logger.info("Added partitions up to p%d to %s", season, table)
+        changed.append(table)
+    return changed
+
+
+def archive_seasons(connection: Connection, before: int) -> List[Tuple[str, int, str]]:
+    """Move every season older than `before` out of the fact tables.
+
+    Each partition is exchanged with an empty <table>_archive_<season> table
+    (a metadata swap, no row copying) and then dropped. Derived tables still
+    include the archived games until the next `python -m app.cli ingest`.
+    """
+    _require_mysql(connection)
+    archived = []
+    partitions = list_partitions(connection)
+    for table in PARTITIONED_TABLES:
+        for partition in partitions:
+            if partition.table != table or partition.season is None or partition.season >= before:
+                continue
+            archive = f"{table}_archive_{partition.season}"
+            # Fails if the archive table exists already, rather than swapping data back
+            connection.execute(text(f"CREATE TABLE {archive} LIKE {table}"))
+            connection.execute(text(f"ALTER TABLE {archive} REMOVE PARTITIONING"))
+            connection.execute(text(f"ALTER TABLE {table} EXCHANGE PARTITION {partition.name} WITH TABLE {archive}"))
+            connection.execute(text(f"ALTER TABLE {table} DROP PARTITION {partition.name}"))
+            logger.info("Archived %s %s into %s", table, partition.name, archive)
+            archived.append((table, partition.season, archive))
+    return archived
@@ -0,0 +1,166 @@
+import asyncio
+import inspect
+import logging
+import random
+from typing import Any, Callable, Dict, List, Optional, Tuple, get_args
+
+from sqlmodel import Session, func, select
+from starlette.concurrency import run_in_threadpool
+
+from app.api.routes.analytics import (
+    PlayerMetric,
+    compute_players_leaderboard,
+    compute_teams_leaderboard,
+)
+from app.core.config import settings
+from app.core.data_version import current_data_version, on_data_version_change
+from app.core.database import engine
+from app.core.response_store import response_store
+from app.core.singleflight import request_key
+from app.models.match import Match
+from app.models.tournament import Tournament
+
+logger = logging.getLogger("app.precompute")
+
+# Request names the scheduler knows how to recompute
+COMPUTE: Dict[str, Callable] = {
+    "leaderboard/players": compute_players_leaderboard,
+    "leaderboard/teams": compute_teams_leaderboard,
+}
+
+
+def _with_defaults(name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill in the handler defaults so keys match the ones real requests produce"""
+    signature = inspect.signature(COMPUTE[name])
+    filled = {
+        param.name: param.default
+        for param in signature.parameters.values()
+        if param.name != "session"
+    }
+    filled.update(params)
+    return filled
+
+
+def _current_splits(session: Session, leagues: List[str]) -> List[Dict[str, Any]]:
+    """Latest (year, split, patch) played in each league"""
+    latest_dates = (
+        select(Tournament.league, func.max(Match.match_date).label("latest"))
+        .join(Match, Match.tournament_id == Tournament.id)
+        .where(Tournament.league.in_(leagues))
+        .group_by(Tournament.league)
+    ).subquery()
+
+    statement = (
+        select(Tournament.league, Tournament.year, Tournament.split, Match.patch)
+        .join(Match, Match.tournament_id == Tournament.id)
+        .join(
+            latest_dates,
+            (latest_dates.c.league == Tournament.league)
+            & (latest_dates.c.latest == Match.match_date),
+        )
+    )
+
+    current = {}
+    for league, year, split, patch in session.exec(statement).all():
+        current.setdefault(league, {"league": league, "year": year, "split": split, "patch": patch})
+    return list(current.values())
+
+
+class PrecomputeScheduler:
+    """Keeps the most requested leaderboards computed ahead of users.
+
+    Candidates are the current split of each major league (per metric, with and
+    without the latest patch), anything listed in PRECOMPUTE_LEADERBOARDS, and
+    the top-K keys actually requested since startup.
+    """
+
+    def __init__(self, top_k: int, concurrency: int, jitter: float):
+        self.top_k = top_k
+        self.concurrency = concurrency
+        self.jitter = jitter
+        self.runs = 0
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def candidates(self, session: Session) -> List[Tuple[str, Dict[str, Any]]]:
+        candidates = []
+
+        leagues = [league.strip() for league in settings.PRECOMPUTE_LEAGUES.split(",") if league.strip()]
+        for current in _current_splits(session, leagues):
+            filters = {"league": current["league"], "year": current["year"], "split": current["split"]}
+            for patch in (None, current["patch"]):
+                for metric in get_args(PlayerMetric):
+                    candidates.append(("leaderboard/players", {**filters, "metric": metric, "patch": patch}))
+                candidates.append(("leaderboard/teams", {**filters, "patch": patch}))
+
+        for entry in settings.PRECOMPUTE_LEADERBOARDS:
+            if entry.get("name") not in COMPUTE:
+                logger.warning("Ignoring unknown PRECOMPUTE_LEADERBOARDS entry %r", entry)
+                continue
+            candidates.append((entry["name"], entry.get("params", {})))
+
+        keys = {request_key(name, _with_defaults(name, params)): name for name, params in candidates}
+        for name in COMPUTE:
+            for key in response_store.top_keys(name, self.top_k):
+                keys.setdefault(key, name)
+
+        return [(name, dict(key[1])) for key, name in keys.items()]
+
+    def _compute(self, name: str, params: Dict[str, Any]) -> Any:
+        with Session(engine) as session:
+            return COMPUTE[name](session, **params)
+
+    async def _refresh_one(self, semaphore: asyncio.Semaphore, version: int, name: str, params: Dict[str, Any]):
+        # Spread the work out so a version bump does not fire every query at once
+        await asyncio.sleep(random.uniform(0, self.jitter))
+        async with semaphore:
+            if version != current_data_version():
+                return
+            params = _with_defaults(name, params)
+            try:
+                result = await run_in_threadpool(self._compute, name, params)
+            except Exception:
+                logger.exception("Precompute of %s %r failed", name, params)
+                return
+            response_store.put(request_key(name, params), result, version)
+
+    async def run(self, version: int) -> None:
+        with Session(engine) as session:
+            candidates = await run_in_threadpool(self.candidates, session)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        await asyncio.gather(
+            *(self._refresh_one(semaphore, version, name, params) for name, params in candidates)
+        )
+        self.runs += 1
+        logger.info("Precomputed %d leaderboards for data version %d", len(candidates), version)
+
+    def start(self, loop: asyncio.AbstractEventLoop, warm: bool = False) -> None:
+        self._loop = loop
+        on_data_version_change(self.schedule)
+        if warm:
+            self.schedule(current_data_version())
+
+    def schedule(self, version: int) -> None:
+        """Start a run for `version`, replacing one still in progress (safe from any thread)"""
+        if self._loop is None or self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self._start, version)
+
+    def _start(self, version: int) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        self._task = self._loop.create_task(self.run(version))
+
+
+precompute_scheduler = PrecomputeScheduler(
+    top_k=settings.PRECOMPUTE_TOP_K,
+    concurrency=settings.PRECOMPUTE_CONCURRENCY,
+    jitter=settings.PRECOMPUTE_JITTER_SECONDS,
+)
+
+
+def start_precompute(warm: bool = False) -> None:
+    """Warm the popular leaderboards after every data version change, and
+    with `warm` also right away"""
+    precompute_scheduler.start(asyncio.get_running_loop(), warm)
@@ -0,0 +1,245 @@
+import logging
+from datetime import date
+from itertools import groupby
+from typing import Dict, List, Optional, Tuple
+
+from sqlmodel import Integer, Session, cast, delete, exists, func, insert, literal, over, select, tuple_
+
+from app.core.config import settings
+from app.models.current_rating import CurrentRating
+from app.models.match import Match
+from app.models.match_player_stats import MatchPlayerStats
+from app.models.rating_snapshot import RatingSnapshot
+from app.models.team_game import TeamGame
+
+logger = logging.getLogger("app.ratings")
+
+# Games are rated in (match_date, game_number, match_id) order
+GameKey = Tuple[date, int, str]
+
+_INSERT_BATCH = 5000
+
+
+def game_key_columns():
+    return (Match.match_date, func.coalesce(Match.game_number, 0), Match.id)
+
+
+def _snapshot_key_columns():
+    return (RatingSnapshot.match_date, RatingSnapshot.game_number, RatingSnapshot.match_id)
+
+
+def _after(columns, key: GameKey):
+    return tuple_(*columns) >= tuple_(*(literal(value) for value in key))
+
+
+def expected_score(rating: float, opponent_rating: float) -> float:
+    return 1 / (1 + 10 ** ((opponent_rating - rating) / 400))
+
+
+class _Rating:
+    __slots__ = ("rating", "peak", "games", "last_date")
+
+    def __init__(self, rating: float, peak: float, games: int = 0, last_date: Optional[date] = None):
+        self.rating = rating
+        self.peak = peak
+        self.games = games
+        self.last_date = last_date
+
+
+def _first_unrated_game(session: Session) -> Optional[GameKey]:
+    """Earliest ratable game without snapshots (new games or a backfill)"""
+    rated = exists().where(
+        RatingSnapshot.entity_type == "team", RatingSnapshot.match_id == Match.id
+    )
+    # Same test as the replay: two teams, exactly one winner (read from team_games)
+    statement = (
+        select(*game_key_columns())
+        .join(TeamGame, TeamGame.match_id == Match.id)
+        .where(Match.match_date.is_not(None), ~rated)
+        .group_by(*game_key_columns())
+        .having(func.count() == 2, func.sum(cast(TeamGame.result, Integer)) == 1)
+        .order_by(*game_key_columns())
+        .limit(1)
+    )
+    row = session.exec(statement).first()
+    return tuple(row) if row else None
+
+
+def _load_current(session: Session) -> Dict[Tuple[str, str], _Rating]:
+    return {
+        (row.entity_type, row.entity_id): _Rating(row.rating, row.peak_rating, row.games, row.last_match_date)
+        for row in session.exec(select(CurrentRating)).all()
+    }
+
+
+def _restore_from_snapshots(session: Session) -> Dict[Tuple[str, str], _Rating]:
+    """Latest remaining snapshot per entity, after snapshots from a rewind point were dropped"""
+    position = over(
+        func.row_number(),
+        partition_by=(RatingSnapshot.entity_type, RatingSnapshot.entity_id),
+        order_by=[column.desc() for column in _snapshot_key_columns()],
+    ).label("position")
+    latest = select(RatingSnapshot, position).subquery()
+    peaks = (
+        select(
+            RatingSnapshot.entity_type,
+            RatingSnapshot.entity_id,
+            func.max(RatingSnapshot.rating_after).label("peak"),
+        )
+        .group_by(RatingSnapshot.entity_type, RatingSnapshot.entity_id)
+        .subquery()
+    )
+    statement = (
+        select(latest.c.entity_type, latest.c.entity_id, latest.c.rating_after,
+               latest.c.games, latest.c.match_date, peaks.c.peak)
+        .join(peaks, (peaks.c.entity_type == latest.c.entity_type) & (peaks.c.entity_id == latest.c.entity_id))
+        .where(latest.c.position == 1)
+    )
+    # Every entity starts at the initial rating, which counts towards its peak as in a full replay
+    initial = settings.RATING_INITIAL
+    return {
+        (entity_type, entity_id): _Rating(rating, max(peak, initial), games, last_date)
+        for entity_type, entity_id, rating, games, last_date, peak in session.exec(statement).all()
+    }
+
+
+def update_ratings(session: Session, since: Optional[GameKey] = None, rebuild: bool = False) -> int:
+    """Bring team and player Elo ratings up to date; returns the number of games rated.
+
+    Normally only games after the last rated one are processed, starting
+    from the stored ratings. If an unrated game sorts before already rated
+    ones (a backfill), or `since` points at an edited game, snapshots from
+    that game on are dropped and replayed. `rebuild` replays all history.
+    """
+    if rebuild:
+        start = None
+    else:
+        start = _first_unrated_game(session)
+        if since is not None and (start is None or since < start):
+            start = since
+        if start is None:
+            return 0
+
+    clear = delete(RatingSnapshot)
+    if start is not None:
+        clear = clear.where(_after(_snapshot_key_columns(), start))
+    # An edited or deleted game (`since`) may already have lost its snapshots,
+    # so the stored current ratings can only be trusted for pure appends
+    rewound = session.exec(clear).rowcount > 0 or since is not None
+
+    if rebuild:
+        state: Dict[Tuple[str, str], _Rating] = {}
+    elif rewound:
+        state = _restore_from_snapshots(session)
+    else:
+        state = _load_current(session)
+
+    statement = (
+        select(
+            MatchPlayerStats.match_id,
+            MatchPlayerStats.player_id,
+            MatchPlayerStats.team_id,
+            MatchPlayerStats.result,
+            *game_key_columns()[:2],
+        )
+        .join(Match, MatchPlayerStats.match_id == Match.id)
+        .where(Match.match_date.is_not(None))
+        .order_by(*game_key_columns())
+    )
+    if start is not None:
+        statement = statement.where(_after(game_key_columns(), start))
+
+    initial = settings.RATING_INITIAL
+    k_factor = settings.RATING_K_FACTOR
+
+    def rating_of(entity_type: str, entity_id: str) -> _Rating:
+        key = (entity_type, entity_id)
+        if key not in state:
+            state[key] = _Rating(initial, initial)
+        return state[key]
+
+    snapshots: List[Dict] = []
+    touched = set()
+
+    def record(entity_type, entity_id, match_id, match_date, game_number, new_rating):
+        current = rating_of(entity_type, entity_id)
+        snapshots.append({
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "match_id": match_id,
+            "match_date": match_date,
+            "game_number": game_number,
+            "rating_before": current.rating,
+            "rating_after": new_rating,
+            "games": current.games + 1,
+        })
+        current.rating = new_rating
+        current.peak = max(current.peak, new_rating)
+        current.games += 1
+        current.last_date = match_date
+        touched.add((entity_type, entity_id))
+
+    games = 0
+    rows = session.exec(statement.execution_options(yield_per=10000))
+    for match_id, game_rows in groupby(rows, key=lambda row: row[0]):
+        game_rows = list(game_rows)
+        match_date, game_number = game_rows[0][4], game_rows[0][5]
+
+        teams: Dict[str, Dict] = {}
+        for _, player_id, team_id, result, _, _ in game_rows:
+            team = teams.setdefault(team_id, {"won": False, "players": []})
+            team["won"] = team["won"] or bool(result)
+            team["players"].append(player_id)
+        # Only rate complete games: two teams, exactly one winner
+        if len(teams) != 2 or sum(team["won"] for team in teams.values()) != 1:
+            continue
+        games += 1
+
+        (team_a, side_a), (team_b, side_b) = teams.items()
+        team_ratings = {team_a: rating_of("team", team_a).rating, team_b: rating_of("team", team_b).rating}
+        player_averages = {
+            team_id: sum(rating_of("player", player_id).rating for player_id in side["players"]) / len(side["players"])
+            for team_id, side in teams.items()
+        }
+
+        for team_id, side, opponent_id in ((team_a, side_a, team_b), (team_b, side_b, team_a)):
+            score = 1.0 if side["won"] else 0.0
+            expected = expected_score(team_ratings[team_id], team_ratings[opponent_id])
+            record("team", team_id, match_id, match_date, game_number,
+                   team_ratings[team_id] + k_factor * (score - expected))
+
+            # Players are rated against the average rating of the opposing five
+            for player_id in side["players"]:
+                rating = rating_of("player", player_id).rating
+                expected = expected_score(rating, player_averages[opponent_id])
+                record("player", player_id, match_id, match_date, game_number,
+                       rating + k_factor * (score - expected))
+
+    for offset in range(0, len(snapshots), _INSERT_BATCH):
+        session.exec(insert(RatingSnapshot), params=snapshots[offset:offset + _INSERT_BATCH])
+
+    # After a rewind or rebuild every current rating may have changed
+    if rebuild or rewound:
+        session.exec(delete(CurrentRating))
+        touched = set(state)
+    elif touched:
+        session.exec(delete(CurrentRating).where(
+            tuple_(CurrentRating.entity_type, CurrentRating.entity_id).in_(list(touched))
+        ))
+    current_rows = [
+        {
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "rating": state[(entity_type, entity_id)].rating,
+            "peak_rating": state[(entity_type, entity_id)].peak,
+            "games": state[(entity_type, entity_id)].games,
+            "last_match_date": state[(entity_type, entity_id)].last_date,
+        }
+        for entity_type, entity_id in touched
+    ]
+    for offset in range(0, len(current_rows), _INSERT_BATCH):
+        session.exec(insert(CurrentRating), params=current_rows[offset:offset + _INSERT_BATCH])
+
+    session.commit()
+    logger.info("Rated %d games%s", games, " (full rebuild)" if rebuild else "")
+    return games
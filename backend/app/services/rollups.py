@@ -0,0 +1,159 @@
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy.orm import aliased
+from sqlmodel import Integer, Session, cast, delete, func, insert, literal_column, select, tuple_
+
+from app.models.champion_patch_stats import ChampionPatchStats
+from app.models.match import Match
+from app.models.match_player_stats import MatchPlayerStats
+from app.models.player import Player
+from app.models.player_career_stats import PlayerCareerStats
+from app.models.player_champion_stats import NO_CHAMPION, PlayerChampionStats
+from app.models.player_team_stats import PlayerTeamStats
+from app.models.team_game import TeamGame
+from app.models.tournament import Tournament
+
+
+def _totals():
+    return (
+        func.count().label("games"),
+        func.coalesce(func.sum(cast(MatchPlayerStats.result, Integer)), 0).label("wins"),
+    )
+
+
+def _kda_totals():
+    return (
+        func.coalesce(func.sum(MatchPlayerStats.kills), 0).label("kills"),
+        func.coalesce(func.sum(MatchPlayerStats.deaths), 0).label("deaths"),
+        func.coalesce(func.sum(MatchPlayerStats.assists), 0).label("assists"),
+    )
+
+
+def refresh_player_rollups(session: Session, player_ids: Optional[Iterable[str]] = None) -> None:
+    """Rebuild the career, per-team and per-champion rollups.
+
+    Rebuilds every player when `player_ids` is None (ingest), otherwise only the
+    given players (admin stat writes). Each rollup is a single set-based
+    DELETE + INSERT ... SELECT over match_player_stats.
+    """
+    # Grouped on, so on MySQL it takes no bound parameter
+    champion = func.coalesce(MatchPlayerStats.champion, literal_column(f"'{NO_CHAMPION}'"))
+    rollups = [
+        (
+            PlayerCareerStats,
+            select(MatchPlayerStats.player_id, *_totals(), *_kda_totals())
+            .group_by(MatchPlayerStats.player_id),
+        ),
+        (
+            PlayerTeamStats,
+            select(MatchPlayerStats.player_id, MatchPlayerStats.team_id, *_totals())
+            .group_by(MatchPlayerStats.player_id, MatchPlayerStats.team_id),
+        ),
+        (
+            PlayerChampionStats,
+            select(MatchPlayerStats.player_id, champion.label("champion"), *_totals(), *_kda_totals())
+            .group_by(MatchPlayerStats.player_id, champion),
+        ),
+    ]
+
+    if player_ids is not None:
+        player_ids = list(set(player_ids))
+        if not player_ids:
+            return
+
+    for model, source in rollups:
+        clear = delete(model)
+        if player_ids is not None:
+            clear = clear.where(model.player_id.in_(player_ids))
+            source = source.where(MatchPlayerStats.player_id.in_(player_ids))
+
+        session.exec(clear)
+        columns = [column.name for column in source.selected_columns]
+        session.exec(insert(model).from_select(columns, source))
+
+    session.commit()
+
+
+def refresh_champion_stats(
+    session: Session, patch_leagues: Optional[Iterable[Tuple[str, str]]] = None
+) -> None:
+    """Rebuild champion_patch_stats, fully or only for the given (patch, league) pairs"""
+    patch = func.coalesce(Match.patch, "")
+    position = func.coalesce(Player.position, "")
+
+    source = (
+        select(
+            MatchPlayerStats.champion,
+            patch.label("patch"),
+            Tournament.league,
+            position.label("position"),
+            *_totals(),
+            *_kda_totals(),
+            func.coalesce(func.sum(MatchPlayerStats.dpm), 0).label("dpm_sum"),
+        )
+        .join(Match, MatchPlayerStats.match_id == Match.id)
+        .join(Tournament, Match.tournament_id == Tournament.id)
+        .join(Player, MatchPlayerStats.player_id == Player.id)
+        .where(MatchPlayerStats.champion.is_not(None))
+        .group_by(MatchPlayerStats.champion, patch, Tournament.league, position)
+    )
+    clear = delete(ChampionPatchStats)
+
+    if patch_leagues is not None:
+        patch_leagues = list(set(patch_leagues))
+        if not patch_leagues:
+            return
+        source = source.where(tuple_(patch, Tournament.league).in_(patch_leagues))
+        clear = clear.where(tuple_(ChampionPatchStats.patch, ChampionPatchStats.league).in_(patch_leagues))
+
+    session.exec(clear)
+    columns = [column.name for column in source.selected_columns]
+    session.exec(insert(ChampionPatchStats).from_select(columns, source))
+    session.commit()
+
+
+def refresh_team_games(session: Session, match_ids: Optional[Iterable[str]] = None) -> None:
+    """Rebuild the team_games pair table, fully or only for the given matches"""
+    opponent = aliased(MatchPlayerStats)
+
+    source = (
+        select(
+            MatchPlayerStats.team_id,
+            MatchPlayerStats.match_id,
+            opponent.team_id.label("opponent_id"),
+            func.max(MatchPlayerStats.side).label("side"),
+            func.coalesce(func.max(cast(MatchPlayerStats.result, Integer)), 0).label("result"),
+            Match.tournament_id,
+            Match.match_date,
+            Match.patch,
+            Match.game_number,
+        )
+        .join(
+            opponent,
+            (opponent.match_id == MatchPlayerStats.match_id)
+            & (opponent.team_id != MatchPlayerStats.team_id),
+        )
+        .join(Match, MatchPlayerStats.match_id == Match.id)
+        .group_by(
+            MatchPlayerStats.team_id,
+            MatchPlayerStats.match_id,
+            opponent.team_id,
+            Match.tournament_id,
+            Match.match_date,
+            Match.patch,
+            Match.game_number,
+        )
+    )
+    clear = delete(TeamGame)
+
+    if match_ids is not None:
+        match_ids = list(set(match_ids))
+        if not match_ids:
+            return
+        source = source.where(MatchPlayerStats.match_id.in_(match_ids))
+        clear = clear.where(TeamGame.match_id.in_(match_ids))
+
+    session.exec(clear)
+    columns = [column.name for column in source.selected_columns]
+    session.exec(insert(TeamGame).from_select(columns, source))
+    session.commit()
@@ -0,0 +1,134 @@
+import ast
+from dataclasses import dataclass
+from functools import lru_cache, reduce
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.cohorts import METRICS, Cohort
+
+# A compiled node: metric columns in, one value per player (or a scalar) out
+Node = Callable[[Dict[str, np.ndarray]], np.ndarray]
+
+MAX_NODES = 100
+
+
+class ScoreExpressionError(ValueError):
+    """The expression does not parse or uses something outside the whitelist"""
+
+
+def zscore(values: np.ndarray) -> np.ndarray:
+    """Standard score within the cohort; zero when every player is level"""
+    std = values.std()
+    return (values - values.mean()) / std if std > 0 else np.zeros_like(values)
+
+
+def percentile(values: np.ndarray) -> np.ndarray:
+    """Share of the cohort at or below each value, like Cohort.percentile"""
+    return np.searchsorted(np.sort(values), values, side="right") / len(values) * 100.0
+
+
+# name -> (function, number of arguments or None for two or more)
+FUNCTIONS: Dict[str, Tuple[Callable, Optional[int]]] = {
+    "z": (zscore, 1),
+    "pct": (percentile, 1),
+    "abs": (np.abs, 1),
+    "log": (lambda values: np.log1p(np.maximum(values, 0)), 1),
+    "min": (lambda *values: reduce(np.minimum, values), None),
+    "max": (lambda *values: reduce(np.maximum, values), None),
+}
+
+# z() and pct() compare players, so their argument has to vary by player
+_COHORT_FUNCTIONS = ("z", "pct")
+
+_BINARY = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+    ast.Div: np.divide,
+    ast.Pow: np.power,
+}
+_UNARY = {ast.USub: np.negative, ast.UAdd: np.positive}
+
+
+def _compile(node: ast.AST) -> Tuple[Node, FrozenSet[str]]:
+    """Turn a whitelisted AST into nested numpy closures plus the metrics it reads"""
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        value = float(node.value)
+        return (lambda columns: value), frozenset()
+
+    if isinstance(node, ast.Name):
+        if node.id not in METRICS:
+            raise ScoreExpressionError(f"Unknown metric '{node.id}'; use one of {', '.join(METRICS)}")
+        name = node.id
+        return (lambda columns: columns[name]), frozenset((name,))
+
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY:
+        operator = _BINARY[type(node.op)]
+        (left, left_metrics), (right, right_metrics) = _compile(node.left), _compile(node.right)
+        return (lambda columns: operator(left(columns), right(columns))), left_metrics | right_metrics
+
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY:
+        operator = _UNARY[type(node.op)]
+        operand, metrics = _compile(node.operand)
+        return (lambda columns: operator(operand(columns))), metrics
+
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+        name = node.func.id
+        if name not in FUNCTIONS:
+            raise ScoreExpressionError(f"Unknown function '{name}'; use one of {', '.join(FUNCTIONS)}")
+        function, arity = FUNCTIONS[name]
+        if (arity is None and len(node.args) < 2) or (arity is not None and len(node.args) != arity):
+            raise ScoreExpressionError(f"Wrong number of arguments to {name}()")
+        compiled = [_compile(argument) for argument in node.args]
+        arguments = [argument for argument, _ in compiled]
+        metrics = frozenset().union(*(used for _, used in compiled))
+        if name in _COHORT_FUNCTIONS and not metrics:
+            raise ScoreExpressionError(f"{name}() needs an argument that uses a metric")
+        return (lambda columns: function(*(argument(columns) for argument in arguments))), metrics
+
+    raise ScoreExpressionError(f"'{ast.unparse(node)}' is not allowed in a score")
+
+
+@dataclass(frozen=True)
+class Score:
+    expression: str  # Normalized source
+    metrics: FrozenSet[str]
+    node: Node
+
+    def evaluate(self, cohort: Cohort) -> np.ndarray:
+        """One score per cohort player, in cohort.player_ids order; NaN where
+        the arithmetic is undefined (division by zero, log of nothing)"""
+        columns = {metric: cohort.matrix[:, METRICS.index(metric)] for metric in self.metrics}
+        with np.errstate(all="ignore"):
+            values = np.asarray(self.node(columns), dtype=np.float64)
+        values = np.broadcast_to(values, (len(cohort),)).copy()
+        values[~np.isfinite(values)] = np.nan
+        return values
+
+    def top(self, cohort: Cohort, limit: int) -> List[Tuple[int, float]]:
+        """(row in the cohort matrix, score) of the best `limit` players"""
+        values = self.evaluate(cohort)
+        rows = np.flatnonzero(~np.isnan(values))
+        if len(rows) > limit:
+            rows = rows[np.argpartition(-values[rows], limit - 1)[:limit]]
+        rows = rows[np.argsort(-values[rows], kind="stable")]
+        return [(int(row), float(values[row])) for row in rows]
+
+
+@lru_cache(maxsize=settings.SCORE_CACHE_SIZE)
+def compile_score(expression: str) -> Score:
+    """Parse and compile a score expression such as
+    "0.4 * z(dpm) + 0.3 * z(kp) + 0.3 * z(vision)". Compiled scores are
+    cached by source, so repeat queries only pay for the numpy pass."""
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as exc:
+        raise ScoreExpressionError(f"Invalid expression: {exc.msg}") from None
+    if sum(1 for _ in ast.walk(tree)) > MAX_NODES:
+        raise ScoreExpressionError("Expression is too long")
+    node, metrics = _compile(tree.body)
+    if not metrics:
+        raise ScoreExpressionError("Expression does not use any metric")
+    return Score(expression=ast.unparse(tree.body), metrics=metrics, node=node)
@@ -0,0 +1,215 @@
+import uuid
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from sqlmodel import Session, delete, insert, select
+
+from app.models.series import Series
+from app.models.series_standing import SeriesStanding
+from app.models.team_game import TeamGame
+from app.schemas.series import SeriesResponse
+from app.services.dimensions import Dimensions
+
+_INSERT_BATCH = 5000
+
+
+def series_id(first_match_id: str) -> str:
+    """Stable across rebuilds as long as the series keeps its first game"""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"series:{first_match_id}"))
+
+
+def _best_of(wins: int, losses: int) -> Optional[int]:
+    """Bo1 / Bo3 / Bo5 from a finished score (1-0, 2-x, 3-x); None while level"""
+    if wins == losses:
+        return None
+    return 2 * max(wins, losses) - 1
+
+
+def _close(series: dict) -> dict:
+    a_wins, b_wins = series["team_a_wins"], series["team_b_wins"]
+    series["best_of"] = _best_of(a_wins, b_wins)
+    series["winner_team_id"] = (
+        None if a_wins == b_wins else series["team_a_id"] if a_wins > b_wins else series["team_b_id"]
+    )
+    return series
+
+
+def group_series(games: Iterable) -> List[dict]:
+    """Group team_games rows (one per game, team_id < opponent_id) into series.
+
+    Rows must be ordered by tournament, date, team pair and game number. A
+    series is the run of games between the same two teams on the same day;
+    a game number that does not increase starts the next series of the pair.
+    """
+    series: List[dict] = []
+    current = None
+    for game in games:
+        key = (game.tournament_id, game.match_date, game.team_id, game.opponent_id)
+        if (
+            current is None
+            or current["key"] != key
+            or (
+                game.game_number is not None
+                and current["last_game_number"] is not None
+                and game.game_number <= current["last_game_number"]
+            )
+        ):
+            if current is not None:
+                series.append(_close(current))
+            current = {
+                "key": key,
+                "id": series_id(game.match_id),
+                "tournament_id": game.tournament_id,
+                "match_date": game.match_date,
+                "team_a_id": game.team_id,
+                "team_b_id": game.opponent_id,
+                "team_a_wins": 0,
+                "team_b_wins": 0,
+                "games": 0,
+                "first_match_id": game.match_id,
+                "first_game_number": game.game_number,
+                "last_game_number": game.game_number,
+            }
+        current["games"] += 1
+        current["team_a_wins" if game.result else "team_b_wins"] += 1
+        if game.game_number is not None:
+            current["last_game_number"] = game.game_number
+    if current is not None:
+        series.append(_close(current))
+    for row in series:
+        del row["key"]
+    return series
+
+
+def build_standings(tournament_id: str, series: List[dict]) -> List[dict]:
+    """Series-based table: series record first, then head-to-head series wins
+    among the teams level on that record, then game differential and game wins.
+    Teams still level after every tiebreaker share a rank."""
+    table: Dict[str, dict] = {}
+
+    def row(team_id: str) -> dict:
+        return table.setdefault(team_id, {
+            "tournament_id": tournament_id,
+            "team_id": team_id,
+            "series_played": 0,
+            "series_wins": 0,
+            "series_losses": 0,
+            "game_wins": 0,
+            "game_losses": 0,
+            "head_to_head_wins": 0,
+        })
+
+    for item in series:
+        for team, games_won, games_lost in (
+            (item["team_a_id"], item["team_a_wins"], item["team_b_wins"]),
+            (item["team_b_id"], item["team_b_wins"], item["team_a_wins"]),
+        ):
+            entry = row(team)
+            entry["series_played"] += 1
+            entry["game_wins"] += games_won
+            entry["game_losses"] += games_lost
+            if item["winner_team_id"] is not None:
+                entry["series_wins" if item["winner_team_id"] == team else "series_losses"] += 1
+
+    # Head-to-head only counts series between teams with the same series record
+    level = defaultdict(set)
+    for entry in table.values():
+        level[(entry["series_wins"], entry["series_losses"])].add(entry["team_id"])
+    for item in series:
+        winner = item["winner_team_id"]
+        if winner is None:
+            continue
+        loser = item["team_b_id"] if winner == item["team_a_id"] else item["team_a_id"]
+        record = (table[winner]["series_wins"], table[winner]["series_losses"])
+        if loser in level[record]:
+            table[winner]["head_to_head_wins"] += 1
+
+    def order(entry: dict) -> tuple:
+        return (
+            -entry["series_wins"],
+            entry["series_losses"],
+            -entry["head_to_head_wins"],
+            -(entry["game_wins"] - entry["game_losses"]),
+            -entry["game_wins"],
+        )
+
+    standings = sorted(table.values(), key=lambda entry: (order(entry), entry["team_id"]))
+    for position, entry in enumerate(standings):
+        previous = standings[position - 1] if position else None
+        entry["rank"] = previous["rank"] if previous and order(previous) == order(entry) else position + 1
+    return standings
+
+
+def refresh_series(session: Session, tournament_ids: Optional[Iterable[str]] = None) -> None:
+    """Rebuild series and series_standings from team_games, fully (ingest)
+    or for the given tournaments (admin writes)"""
+    games = (
+        select(
+            TeamGame.match_id,
+            TeamGame.team_id,
+            TeamGame.opponent_id,
+            TeamGame.result,
+            TeamGame.tournament_id,
+            TeamGame.match_date,
+            TeamGame.game_number,
+        )
+        .where(TeamGame.team_id < TeamGame.opponent_id)
+        .order_by(
+            TeamGame.tournament_id,
+            TeamGame.match_date,
+            TeamGame.team_id,
+            TeamGame.opponent_id,
+            TeamGame.game_number,
+            TeamGame.match_id,
+        )
+    )
+    clear_series = delete(Series)
+    clear_standings = delete(SeriesStanding)
+    if tournament_ids is not None:
+        tournament_ids = list(set(tournament_ids))
+        if not tournament_ids:
+            return
+        games = games.where(TeamGame.tournament_id.in_(tournament_ids))
+        clear_series = clear_series.where(Series.tournament_id.in_(tournament_ids))
+        clear_standings = clear_standings.where(SeriesStanding.tournament_id.in_(tournament_ids))
+
+    series = group_series(session.exec(games.execution_options(yield_per=10000)))
+    by_tournament: Dict[str, List[dict]] = defaultdict(list)
+    for item in series:
+        by_tournament[item["tournament_id"]].append(item)
+    standings = [
+        entry
+        for tournament_id, items in by_tournament.items()
+        for entry in build_standings(tournament_id, items)
+    ]
+
+    session.exec(clear_standings)
+    session.exec(clear_series)
+    for model, rows in ((Series, series), (SeriesStanding, standings)):
+        for start in range(0, len(rows), _INSERT_BATCH):
+            session.exec(insert(model), params=rows[start:start + _INSERT_BATCH])
+    session.commit()
+
+
+def bracket_rounds(series: List[Series]) -> List[List[Series]]:
+    """Split a tournament's series (oldest first) into rounds: a series is one
+    round after the latest series either team has already played"""
+    played: Dict[str, int] = {}
+    rounds: List[List[Series]] = []
+    for item in series:
+        number = max(played.get(item.team_a_id, 0), played.get(item.team_b_id, 0)) + 1
+        played[item.team_a_id] = played[item.team_b_id] = number
+        if len(rounds) < number:
+            rounds.append([])
+        rounds[number - 1].append(item)
+    return rounds
+
+
+def series_response(item: Series, dimensions: Dimensions) -> SeriesResponse:
+    tournament = dimensions.tournaments.get(item.tournament_id)
+    return SeriesResponse(
+        **item.model_dump(include=set(SeriesResponse.model_fields)),
+        tournament_name=tournament.label if tournament else None,
+        team_a_name=dimensions.team_name(item.team_a_id),
+        team_b_name=dimensions.team_name(item.team_b_id),
+    )
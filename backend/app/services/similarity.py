@@ -0,0 +1,139 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlmodel import Integer, Session, cast, func, select
+
+from app.core.config import settings
+from app.core.snapshot import VersionedSnapshot
+from app.models.match import Match
+from app.models.match_player_stats import MatchPlayerStats
+from app.models.player import Player
+from app.models.tournament import Tournament
+
+# Per-game profile compared between players
+FEATURES = (
+    ("kills", MatchPlayerStats.kills),
+    ("deaths", MatchPlayerStats.deaths),
+    ("assists", MatchPlayerStats.assists),
+    ("dpm", MatchPlayerStats.dpm),
+    ("cspm", MatchPlayerStats.cspm),
+    ("vision", MatchPlayerStats.visionscore),
+    ("damageshare", MatchPlayerStats.damageshare),
+    ("earned_gpm", MatchPlayerStats.earned_gpm),
+    ("firstblood_kill", cast(MatchPlayerStats.firstbloodkill, Integer)),
+    ("firstblood_assist", cast(MatchPlayerStats.firstbloodassist, Integer)),
+)
+
+
+@dataclass
+class SimilarityIndex:
+    """Unit-length stat vectors, one row per player with enough games"""
+    player_ids: List[str]
+    names: List[str]
+    positions: np.ndarray  # object array, for filtering
+    games: np.ndarray
+    vectors: np.ndarray  # (players, features), float32
+    rows: Dict[str, int]
+    # (league, year) -> sorted row numbers of the players who played there
+    played_in: Dict[Tuple[str, int], np.ndarray]
+
+    def candidates(self, position: Optional[str], league: Optional[str], year: Optional[int]) -> np.ndarray:
+        mask = np.ones(len(self.player_ids), dtype=bool)
+        if position:
+            mask &= self.positions == position
+        if league or year:
+            allowed = np.zeros_like(mask)
+            for (played_league, played_year), rows in self.played_in.items():
+                if (not league or played_league == league) and (not year or played_year == year):
+                    allowed[rows] = True
+            mask &= allowed
+        return np.flatnonzero(mask)
+
+    def most_similar(
+        self,
+        player_ids: List[str],
+        k: int,
+        position: Optional[str] = None,
+        league: Optional[str] = None,
+        year: Optional[int] = None,
+    ) -> List[List[Tuple[int, float]]]:
+        """Top-k (row, cosine similarity) for each query player, in one matrix product"""
+        queries = np.array([self.rows[player_id] for player_id in player_ids])
+        candidates = self.candidates(position, league, year)
+        if not len(candidates):
+            return [[] for _ in player_ids]
+
+        scores = self.vectors[queries] @ self.vectors[candidates].T
+        # A player is never similar to themselves
+        scores[candidates[None, :] == queries[:, None]] = -np.inf
+
+        k = min(k, len(candidates))
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for query_scores, query_top in zip(scores, top):
+            ordered = query_top[np.argsort(-query_scores[query_top])]
+            results.append([
+                (int(candidates[column]), float(query_scores[column]))
+                for column in ordered
+                if np.isfinite(query_scores[column])
+            ])
+        return results
+
+
+def build_similarity_index(session: Session) -> SimilarityIndex:
+    statement = (
+        select(
+            Player.id,
+            Player.player_name,
+            Player.position,
+            func.count().label("games"),
+            *(func.avg(column).label(name) for name, column in FEATURES),
+        )
+        .join(MatchPlayerStats, MatchPlayerStats.player_id == Player.id)
+        .group_by(Player.id, Player.player_name, Player.position)
+        .having(func.count() >= settings.SIMILARITY_MIN_GAMES)
+    )
+    rows = session.exec(statement).all()
+
+    player_ids = [row.id for row in rows]
+    positions = np.array([row.position for row in rows], dtype=object)
+    vectors = np.array(
+        [[float(getattr(row, name) or 0) for name, _ in FEATURES] for row in rows],
+        dtype=np.float64,
+    ).reshape(len(rows), len(FEATURES))
+
+    # Standardize within each position so a support is compared on what
+    # supports do, then scale rows to unit length for cosine similarity
+    for position in set(positions):
+        members = positions == position
+        mean = vectors[members].mean(axis=0)
+        std = vectors[members].std(axis=0)
+        vectors[members] = (vectors[members] - mean) / np.where(std > 0, std, 1)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = (vectors / np.where(norms > 0, norms, 1)).astype(np.float32)
+
+    row_of = {player_id: row for row, player_id in enumerate(player_ids)}
+    played_in: Dict[Tuple[str, int], List[int]] = {}
+    seasons = (
+        select(MatchPlayerStats.player_id, Tournament.league, Tournament.year)
+        .join(Match, MatchPlayerStats.match_id == Match.id)
+        .join(Tournament, Match.tournament_id == Tournament.id)
+        .distinct()
+    )
+    for player_id, league, year in session.exec(seasons).all():
+        if player_id in row_of:
+            played_in.setdefault((league, year), []).append(row_of[player_id])
+
+    return SimilarityIndex(
+        player_ids=player_ids,
+        names=[row.player_name for row in rows],
+        positions=positions,
+        games=np.array([row.games for row in rows]),
+        vectors=vectors,
+        rows=row_of,
+        played_in={key: np.array(sorted(members)) for key, members in played_in.items()},
+    )
+
+
+similarity_index = VersionedSnapshot("similarity index", build_similarity_index)
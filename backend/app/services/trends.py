@@ -0,0 +1,150 @@
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from sqlmodel import Integer, Session, String, case, cast, delete, func, insert, literal, literal_column, select, tuple_
+
+from app.models.match import Match
+from app.models.match_player_stats import MatchPlayerStats
+from app.models.tournament import Tournament
+from app.models.trend_bucket import TrendBucket
+
+GRANULARITIES = ("week", "month", "patch", "split")
+
+_ENTITIES = {
+    "player": MatchPlayerStats.player_id,
+    "team": MatchPlayerStats.team_id,
+    "champion": MatchPlayerStats.champion,
+}
+
+
+def _entity_games(entity_type: str, entity_ids: Optional[Set[str]]):
+    """One row per entity and game with the game's date, patch and split.
+    Players and champions take a stat row each; a team's five rows are
+    summed so the game counts once."""
+    entity = _ENTITIES[entity_type]
+    per_row = () if entity_type == "team" else (MatchPlayerStats.player_id,)
+    statement = (
+        select(
+            entity.label("entity_id"),
+            Match.match_date,
+            func.nullif(Match.patch, "").label("patch"),
+            Tournament.year,
+            func.nullif(Tournament.split, "").label("split"),
+            func.coalesce(Match.game_length, 0).label("game_length"),
+            func.max(cast(MatchPlayerStats.result, Integer)).label("won"),
+            func.sum(func.coalesce(MatchPlayerStats.kills, 0)).label("kills"),
+            func.sum(func.coalesce(MatchPlayerStats.deaths, 0)).label("deaths"),
+            func.sum(func.coalesce(MatchPlayerStats.assists, 0)).label("assists"),
+            func.sum(func.coalesce(MatchPlayerStats.dpm, 0)).label("dpm"),
+            func.sum(func.coalesce(MatchPlayerStats.cspm, 0)).label("cspm"),
+            func.sum(func.coalesce(MatchPlayerStats.visionscore, 0)).label("vision"),
+            func.sum(func.coalesce(MatchPlayerStats.totalgold, 0)).label("gold"),
+        )
+        .join(Match, MatchPlayerStats.match_id == Match.id)
+        .join(Tournament, Match.tournament_id == Tournament.id)
+        .where(Match.match_date.is_not(None), entity.is_not(None))
+        .group_by(
+            entity, *per_row, Match.id, Match.match_date, Match.patch, Match.game_length,
+            Tournament.year, Tournament.split,
+        )
+    )
+    if entity_ids is not None:
+        statement = statement.where(entity.in_(entity_ids))
+    return statement.subquery()
+
+
+def _calendar_buckets(dialect: str, day) -> Dict[str, Tuple]:
+    """(bucket label, bucket start) of the week and month granularities:
+    ISO weeks starting on Monday (2024-W05) and calendar months (2024-03).
+    Labels are grouped on, so on MySQL they take no bound parameters."""
+    if dialect == "mysql":
+        return {
+            "week": (func.date_format(day, literal_column("'%x-W%v'")), func.subdate(day, func.weekday(day))),
+            "month": (func.date_format(day, literal_column("'%Y-%m'")), func.subdate(day, func.dayofmonth(day) - 1)),
+        }
+
+    weekday = (cast(func.strftime("%w", day), Integer) + 6) % 7  # Monday is 0
+    thursday = func.date(day, cast(3 - weekday, String) + " days")  # Its year and week are the ISO ones
+    week = (cast(func.strftime("%j", thursday), Integer) - 1) // 7 + 1
+    return {
+        "week": (
+            func.strftime("%Y", thursday, type_=String) + "-W" + func.printf("%02d", week, type_=String),
+            func.date(day, cast(-weekday, String) + " days"),
+        ),
+        "month": (func.strftime("%Y-%m", day, type_=String), func.date(day, "start of month")),
+    }
+
+
+def refresh_trend_buckets(
+    session: Session,
+    player_ids: Optional[Iterable[str]] = None,
+    team_ids: Optional[Iterable[str]] = None,
+    champions: Optional[Iterable[str]] = None,
+) -> None:
+    """Rebuild trend_buckets with one INSERT ... SELECT per entity type and
+    granularity, grouping each entity's games into its buckets in SQL.
+
+    With no arguments every series is rebuilt (ingest); otherwise only the
+    series of the given players, teams and champions (admin stat writes).
+    """
+    full = player_ids is None and team_ids is None and champions is None
+    scopes = {
+        "player": None if full else set(player_ids or ()),
+        "team": None if full else set(team_ids or ()),
+        "champion": None if full else set(champions or ()),
+    }
+    if not full and not any(scopes.values()):
+        return
+
+    # Replace the affected series
+    clear = delete(TrendBucket)
+    if not full:
+        clear = clear.where(tuple_(TrendBucket.entity_type, TrendBucket.entity_id).in_(
+            [(entity_type, entity_id) for entity_type, ids in scopes.items() for entity_id in ids]
+        ))
+    session.exec(clear)
+
+    dialect = session.get_bind().dialect.name
+    for entity_type, entity_ids in scopes.items():
+        if entity_ids is not None and not entity_ids:
+            continue
+        games = _entity_games(entity_type, entity_ids)
+        year = cast(games.c.year, String)
+        # granularity -> (bucket label, bucket start, columns grouped on)
+        buckets = {
+            granularity: (label, start, (label,))
+            for granularity, (label, start) in _calendar_buckets(dialect, games.c.match_date).items()
+        }
+        buckets["patch"] = (games.c.patch, games.c.match_date, (games.c.patch,))
+        buckets["split"] = (
+            case((games.c.split.is_(None), year), else_=year + " " + games.c.split),
+            games.c.match_date,
+            (games.c.year, games.c.split),
+        )
+
+        for granularity in GRANULARITIES:
+            label, start, grouping = buckets[granularity]
+            source = (
+                select(
+                    literal(entity_type).label("entity_type"),
+                    games.c.entity_id,
+                    literal(granularity).label("granularity"),
+                    label.label("bucket"),
+                    func.min(start).label("bucket_start"),
+                    func.count().label("games"),
+                    func.sum(games.c.won).label("wins"),
+                    func.sum(games.c.kills).label("kills"),
+                    func.sum(games.c.deaths).label("deaths"),
+                    func.sum(games.c.assists).label("assists"),
+                    func.sum(games.c.dpm).label("dpm_sum"),
+                    func.sum(games.c.cspm).label("cspm_sum"),
+                    func.sum(games.c.vision).label("vision_sum"),
+                    func.sum(games.c.gold).label("gold_sum"),
+                    func.sum(games.c.game_length).label("game_length_sum"),
+                )
+                .group_by(games.c.entity_id, *grouping)
+            )
+            if granularity == "patch":
+                source = source.where(games.c.patch.is_not(None))
+            columns = [column.name for column in source.selected_columns]
+            session.exec(insert(TrendBucket).from_select(columns, source))
+    session.commit()
@@ -0,0 +1,85 @@
+"""Cold start of one API worker.
+
+Starts fresh interpreters and times, in each: importing the app, the startup
+hooks and the first two requests. Compares the current startup (schema
+version check and pool warm-up) with the old one that ran
+SQLModel.metadata.create_all() in every worker. Needs a migrated database in
+DATABASE_URL (environment or .env). tests/test_startup.py checks, on SQLite,
+which statements startup runs.
+
+    cd backend && python -m app.cli migrate && python -m benchmarks.cold_start
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+MODES = ("migrated", "create_all")
+
+
+def child(mode: str) -> None:
+    started = time.perf_counter()
+    timings = {}
+
+    from fastapi.testclient import TestClient
+    from sqlmodel import SQLModel
+
+    from app.core.database import engine
+    from app.main import app
+    import app.models  # noqa: F401
+    timings["import_ms"] = (time.perf_counter() - started) * 1000
+
+    mark = time.perf_counter()
+    if mode == "create_all":
+        SQLModel.metadata.create_all(engine)
+    with TestClient(app) as client:
+        timings["startup_ms"] = (time.perf_counter() - mark) * 1000
+
+        mark = time.perf_counter()
+        client.get("/health")
+        timings["first_health_ms"] = (time.perf_counter() - mark) * 1000
+
+        mark = time.perf_counter()
+        client.get("/api/teams/", params={"limit": 1})
+        timings["first_query_ms"] = (time.perf_counter() - mark) * 1000
+
+    timings["total_ms"] = (time.perf_counter() - started) * 1000
+    print(json.dumps(timings))
+
+
+def run(mode: str, runs: int) -> dict:
+    env = dict(
+        os.environ,
+        PRECOMPUTE_ENABLED="0",
+        RATE_LIMIT_ENABLED="0",
+        SCHEMA_CHECK="off" if mode == "create_all" else "raise",
+    )
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.cold_start", "--child", mode],
+            env=env, capture_output=True, text=True, check=True,
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    return {key: round(statistics.median(sample[key] for sample in samples), 1) for key in samples[0]}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child)
+        return
+    print(f"Median of {args.runs} worker starts")
+    for mode in MODES:
+        print(f"{mode}:", run(mode, args.runs))
+
+
+if __name__ == "__main__":
+    main()
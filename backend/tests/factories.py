@@ -0,0 +1,63 @@
+"""Test data: games with full stat lines, and a small ingested world"""
+from datetime import date, timedelta
+from itertools import cycle
+
+from app.models import Match, MatchPlayerStats, Player, Team, TeamTournament, Tournament
+from app.services.ingest import run_ingest
+
+POSITIONS = ("top", "jng", "mid", "bot", "sup")
+CHAMPIONS = ("Ahri", "Azir", "Jinx", "Lee Sin", "Thresh", "Gnar", "Orianna")
+
+
+def add_game(session, tournament, teams, rosters, number, match_date, blue_wins):
+    match = Match(
+        tournament_id=tournament.id, season=tournament.year, game_number=number % 3 + 1,
+        game_length=1700 + 17 * number, patch=f"14.{number % 3}", match_date=match_date,
+        external_id=f"g{number}",
+    )
+    session.add(match)
+    session.flush()
+    champions = cycle(CHAMPIONS[number % len(CHAMPIONS):] + CHAMPIONS[:number % len(CHAMPIONS)])
+    for side, team, won in (("Blue", teams[0], blue_wins), ("Red", teams[1], not blue_wins)):
+        for slot, player in enumerate(rosters[team.id]):
+            seed = number * 10 + slot
+            session.add(MatchPlayerStats(
+                match_id=match.id, season=match.season, player_id=player.id, team_id=team.id, side=side,
+                champion=next(champions), result=won, kills=seed % 7, deaths=seed % 5, assists=seed % 11,
+                dpm=300 + seed % 400, cspm=5 + seed % 5, visionscore=20 + seed % 50,
+                totalgold=9000 + 37 * seed, earnedgold=6000 + 23 * seed, earned_gpm=300,
+                damagetochampions=8000 + 91 * seed, damageshare=0.2, total_cs=200 + seed,
+            ))
+    return match
+
+
+def build_world(session):
+    """Two tournaments of four teams with 24 games, fully ingested"""
+    tournaments = [
+        Tournament(league="LCK", year=2024, split="Spring", playoffs=False),
+        Tournament(league="LCK", year=2024, split="Summer", playoffs=True),
+    ]
+    teams = [Team(team_name=f"T{i}", external_id=f"t{i}") for i in range(4)]
+    session.add_all(tournaments + teams)
+    session.flush()
+    rosters = {}
+    for i, team in enumerate(teams):
+        rosters[team.id] = [
+            Player(player_name=f"P{i}{position}", position=position, external_id=f"p{i}{position}")
+            for position in POSITIONS
+        ]
+        session.add_all(rosters[team.id])
+        session.add_all(TeamTournament(team_id=team.id, tournament_id=t.id) for t in tournaments)
+    session.flush()
+
+    matches = []
+    for number in range(24):
+        tournament = tournaments[number // 12]
+        pair = [teams[number % 4], teams[(number + 1 + number // 4) % 4]]
+        if pair[0] is pair[1]:
+            pair[1] = teams[(number + 2) % 4]
+        match_date = date(2024, 1, 1) + timedelta(days=number // 3 * 3)
+        matches.append(add_game(session, tournament, pair, rosters, number, match_date, number % 3 != 1))
+    session.commit()
+    run_ingest(session)
+    return {"tournaments": tournaments, "teams": teams, "rosters": rosters, "matches": matches}
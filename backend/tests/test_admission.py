@@ -0,0 +1,193 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.core import admission
+from app.core.admission import AdmissionController, Budget, InMemoryBucketBackend, RedisBucketBackend
+
+
+class Clock:
+    """Stands in for the time module so refills are deterministic"""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(admission, "time", clock)
+    return clock
+
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request):
+    if request.param == "memory":
+        return InMemoryBucketBackend()
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")  # fakeredis runs the Lua script with it
+    return RedisBucketBackend(fakeredis.aioredis.FakeRedis())
+
+
+def test_bucket_admits_burst_then_rejects_until_refilled(backend, clock):
+    async def scenario():
+        admitted = [await backend.take("k", 2, 3, 1) for _ in range(3)]
+        rejected = await backend.take("k", 2, 3, 1)
+        clock.now += 0.5  # One token back at two per second
+        refilled = await backend.take("k", 2, 3, 1)
+        empty = await backend.take("k", 2, 3, 1)
+        clock.now += 60  # Never more than the burst
+        after_idle = [await backend.take("k", 2, 3, 1) for _ in range(4)]
+        return admitted, rejected, refilled, empty, after_idle
+
+    admitted, rejected, refilled, empty, after_idle = asyncio.run(scenario())
+    assert admitted == [0.0, 0.0, 0.0]
+    assert rejected == pytest.approx(0.5)
+    assert refilled == 0.0
+    assert empty == pytest.approx(0.5)
+    assert after_idle[:3] == [0.0, 0.0, 0.0]
+    assert after_idle[3] > 0
+
+
+def test_bucket_cost_and_keys(backend, clock):
+    async def scenario():
+        return (
+            await backend.take("a", 1, 2, 2),
+            await backend.take("a", 1, 2, 2),
+            await backend.take("b", 1, 2, 2),
+        )
+
+    first, second, other_key = asyncio.run(scenario())
+    assert first == 0.0
+    assert second == pytest.approx(2.0)  # A double-cost request waits for two tokens
+    assert other_key == 0.0
+
+
+def api(controller: AdmissionController, release: asyncio.Event = None) -> FastAPI:
+    app = FastAPI()
+    app.middleware("http")(controller)
+
+    @app.get("/api/teams/")
+    async def teams():
+        return []
+
+    @app.get("/api/analytics/leaderboard/players")
+    async def leaderboard():
+        if release is not None:
+            await release.wait()
+        return []
+
+    return app
+
+
+def controller(backend, **overrides) -> AdmissionController:
+    options = dict(
+        budgets={"crud": Budget(1, 2), "analytics": Budget(1, 1)},
+        max_heavy=1,
+        max_waiting=1,
+        queue_timeout=5,
+    )
+    options.update(overrides)
+    return AdmissionController(backend=backend, **options)
+
+
+async def get(client: httpx.AsyncClient, path: str, **params) -> httpx.Response:
+    return await client.get(path, params=params)
+
+
+def client_for(app: FastAPI) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+def test_rejections_carry_retry_after_and_budgets_are_separate(backend, clock):
+    async def scenario():
+        async with client_for(api(controller(backend))) as client:
+            crud = [await get(client, "/api/teams/") for _ in range(3)]
+            # The analytics budget is untouched by CRUD traffic
+            analytics = [await get(client, "/api/analytics/leaderboard/players", year=2024) for _ in range(2)]
+            clock.now += 1
+            refilled = await get(client, "/api/teams/")
+            return crud, analytics, refilled
+
+    crud, analytics, refilled = asyncio.run(scenario())
+    assert [response.status_code for response in crud] == [200, 200, 429]
+    assert crud[2].headers["Retry-After"] == "1"
+    assert crud[2].json() == {"detail": "Rate limit exceeded"}
+    assert [response.status_code for response in analytics] == [200, 429]
+    assert refilled.status_code == 200
+
+
+def test_unfiltered_heavy_queries_cost_double(backend, clock):
+    async def scenario():
+        app = api(controller(backend, budgets={"crud": Budget(1, 2), "analytics": Budget(1, 2)}))
+        async with client_for(app) as client:
+            return [await get(client, "/api/analytics/leaderboard/players") for _ in range(2)]
+
+    first, second = asyncio.run(scenario())
+    assert first.status_code == 200
+    assert second.status_code == 429
+    assert second.headers["Retry-After"] == "2"
+
+
+def test_heavy_queries_queue_then_get_503(clock):
+    budgets = {"crud": Budget(100, 100), "analytics": Budget(100, 100)}
+
+    async def scenario():
+        release = asyncio.Event()
+        app = api(controller(InMemoryBucketBackend(), budgets=budgets), release)
+        async with client_for(app) as client:
+            path = "/api/analytics/leaderboard/players"
+            running = asyncio.create_task(get(client, path, year=2024))
+            await asyncio.sleep(0.05)
+            queued = asyncio.create_task(get(client, path, year=2024))
+            await asyncio.sleep(0.05)
+            # One query runs and one waits: the queue is full
+            overflow = await get(client, path, year=2024)
+            crud = await get(client, "/api/teams/")  # Not capped
+            release.set()
+            return await running, await queued, overflow, crud
+
+    running, queued, overflow, crud = asyncio.run(scenario())
+    assert running.status_code == 200
+    assert queued.status_code == 200
+    assert overflow.status_code == 503
+    assert overflow.headers["Retry-After"] == "5"
+    assert crud.status_code == 200
+
+
+def test_heavy_query_wait_times_out_with_503(clock):
+    budgets = {"crud": Budget(100, 100), "analytics": Budget(100, 100)}
+
+    async def scenario():
+        release = asyncio.Event()
+        app = api(controller(InMemoryBucketBackend(), budgets=budgets, queue_timeout=0.1), release)
+        async with client_for(app) as client:
+            path = "/api/analytics/leaderboard/players"
+            running = asyncio.create_task(get(client, path, year=2024))
+            await asyncio.sleep(0.05)
+            timed_out = await get(client, path, year=2024)
+            release.set()
+            return await running, timed_out
+
+    running, timed_out = asyncio.run(scenario())
+    assert running.status_code == 200
+    assert timed_out.status_code == 503
+    assert timed_out.headers["Retry-After"] == "1"
+
+
+def test_backend_follows_settings(monkeypatch):
+    pytest.importorskip("redis")
+    monkeypatch.setattr(admission.settings, "RATE_LIMIT_BACKEND", "redis")
+    monkeypatch.setattr(admission.settings, "RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0")
+    assert isinstance(admission.create_admission_controller().backend, RedisBucketBackend)
+
+    monkeypatch.setattr(admission.settings, "RATE_LIMIT_BACKEND", "memory")
+    assert isinstance(admission.create_admission_controller().backend, InMemoryBucketBackend)
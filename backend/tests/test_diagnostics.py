@@ -0,0 +1,33 @@
+import pytest
+from sqlmodel import Session, select
+
+from app.core.diagnostics import NPlusOneError, install_query_diagnostics, normalize_sql, track_queries
+from app.models.team import Team
+
+
+def test_literals_and_in_lists_share_a_shape():
+    assert normalize_sql("SELECT * FROM teams WHERE id = 'a' AND season = 2024") == normalize_sql(
+        "SELECT *  FROM teams\nWHERE id = 'b' AND season = 2023"
+    )
+    assert normalize_sql("SELECT * FROM teams WHERE id IN (?, ?, ?)") == "SELECT * FROM teams WHERE id IN (?)"
+
+
+def test_repeated_statement_shape_raises(engine):
+    install_query_diagnostics(engine)
+    with Session(engine) as session:
+        with pytest.raises(NPlusOneError, match="3 times"):
+            with track_queries(route="GET /teams", threshold=2, raise_on_nplusone=True):
+                for team_id in ("a", "b", "c"):
+                    session.exec(select(Team).where(Team.id == team_id)).first()
+
+
+def test_shapes_within_the_threshold_pass(engine):
+    install_query_diagnostics(engine)
+    with Session(engine) as session:
+        with track_queries(route="GET /teams", threshold=2, raise_on_nplusone=True) as log:
+            for team_id in ("a", "b"):
+                session.exec(select(Team).where(Team.id == team_id)).first()
+            session.exec(select(Team.team_name)).all()
+
+    assert log.total_queries == 3
+    assert log.repeated_shapes() == {}
@@ -0,0 +1,44 @@
+from datetime import date
+
+from app.core.config import settings
+from app.models import Match, MatchPlayerStats, Player, Tournament
+
+
+def seed_split(session, players, tournament: Tournament, games: int) -> None:
+    """`games` games of `tournament` in which every player takes part"""
+    session.add(tournament)
+    session.flush()
+    for game in range(games):
+        match = Match(
+            external_id=f"{tournament.id}-{game}", tournament_id=tournament.id, season=tournament.year,
+            match_date=date(tournament.year, 3, 1 + game),
+        )
+        session.add(match)
+        session.flush()
+        for number, player in enumerate(players):
+            session.add(MatchPlayerStats(
+                match_id=match.id, season=tournament.year, player_id=player.id, team_id="t",
+                result=number % 2 == 0, kills=number + 1, deaths=1, assists=number, dpm=100.0 * (number + 1),
+            ))
+
+
+def test_percentiles_only_for_a_split_of_one_year(client, session):
+    players = [Player(player_name=f"mid{number}", position="mid", external_id=f"mid{number}") for number in range(3)]
+    session.add_all(players)
+    games = settings.PERCENTILE_MIN_GAMES
+    seed_split(session, players, Tournament(league="LCK", year=2023, split="Spring"), games)
+    seed_split(session, players, Tournament(league="LCK", year=2024, split="Spring"), games)
+    session.commit()
+
+    def leaderboard(**params):
+        response = client.get("/api/analytics/leaderboard/players", params=dict(metric="dpm", min_games=1, **params))
+        assert response.status_code == 200
+        return {row["player_name"]: row["percentile"] for row in response.json()}
+
+    one_year = leaderboard(split="Spring", year=2024)
+    assert set(one_year) == {"mid0", "mid1", "mid2"}
+    assert all(percentile is not None for percentile in one_year.values())
+    assert one_year["mid2"] > one_year["mid0"]
+
+    # Without a year the lookup would fall back to the all-splits cohort
+    assert set(leaderboard(split="Spring").values()) == {None}
@@ -0,0 +1,73 @@
+import numpy as np
+
+from app.services.matchups import _matrix, _pair_lanes
+
+
+def test_pair_lanes_pairs_blue_and_red_rows_of_a_lane():
+    # match, position, side (0 blue, 1 red) of each stat row
+    rows = np.array([
+        (0, 0, 0), (0, 0, 1),  # Paired
+        (0, 1, 1), (0, 1, 0),  # Paired, red row first
+        (0, 2, 0),  # No opponent
+        (1, 0, 0), (1, 0, 0), (1, 0, 1),  # Three rows in one lane
+        (1, 1, 0), (1, 1, 0),  # Both on blue
+    ])
+    blue, red = _pair_lanes(rows[:, 0], rows[:, 1], rows[:, 2])
+
+    assert blue.tolist() == [0, 3]
+    assert red.tolist() == [1, 2]
+
+
+def test_pair_lanes_does_not_mix_matches():
+    match, position, side = np.array([0, 1]), np.array([0, 0]), np.array([0, 1])
+    blue, red = _pair_lanes(match, position, side)
+
+    assert len(blue) == len(red) == 0
+
+
+def test_matrix_counts_each_pairing_from_both_sides():
+    names = np.array(["Ahri", "Azir", "Zed", "Syndra"], dtype=object)
+    matrix = _matrix(
+        champion=np.array([0, 1, 3]),
+        opponent=np.array([1, 0, 3]),
+        won=np.array([1.0, 1.0, 0.0]),
+        gold_diff=np.array([100.0, 30.0, 10.0]),
+        damage_diff=np.array([50.0, 0.0, 5.0]),
+        names=names,
+    )
+
+    assert matrix.champions == ["Ahri", "Azir", "Syndra"]  # Only champions that played
+    ahri, azir, syndra = (matrix.index[name] for name in ("Ahri", "Azir", "Syndra"))
+
+    assert matrix.games[ahri, azir] == matrix.games[azir, ahri] == 2
+    assert matrix.wins[ahri, azir] == matrix.wins[azir, ahri] == 1
+    assert matrix.gold_diff[ahri, azir] == 70.0
+    assert matrix.gold_diff[azir, ahri] == -70.0
+    assert matrix.damage_diff[ahri, azir] == 50.0
+    assert matrix.damage_diff[azir, ahri] == -50.0
+
+    # A mirror match fills its cell once
+    assert matrix.games[syndra, syndra] == 1
+    assert matrix.wins[syndra, syndra] == 0
+    assert matrix.gold_diff[syndra, syndra] == 10.0
+    assert matrix.games.sum() == 5
+
+
+def test_matrix_matchups_filters_and_sorts():
+    names = np.array(["Ahri", "Azir", "Syndra"], dtype=object)
+    matrix = _matrix(
+        champion=np.array([0, 0, 0, 2]),
+        opponent=np.array([1, 1, 2, 1]),
+        won=np.array([1.0, 1.0, 0.0, 1.0]),
+        gold_diff=np.zeros(4),
+        damage_diff=np.zeros(4),
+        names=names,
+    )
+
+    best = matrix.matchups(champion="Ahri")
+    assert [(cell["opponent"], cell["games"], cell["win_rate"]) for cell in best] == [
+        ("Azir", 2, 100.0), ("Syndra", 1, 0.0),
+    ]
+    assert [cell["champion"] for cell in matrix.matchups(opponent="Azir", sort_by="games")] == ["Ahri", "Syndra"]
+    assert matrix.matchups(champion="Ahri", min_games=2)[0]["opponent"] == "Azir"
+    assert matrix.matchups(champion="Zed") == []
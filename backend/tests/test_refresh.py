@@ -0,0 +1,132 @@
+"""The scoped refresh_* calls behind admin writes must leave the derived
+tables exactly as a full rebuild from match_player_stats would."""
+from datetime import date
+
+from sqlmodel import select, update
+
+from app.models import (
+    ChampionPatchStats, CurrentRating, Match, MatchCard, MatchPlayerStats, PlayerCareerStats,
+    PlayerChampionStats, PlayerDuo, PlayerGameMetrics, PlayerTeamStats, RatingSnapshot, Series,
+    SeriesStanding, TeamGame, TeamLineup, TrendBucket,
+)
+from app.models.player_champion_stats import NO_CHAMPION
+from app.services.cascades import delete_matches
+from app.services.ingest import apply_stat_changes, collect_stat_change
+from app.services.lineups import refresh_duos, refresh_lineups
+from app.services.match_cards import refresh_match_cards
+from app.services.metrics import refresh_game_metrics
+from app.services.ratings import update_ratings
+from app.services.rollups import refresh_champion_stats, refresh_player_rollups, refresh_team_games
+from app.services.series import refresh_series
+from app.services.trends import refresh_trend_buckets
+from tests.factories import add_game
+
+DERIVED = (
+    PlayerCareerStats, PlayerTeamStats, PlayerChampionStats, ChampionPatchStats, PlayerGameMetrics,
+    TeamGame, Series, SeriesStanding, TeamLineup, PlayerDuo, TrendBucket, MatchCard,
+    RatingSnapshot, CurrentRating,
+)
+
+
+def snapshot(session):
+    """Every derived row, floats rounded, in a stable order"""
+    def value(item):
+        return round(item, 6) if isinstance(item, float) else item
+
+    return {
+        model.__tablename__: sorted(
+            (tuple((name, value(item)) for name, item in sorted(row.model_dump().items()))
+             for row in session.exec(select(model)).all()),
+            key=repr,
+        )
+        for model in DERIVED
+    }
+
+
+def full_rebuild(session):
+    refresh_player_rollups(session)
+    refresh_game_metrics(session)
+    refresh_champion_stats(session)
+    refresh_team_games(session)
+    refresh_series(session)
+    refresh_lineups(session)
+    refresh_duos(session)
+    refresh_trend_buckets(session)
+    refresh_match_cards(session)
+    update_ratings(session, rebuild=True)
+
+
+def assert_matches_full_rebuild(session):
+    incremental = snapshot(session)
+    full_rebuild(session)
+    full = snapshot(session)
+    for table in full:
+        assert incremental[table] == full[table], table
+
+
+def test_ingest_is_a_full_rebuild(session, world):
+    assert_matches_full_rebuild(session)
+
+
+def test_stat_row_edit(session, world):
+    match = world["matches"][5]
+    row = session.exec(select(MatchPlayerStats).where(MatchPlayerStats.match_id == match.id)).first()
+    change = collect_stat_change(session, [match.id])
+    row.kills += 9
+    row.champion = "Zed"  # The old champion's series change too
+    session.add(row)
+    session.commit()
+
+    apply_stat_changes(session, change.update(collect_stat_change(session, [match.id])))
+    assert_matches_full_rebuild(session)
+
+
+def test_stat_row_without_champion(session, world, client):
+    """Games with no champion recorded keep their rollup row, listed as champion null"""
+    match = world["matches"][5]
+    row = session.exec(select(MatchPlayerStats).where(MatchPlayerStats.match_id == match.id)).first()
+    change = collect_stat_change(session, [match.id])
+    row.champion = None
+    session.add(row)
+    session.commit()
+
+    apply_stat_changes(session, change.update(collect_stat_change(session, [match.id])))
+    assert_matches_full_rebuild(session)
+    rollup = session.get(PlayerChampionStats, (row.player_id, NO_CHAMPION))
+    assert (rollup.games, rollup.kills) == (1, row.kills)
+
+    champions = client.get(f"/api/players/{row.player_id}/champions").json()
+    assert [item["games_played"] for item in champions if item["champion"] is None] == [1]
+    assert sum(item["games_played"] for item in champions) == session.get(PlayerCareerStats, row.player_id).games
+
+
+def test_new_game(session, world):
+    tournament, teams = world["tournaments"][0], world["teams"]
+    match = add_game(session, tournament, [teams[2], teams[0]], world["rosters"], 40, date(2024, 1, 10), True)
+    session.commit()
+
+    apply_stat_changes(session, collect_stat_change(session, [match.id]))
+    assert_matches_full_rebuild(session)
+
+
+def test_deleted_game(session, world):
+    match_id = world["matches"][3].id
+    change = collect_stat_change(session, [match_id])
+    delete_matches(session, [match_id])
+    session.commit()
+
+    apply_stat_changes(session, change)
+    assert_matches_full_rebuild(session)
+
+
+def test_game_moved_to_another_tournament_and_day(session, world):
+    match = world["matches"][2]
+    change = collect_stat_change(session, [match.id])
+    session.exec(
+        update(Match).where(Match.id == match.id)
+        .values(tournament_id=world["tournaments"][1].id, match_date=date(2024, 2, 20), patch="14.9")
+    )
+    session.commit()
+
+    apply_stat_changes(session, change.update(collect_stat_change(session, [match.id])))
+    assert_matches_full_rebuild(session)
@@ -0,0 +1,43 @@
+import pytest
+
+from app.core.config import settings
+from app.core.principal_cache import principal_cache
+from app.core.security import create_access_token
+from app.models.user import User
+
+
+@pytest.fixture
+def user(session):
+    user = User(username="ana", email="ana@example.com", hashed_password="-", role="public")
+    session.add(user)
+    session.commit()
+    return user
+
+
+def list_users(client, role):
+    token = create_access_token({"sub": "ana"}, role=role)
+    return client.get("/api/users/", headers={"Authorization": f"Bearer {token}"})
+
+
+@pytest.mark.parametrize("embed_role", [False, True])
+def test_stored_role_decides_when_the_claim_falls_short(client, session, user, monkeypatch, embed_role):
+    monkeypatch.setattr(settings, "JWT_EMBED_ROLE", embed_role)
+    token_role = user.role
+
+    assert list_users(client, token_role).status_code == 403
+
+    # Promoted after the token was issued
+    user.role = "admin"
+    session.add(user)
+    session.commit()
+    principal_cache.invalidate("ana")
+    assert list_users(client, token_role).status_code == 200
+
+
+def test_sufficient_claim_admits(client, user, monkeypatch):
+    monkeypatch.setattr(settings, "JWT_EMBED_ROLE", True)
+
+    response = list_users(client, "admin")
+
+    assert response.status_code == 200
+    assert [row["username"] for row in response.json()] == ["ana"]
@@ -0,0 +1,89 @@
+import math
+import re
+
+import numpy as np
+import pytest
+
+from app.services.cohorts import METRICS, Cohort
+from app.services.scoring import MAX_NODES, ScoreExpressionError, compile_score
+
+
+def cohort(players):
+    """Cohort over {player: {metric: value}}, other metrics zero"""
+    rows = {player: tuple(float(values.get(metric, 0)) for metric in METRICS) for player, values in players.items()}
+    player_ids = list(rows)
+    matrix = np.array([rows[player] for player in player_ids], dtype=np.float64)
+    return Cohort(
+        players=rows,
+        sorted_values={metric: np.sort(matrix[:, i]) for i, metric in enumerate(METRICS)},
+        player_ids=player_ids,
+        matrix=matrix,
+    )
+
+
+@pytest.mark.parametrize("expression, metrics", [
+    ("0.4 * z(dpm) + 0.3 * z(kp) + 0.3 * z(vision)", {"dpm", "kp", "vision"}),
+    ("kda", {"kda"}),
+    ("-cspm + +winrate ** 2 / 3 - 1", {"cspm", "winrate"}),
+    ("pct(dpm) + abs(kda) + log(vision)", {"dpm", "kda", "vision"}),
+    ("max(kda, dpm / 100, 2) - min(kp, 50)", {"kda", "dpm", "kp"}),
+])
+def test_whitelisted_expressions_compile(expression, metrics):
+    assert compile_score(expression).metrics == metrics
+
+
+def test_compiled_scores_are_normalized_and_cached():
+    score = compile_score("  z( dpm )*2 ")
+
+    assert score.expression == "z(dpm) * 2"
+    assert compile_score("  z( dpm )*2 ") is score
+
+
+@pytest.mark.parametrize("expression, message", [
+    ("z(dpm", "Invalid expression"),
+    ("", "Invalid expression"),
+    ("gold", "Unknown metric 'gold'"),
+    ("exp(dpm)", "Unknown function 'exp'"),
+    ("__import__('os').system('true')", "is not allowed"),
+    ("open('x')", "Unknown function 'open'"),
+    ("dpm.real", "is not allowed"),
+    ("dpm[0]", "is not allowed"),
+    ("dpm if kda else kp", "is not allowed"),
+    ("dpm > 1", "is not allowed"),
+    ("dpm and kp", "is not allowed"),
+    ("dpm % 2", "is not allowed"),
+    ("dpm // 2", "is not allowed"),
+    ("~dpm", "is not allowed"),
+    ("(lambda: dpm)()", "is not allowed"),
+    ("[dpm]", "is not allowed"),
+    ("'dpm'", "is not allowed"),
+    ("dpm + True", "is not allowed"),
+    ("z(dpm, kp)", "Wrong number of arguments to z()"),
+    ("max(dpm)", "Wrong number of arguments to max()"),
+    ("max(dpm, kp, key=abs)", "is not allowed"),
+    ("z(*dpm)", "is not allowed"),
+    ("z(1) + dpm", "z() needs an argument that uses a metric"),
+    ("1 + 2", "does not use any metric"),
+    (" + ".join(["dpm"] * MAX_NODES), "too long"),
+])
+def test_rejected_expressions(expression, message):
+    with pytest.raises(ScoreExpressionError, match=re.escape(message)):
+        compile_score(expression)
+
+
+def test_evaluate_and_top():
+    players = cohort({
+        "a": {"dpm": 300, "kda": 2},
+        "b": {"dpm": 600, "kda": 0},
+        "c": {"dpm": 900, "kda": 4},
+    })
+
+    assert compile_score("dpm / kda").evaluate(players)[[0, 2]].tolist() == [150.0, 225.0]
+    assert math.isnan(compile_score("dpm / kda").evaluate(players)[1])  # Division by zero
+    assert compile_score("z(dpm)").evaluate(players).tolist() == pytest.approx([-1.224745, 0.0, 1.224745])
+    assert compile_score("pct(dpm) + 0 * kda").evaluate(players).tolist() == pytest.approx([100 / 3, 200 / 3, 100])
+    assert compile_score("z(kp) + dpm").evaluate(players).tolist() == [300.0, 600.0, 900.0]  # Level cohort
+
+    # NaN scores are left out; best first
+    assert [row for row, _ in compile_score("dpm / kda").top(players, 5)] == [2, 0]
+    assert compile_score("dpm").top(players, 2) == [(2, 900.0), (1, 600.0)]
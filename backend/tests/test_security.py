@@ -0,0 +1,45 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.core import security
+from app.core.security import PasswordHashingBusy
+
+
+def test_cancelled_hash_stays_pending_until_its_thread_finishes(monkeypatch):
+    monkeypatch.setattr(security.settings, "PASSWORD_HASH_MAX_QUEUE", 0)
+    release = threading.Event()
+    finished = threading.Event()
+
+    def slow_hash(password):
+        release.wait(5)
+        finished.set()
+        return password
+
+    async def scenario():
+        waiting = asyncio.create_task(security._run_hashing(slow_hash, "a"))
+        await asyncio.sleep(0.05)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        # The request gave up but the worker is still hashing
+        pending_after_cancel = security._hash_pending
+
+        other = asyncio.create_task(security._run_hashing(slow_hash, "b"))
+        await asyncio.sleep(0.05)
+        with pytest.raises(PasswordHashingBusy):
+            await security._run_hashing(slow_hash, "c")
+
+        release.set()
+        assert await other == "b"
+        await asyncio.get_running_loop().run_in_executor(None, finished.wait, 5)
+        return pending_after_cancel
+
+    assert asyncio.run(scenario()) == 1
+    # Freed by the done-callbacks, which run on the workers just after the hash
+    deadline = time.monotonic() + 1
+    while security._hash_pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert security._hash_pending == 0
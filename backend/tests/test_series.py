@@ -0,0 +1,113 @@
+from datetime import date
+from types import SimpleNamespace
+
+from app.services.series import build_standings, group_series, series_id
+
+DAY = date(2024, 3, 1)
+
+
+def game(match_id, team_id, opponent_id, result, game_number, match_date=DAY, tournament_id="t"):
+    """A team_games row as refresh_series selects it (team_id < opponent_id)"""
+    return SimpleNamespace(
+        match_id=match_id, team_id=team_id, opponent_id=opponent_id, result=result,
+        tournament_id=tournament_id, match_date=match_date, game_number=game_number,
+    )
+
+
+def series(team_a_id, team_b_id, team_a_wins, team_b_wins):
+    winner = None if team_a_wins == team_b_wins else team_a_id if team_a_wins > team_b_wins else team_b_id
+    return {
+        "team_a_id": team_a_id, "team_b_id": team_b_id,
+        "team_a_wins": team_a_wins, "team_b_wins": team_b_wins, "winner_team_id": winner,
+    }
+
+
+def test_games_of_a_pair_on_one_day_form_a_series():
+    (row,) = group_series([game("m1", "a", "b", True, 1), game("m2", "a", "b", False, 2), game("m3", "a", "b", True, 3)])
+
+    assert row["id"] == series_id("m1")
+    assert (row["team_a_wins"], row["team_b_wins"], row["games"]) == (2, 1, 3)
+    assert row["best_of"] == 3
+    assert row["winner_team_id"] == "a"
+    assert (row["first_game_number"], row["last_game_number"]) == (1, 3)
+    assert "key" not in row
+
+
+def test_game_number_restart_splits_series():
+    rows = group_series([game("m1", "a", "b", True, 1), game("m2", "a", "b", False, 1)])
+
+    assert [row["first_match_id"] for row in rows] == ["m1", "m2"]
+    assert [row["winner_team_id"] for row in rows] == ["a", "b"]
+    assert [row["best_of"] for row in rows] == [1, 1]
+
+
+def test_new_day_or_pair_splits_series():
+    rows = group_series([
+        game("m1", "a", "b", True, 1),
+        game("m2", "a", "c", True, 2),
+        game("m3", "a", "c", True, 3, match_date=date(2024, 3, 2)),
+    ])
+
+    assert [(row["team_b_id"], row["match_date"], row["games"]) for row in rows] == [
+        ("b", DAY, 1), ("c", DAY, 1), ("c", date(2024, 3, 2), 1),
+    ]
+
+
+def test_missing_game_numbers_stay_in_one_series():
+    (row,) = group_series([game("m1", "a", "b", True, None), game("m2", "a", "b", True, None)])
+
+    assert row["games"] == 2
+    assert row["best_of"] == 3
+
+
+def test_level_series_has_no_winner():
+    (row,) = group_series([game("m1", "a", "b", True, 1), game("m2", "a", "b", False, 2)])
+
+    assert row["best_of"] is None
+    assert row["winner_team_id"] is None
+
+
+def test_no_games_no_series():
+    assert group_series([]) == []
+
+
+def test_standings_order_by_series_record_then_game_differential():
+    # Every team is 1-1 in series and 1-1 head to head; game differential decides
+    standings = build_standings("t", [series("a", "b", 2, 0), series("b", "c", 2, 1), series("a", "c", 1, 2)])
+
+    assert [(row["team_id"], row["rank"]) for row in standings] == [("a", 1), ("c", 2), ("b", 3)]
+    a = standings[0]
+    assert (a["series_played"], a["series_wins"], a["series_losses"]) == (2, 1, 1)
+    assert (a["game_wins"], a["game_losses"], a["head_to_head_wins"]) == (3, 2, 1)
+    assert all(row["tournament_id"] == "t" for row in standings)
+
+
+def test_head_to_head_breaks_ties_before_game_differential():
+    standings = build_standings("t", [
+        series("a", "b", 1, 0),
+        series("a", "c", 1, 0),
+        series("a", "d", 0, 2),
+        series("b", "c", 2, 0),
+        series("b", "d", 2, 0),
+        series("c", "d", 1, 0),
+    ])
+
+    # a and b are both 2-1; b has the better game differential but lost to a
+    assert [row["team_id"] for row in standings] == ["a", "b", "c", "d"]
+    assert [row["head_to_head_wins"] for row in standings] == [1, 0, 1, 0]
+    assert [row["rank"] for row in standings] == [1, 2, 3, 4]
+
+
+def test_teams_level_on_every_tiebreaker_share_a_rank():
+    standings = build_standings("t", [series("a", "b", 1, 0), series("a", "b", 0, 1), series("a", "c", 1, 0)])
+
+    assert [(row["team_id"], row["rank"]) for row in standings] == [("a", 1), ("b", 2), ("c", 3)]
+    standings = build_standings("t", [series("a", "b", 1, 0), series("a", "b", 0, 1)])
+    assert [row["rank"] for row in standings] == [1, 1]
+
+
+def test_level_series_count_as_played_only():
+    standings = build_standings("t", [series("a", "b", 1, 1)])
+
+    assert [(row["series_played"], row["series_wins"], row["series_losses"]) for row in standings] == [(1, 0, 0)] * 2
+    assert [row["rank"] for row in standings] == [1, 1]
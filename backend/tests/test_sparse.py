@@ -0,0 +1,59 @@
+import pytest
+
+# path template -> fields asked for
+ROUTES = {
+    "/api/players/{player}/matches": ["match_id", "kills", "match_date", "team_name"],
+    "/api/players/{player}/duos": ["partner_name", "games", "win_rate"],
+    "/api/players/{player}/champions": ["champion", "games_played", "avg_kda"],
+    "/api/teams/{team}/matches": ["id", "opponent", "result"],
+    "/api/teams/{team}/lineups": ["lineup", "players", "games"],
+    "/api/tournaments/{tournament}/matches": ["id", "match_date", "teams"],
+}
+
+
+def path_for(template, world):
+    return template.format(
+        player=world["rosters"][world["teams"][0].id][2].id,
+        team=world["teams"][0].id,
+        tournament=world["tournaments"][0].id,
+    )
+
+
+@pytest.mark.parametrize("template", ROUTES)
+def test_fields_trim_rows_to_the_full_answer(client, world, template):
+    path, fields = path_for(template, world), ROUTES[template]
+
+    full = client.get(path).json()
+    sparse = client.get(path, params={"fields": ",".join(fields)})
+
+    assert sparse.status_code == 200
+    assert full
+    assert sparse.json() == [{name: row[name] for name in fields} for row in full]
+
+
+@pytest.mark.parametrize("template", ROUTES)
+def test_unknown_fields_are_rejected(client, world, template):
+    response = client.get(path_for(template, world), params={"fields": "id,secret"})
+
+    assert response.status_code == 400
+    assert response.json()["detail"].endswith("secret")
+
+
+def test_team_series_fields(client, world):
+    path = f"/api/teams/{world['teams'][0].id}/series"
+    full = client.get(path).json()
+
+    assert client.get(path, params={"fields": "overall,by_format"}).json() == {
+        "overall": full["overall"], "by_format": full["by_format"],
+    }
+    assert client.get(path, params={"fields": "series"}).json() == {"series": full["series"]}
+
+
+def test_player_fields_refuse_parameters_of_the_full_answer(client, world):
+    player = world["rosters"][world["teams"][0].id][0]
+    path = f"/api/players/{player.id}"
+
+    assert client.get(path, params={"fields": "player_name"}).json() == {"player_name": player.player_name}
+    response = client.get(path, params={"fields": "player_name", "year": 2024, "window": 5})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "fields cannot be combined with year, window"}
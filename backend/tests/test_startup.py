@@ -0,0 +1,63 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session
+
+from app.core import data_version, snapshot
+from app.core.config import settings
+from app.main import app
+from app.models.data_version import DataVersion
+from app.services.precompute import precompute_scheduler
+
+
+def boot(engine, monkeypatch) -> list:
+    """Start and stop the app once, returning the SQL it ran"""
+    monkeypatch.setattr(data_version, "_listeners", [])
+    monkeypatch.setattr(data_version, "_current", 0)
+    monkeypatch.setattr(precompute_scheduler, "_task", None)
+
+    statements = []
+
+    def record(connection, cursor, statement, *args):
+        statements.append(" ".join(statement.split()))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        with TestClient(app):
+            pass
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return statements
+
+
+def test_startup_only_checks_schema_warms_pool_and_reads_version(app_engine, monkeypatch):
+    monkeypatch.setattr(settings, "WARM_ON_STARTUP", False)
+    with Session(app_engine) as session:
+        session.add(DataVersion(id=1, version=3))
+        session.commit()
+    builds = {item.name: item.builds for item in snapshot._snapshots}
+
+    statements = boot(app_engine, monkeypatch)
+
+    assert not [s for s in statements if s.split()[0].upper() in ("CREATE", "ALTER", "DROP", "INSERT", "UPDATE")]
+    assert statements == [
+        'PRAGMA main.table_info("schema_migrations")',
+        "SELECT max(schema_migrations.version) AS max_1 FROM schema_migrations",
+        *["SELECT 1"] * settings.DB_POOL_WARMUP,
+        "SELECT data_version.id AS data_version_id, data_version.version AS data_version_version, "
+        "data_version.updated_at AS data_version_updated_at FROM data_version WHERE data_version.id = ?",
+    ]
+    # The stored version is adopted without rebuilding anything
+    assert data_version.current_data_version() == 3
+    assert {item.name: item.builds for item in snapshot._snapshots} == builds
+    assert precompute_scheduler._task is None
+
+
+def test_warm_on_startup_schedules_precompute(app_engine, monkeypatch):
+    monkeypatch.setattr(settings, "WARM_ON_STARTUP", True)
+    monkeypatch.setattr(settings, "PRECOMPUTE_ENABLED", True)
+    started = []
+    monkeypatch.setattr(precompute_scheduler, "_start", started.append)
+
+    boot(app_engine, monkeypatch)
+
+    assert started == [0]
@@ -0,0 +1,46 @@
+from datetime import date
+
+from app.core.config import settings
+from app.models import Match, MatchPlayerStats, Player, Team, TeamTournament, Tournament
+
+
+def test_team_tournaments_come_from_one_grouped_query(client, session):
+    team, other = Team(team_name="A", external_id="a"), Team(team_name="B", external_id="b")
+    player = Player(player_name="a-mid", position="mid", external_id="a-mid")
+    rival = Player(player_name="b-mid", position="mid", external_id="b-mid")
+    session.add_all([team, other, player, rival])
+    # More tournaments than a per-tournament query loop may issue
+    tournaments = [
+        Tournament(league=f"L{number}", year=2020 + number % 3, split="Spring", playoffs=number % 2 == 1)
+        for number in range(settings.NPLUSONE_THRESHOLD + 2)
+    ]
+    session.add_all(tournaments)
+    session.flush()
+    for number, tournament in enumerate(tournaments):
+        session.add(TeamTournament(team_id=team.id, tournament_id=tournament.id))
+        for game in range(number % 3):  # Zero, one or two games
+            match = Match(
+                external_id=f"g{number}-{game}", tournament_id=tournament.id, season=tournament.year,
+                match_date=date(tournament.year, 3, 1),
+            )
+            session.add(match)
+            session.flush()
+            session.add(MatchPlayerStats(
+                match_id=match.id, season=tournament.year, player_id=player.id, team_id=team.id, result=game == 0,
+            ))
+            # The opponent's rows do not count for the team
+            session.add(MatchPlayerStats(
+                match_id=match.id, season=tournament.year, player_id=rival.id, team_id=other.id, result=game != 0,
+            ))
+    session.commit()
+
+    response = client.get(f"/api/teams/{team.id}/tournaments")
+
+    assert response.status_code == 200
+    records = {row["tournament_id"]: row for row in response.json()}
+    assert len(records) == len(tournaments)
+    for number, tournament in enumerate(tournaments):
+        row = records[tournament.id]
+        games = number % 3
+        assert (row["total_games"], row["wins"], row["losses"]) == (games, min(games, 1), games - min(games, 1))
+        assert (row["year"], row["playoffs"]) == (tournament.year, tournament.playoffs)
@@ -23,10 +23,11 @@ JOIN tournaments tour ON
 where rmd.participantid BETWEEN 1 AND 10;
 
 
-INSERT IGNORE INTO matches (external_id, tournament_id, game_number, game_length, patch, match_date, data_completeness, url)
+INSERT IGNORE INTO matches (external_id, tournament_id, season, game_number, game_length, patch, match_date, data_completeness, url)
 SELECT
     rmd.gameid,
     tour.id,
+    tour.year,
     MAX(rmd.game),
     MAX(rmd.gamelength),
     MAX(rmd.patch),
@@ -55,7 +56,7 @@ INSERT IGNORE INTO match_player_stats
  totalgold, earnedgold, earned_gpm, goldspent,
  damagetochampions, dpm, damageshare,
  wardsplaced, wardskilled, controlwardsbought, visionscore,
- total_cs, minionkills, monsterkills, cspm)
+ total_cs, minionkills, monsterkills, cspm, season)
 SELECT 
     m.id,
     p.id,
@@ -87,7 +88,8 @@ SELECT
     rmd.total_cs,
     rmd.minionkills,
     rmd.monsterkills,
-    rmd.cspm
+    rmd.cspm,
+    m.season
 FROM raw_match_data rmd
 JOIN matches m ON m.external_id = rmd.gameid
 JOIN players p ON p.external_id = rmd.playerid
@@ -1,11 +1,9 @@
 use lol_esports_DB; 
 
-DROP TABLE IF EXISTS match_player_stats;
-DROP TABLE IF EXISTS players;
-DROP TABLE IF EXISTS team_tournaments;
-DROP TABLE IF EXISTS matches;
-DROP TABLE IF EXISTS tournaments;
-DROP TABLE IF EXISTS teams;
+-- Staging table for the Oracle's Elixir CSV, read by Data_Insertion.sql.
+-- Every other table, index, view, trigger and procedure is created by
+-- `python -m app.cli migrate` (backend/app/migrations); run it first.
+
 drop table if exists raw_match_data;
 
 --- Raw data
@@ -117,110 +115,3 @@ CREATE TABLE raw_match_data (
     
     PRIMARY KEY (gameid, participantid)
 );
-
---- Create tables
-CREATE TABLE teams (
-    id CHAR(36) PRIMARY KEY DEFAULT (UUID()),
-    external_id VARCHAR(64) UNIQUE,
-    team_name VARCHAR(100) NOT NULL
-);
-
-CREATE TABLE tournaments (
-    id CHAR(36) PRIMARY KEY DEFAULT (UUID()),
-    league VARCHAR(50) NOT NULL,
-    year INT NOT NULL,
-    split VARCHAR(20),
-    playoffs BOOLEAN,
-    UNIQUE KEY unique_tournament (league, year, split, playoffs)
-);
-
-CREATE TABLE matches (
-    id CHAR(36) PRIMARY KEY DEFAULT (UUID()),
-    external_id VARCHAR(64) NOT NULL UNIQUE,
-    tournament_id CHAR(36),
-    game_number INT,
-    game_length INT,
-    patch VARCHAR(20),
-    match_date DATE,
-    data_completeness VARCHAR(20),
-    url TEXT,
-    FOREIGN KEY (tournament_id)
-        REFERENCES tournaments(id)
-        ON DELETE CASCADE
-);
-
-CREATE TABLE players (
-    id CHAR(36) PRIMARY KEY DEFAULT (UUID()),
-    external_id VARCHAR(64) NOT NULL UNIQUE,
-    player_name VARCHAR(100) NOT NULL,
-    position VARCHAR(20)
-);
-
-CREATE TABLE team_tournaments (
-    team_id CHAR(36),
-    tournament_id CHAR(36),
-    PRIMARY KEY (team_id, tournament_id),
-    FOREIGN KEY (team_id)
-        REFERENCES teams(id)
-        ON DELETE CASCADE,
-    FOREIGN KEY (tournament_id)
-        REFERENCES tournaments(id)
-        ON DELETE CASCADE
-);
-
-CREATE TABLE match_player_stats (
-    match_id CHAR(36),
-    player_id CHAR(36),
-    team_id CHAR(36),
-    side VARCHAR(10),
-    champion VARCHAR(50),
-    result TINYINT,
-    
-    -- Combat stats
-    kills INT,
-    deaths INT,
-    assists INT,
-    doublekills INT DEFAULT 0,
-    triplekills INT DEFAULT 0,
-    quadrakills INT DEFAULT 0,
-    pentakills INT DEFAULT 0,
-    
-    -- Objectives (player contribution)
-    firstblood TINYINT DEFAULT 0,
-    firstbloodkill TINYINT DEFAULT 0,
-    firstbloodassist TINYINT DEFAULT 0,
-    
-    -- Economy
-    totalgold INT,
-    earnedgold INT,
-    earned_gpm DECIMAL(10,2),
-    goldspent INT,
-    
-    -- Damage
-    damagetochampions INT,
-    dpm DECIMAL(10,2),
-    damageshare DECIMAL(5,4),
-    
-    -- Vision
-    wardsplaced INT,
-    wardskilled INT,
-    controlwardsbought INT,
-    visionscore INT,
-    
-    -- Farm
-    total_cs INT,
-    minionkills INT,
-    monsterkills INT,
-    cspm DECIMAL(10,4),
-    
-    PRIMARY KEY (match_id, player_id),
-    FOREIGN KEY (match_id)
-        REFERENCES matches(id)
-        ON DELETE CASCADE,
-    FOREIGN KEY (player_id)
-        REFERENCES players(id)
-        ON DELETE CASCADE,
-    FOREIGN KEY (team_id)
-        REFERENCES teams(id)
-        ON DELETE CASCADE
-);
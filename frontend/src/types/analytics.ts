@@ -16,6 +16,7 @@ export interface PlayerLeaderboardRow {
   avg_cspm?: number;
   avg_vision?: number;
   win_rate?: number;
+  percentile?: number | null;
 }
 
 export interface TeamLeaderboardRow {
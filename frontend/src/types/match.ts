@@ -9,6 +9,12 @@ export interface Match {
   url?: string;
   external_id?: string;
   team_names?: string[]; // List of team names in the match
+  tournament_name?: string;
+  blue_team_id?: string;
+  blue_team_name?: string;
+  red_team_id?: string;
+  red_team_name?: string;
+  winner_team_id?: string;
 }
 
 export interface MatchCreate {
@@ -12,6 +12,8 @@ export interface Player {
   total_assists?: number;
   avg_kda?: number;
   win_rate?: number;
+  // Percentile per metric (kda, dpm, cspm, vision, winrate) among same-position players
+  percentiles?: Record<string, number> | null;
 }
 
 export interface PlayerCreate {
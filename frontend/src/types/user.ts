@@ -19,4 +19,6 @@ export interface UserCreate {
 export interface UserUpdate {
   email?: string;
   full_name?: string;
+  role?: string;
+  disabled?: boolean;
 }